@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Paquete de assets del juego en un único archivo
+Agrupa el árbol que sirve GameServer en un archivo indexado: una cabecera,
+el contenido de cada archivo (deduplicado por hash) y al final un índice
+JSON con el desplazamiento, el tamaño, el hash y las variantes .gz/.br de
+cada ruta. El paquete se guarda junto al directorio del juego (o de su
+versión activa), fuera del árbol que sirve e indexa. Al servir, el paquete se mapea en memoria y cada petición se
+responde con un slice de memoryview, sin open/stat/read por petición.
+
+Uso:
+    python asset_pack.py build ./hardcore_ninja_game
+    python asset_pack.py inspect ./hardcore_ninja_game.assets.pack --verify
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import posixpath
+import struct
+import sys
+import time
+import urllib.parse
+from http import HTTPStatus
+
+from project_index import IGNORED_DIRS
+from static_files import (ENCODING_SIDECARS, CachingRequestHandler, accepted_encodings,
+                          if_range_matches, not_modified, parse_range)
+
+# Construir el paquete al importar un juego y servir desde él en GameServer
+ASSET_PACK = os.environ.get("ASSET_PACK", "0") == "1"
+# Sufijo del paquete, que se guarda al lado del directorio del juego: dentro
+# lo verían el índice del proyecto y el FileWatcher como un archivo más
+PACK_SUFFIX = ".assets.pack"
+PACK_MAGIC = b"GAMEPAK1"
+# Cabecera: magic, desplazamiento y longitud del índice
+HEADER = struct.Struct("<8sQQ")
+CHUNK_SIZE = 1024 * 1024
+
+def pack_path(root):
+    """Paquete de `root`; con releases, junto al directorio de la versión activa"""
+    return os.path.realpath(root) + PACK_SUFFIX
+
+def served_files(root):
+    """Rutas relativas (con /) de los archivos que se incluyen en el paquete"""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS)
+        rel_dir = os.path.relpath(dirpath, root)
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if os.path.isfile(path):
+                files.append(name if rel_dir == "." else posixpath.join(
+                    rel_dir.replace(os.sep, "/"), name))
+    return files
+
+def tree_fingerprint(root, files=None):
+    """Cantidad, tamaño total y mtime más reciente de los archivos servidos.
+
+    No se usan los mtime de los directorios: no cambian al reescribir un
+    archivo que ya existía.
+    """
+    count = total = newest = 0
+    for rel_path in files if files is not None else served_files(root):
+        try:
+            stat = os.stat(os.path.join(root, rel_path))
+        except OSError:
+            continue
+        count += 1
+        total += stat.st_size
+        newest = max(newest, stat.st_mtime_ns)
+    return f"{count}:{total}:{newest}"
+
+def build_pack(root, output=None):
+    """Construir el paquete de `root`; devuelve estadísticas de la construcción"""
+    start = time.perf_counter()
+    root = os.path.abspath(root)
+    output = output or pack_path(root)
+    files = served_files(root)
+    present = set(files)
+    suffixes = {suffix: encoding for encoding, suffix in ENCODING_SIDECARS}
+
+    blobs = {}  # hash -> (desplazamiento, tamaño)
+    entries = {}
+    stats = {"files": 0, "variants": 0, "source_bytes": 0, "unique_bytes": 0}
+    tmp_path = f"{output}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as out:
+        out.write(HEADER.pack(PACK_MAGIC, 0, 0))
+
+        def add(path):
+            offset = out.tell()
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+            size = out.tell() - offset
+            etag = digest.hexdigest()[:32]
+            stats["source_bytes"] += size
+            if etag in blobs:
+                # Contenido repetido: se reutiliza el blob anterior
+                out.seek(offset)
+                out.truncate()
+            else:
+                blobs[etag] = (offset, size)
+                stats["unique_bytes"] += size
+            offset, size = blobs[etag]
+            return {"offset": offset, "size": size, "etag": etag}
+
+        for rel_path in files:
+            base, suffix = os.path.splitext(rel_path)
+            if suffix in suffixes and base in present:
+                continue  # Se guarda como variante de su original
+            path = os.path.join(root, rel_path)
+            stat = os.stat(path)
+            entry = add(path)
+            entry["mtime"] = stat.st_mtime
+            for encoding, sidecar in ENCODING_SIDECARS:
+                sidecar_path = path + sidecar
+                if rel_path + sidecar not in present:
+                    continue
+                # Igual que en disco: solo variantes al menos tan recientes como el original
+                if os.stat(sidecar_path).st_mtime_ns < stat.st_mtime_ns:
+                    continue
+                entry.setdefault("variants", {})[encoding] = add(sidecar_path)
+                stats["variants"] += 1
+            entries[rel_path] = entry
+            stats["files"] += 1
+
+        index = json.dumps({
+            "version": 1,
+            "created_at": time.time(),
+            "fingerprint": tree_fingerprint(root, files),
+            "files": entries
+        }, separators=(",", ":")).encode()
+        index_offset = out.tell()
+        out.write(index)
+        out.seek(0)
+        out.write(HEADER.pack(PACK_MAGIC, index_offset, len(index)))
+    os.replace(tmp_path, output)
+
+    stats["pack_bytes"] = os.path.getsize(output)
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    stats["path"] = output
+    return stats
+
+def ensure_pack(root, output=None):
+    """Ruta del paquete de `root`, reconstruyéndolo si falta o está desactualizado"""
+    output = output or pack_path(root)
+    try:
+        with AssetPack(output) as pack:
+            if pack.fingerprint == tree_fingerprint(root):
+                return output
+    except (OSError, ValueError):
+        pass
+    build_pack(root, output)
+    return output
+
+class AssetPack:
+    """Paquete mapeado en memoria; `data()` devuelve slices sin copiar"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self.mmap) < HEADER.size:
+                raise ValueError(f"{path} no es un paquete de assets")
+            magic, index_offset, index_length = HEADER.unpack_from(self.mmap, 0)
+            if magic != PACK_MAGIC:
+                raise ValueError(f"{path} no es un paquete de assets")
+            index = json.loads(self.mmap[index_offset:index_offset + index_length])
+        except Exception:
+            self.mmap.close()
+            raise
+        self.view = memoryview(self.mmap)
+        self.files = index["files"]
+        self.created_at = index["created_at"]
+        self.fingerprint = index.get("fingerprint")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        try:
+            self.view.release()
+            self.mmap.close()
+        except BufferError:
+            pass  # Aún hay respuestas usando slices del paquete
+
+    def lookup(self, rel_path):
+        return self.files.get(rel_path)
+
+    def data(self, entry):
+        return self.view[entry["offset"]:entry["offset"] + entry["size"]]
+
+    def variant(self, entry, accept_encoding):
+        """(blob, codificación) de la mejor variante aceptada, o (entry, None)"""
+        variants = entry.get("variants")
+        if variants and accept_encoding:
+            accepted = accepted_encodings(accept_encoding)
+            for encoding, _ in ENCODING_SIDECARS:
+                if encoding in variants and encoding in accepted:
+                    return variants[encoding], encoding
+        return entry, None
+
+    def verify(self):
+        """Rutas cuyo contenido no coincide con el hash del índice"""
+        corrupt = []
+        for rel_path, entry in self.files.items():
+            for blob in [entry] + list(entry.get("variants", {}).values()):
+                if hashlib.sha256(self.data(blob)).hexdigest()[:32] != blob["etag"]:
+                    corrupt.append(rel_path)
+                    break
+        return corrupt
+
+class PackBody:
+    """Cuerpo de respuesta: un slice del paquete (do_GET llama a close())"""
+
+    __slots__ = ("view",)
+
+    def __init__(self, view):
+        self.view = view
+
+    def close(self):
+        pass
+
+def request_path(url_path):
+    """Ruta relativa del paquete para una URL, o None si sale de la raíz"""
+    path = urllib.parse.unquote(url_path.split("?", 1)[0].split("#", 1)[0])
+    parts = [part for part in path.split("/") if part and part != "."]
+    if ".." in parts:
+        return None
+    return "/".join(parts)
+
+class PackRequestHandler(CachingRequestHandler):
+    """Sirve un AssetPack con las mismas cabeceras que CachingRequestHandler.
+
+    `pack` se asigna en la subclase que crea GameServer.
+    """
+
+    pack = None
+
+    def send_head(self):
+        rel_path = request_path(self.path)
+        entry = self.pack.lookup(rel_path) if rel_path is not None else None
+        if entry is None and rel_path is not None:
+            index_path = posixpath.join(rel_path, "index.html") if rel_path else "index.html"
+            entry = self.pack.lookup(index_path)
+            if entry is not None and rel_path and not self.path.split("?", 1)[0].endswith("/"):
+                # Igual que SimpleHTTPRequestHandler: los directorios terminan en /
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", self.path.split("?", 1)[0] + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            rel_path = index_path
+        if entry is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        blob, encoding = self.pack.variant(entry, self.headers.get("Accept-Encoding"))
+        etag = blob["etag"]
+        size = blob["size"]
+        self.range_remaining = None
+        self.content_encoding = encoding
+        self.vary_encoding = "variants" in entry
+
+        if not_modified(self.headers, etag, entry["mtime"]):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(etag, entry["mtime"], rel_path)
+            self.end_headers()
+            return None
+
+        byte_range = None
+        if if_range_matches(self.headers.get("If-Range"), etag):
+            byte_range = parse_range(self.headers.get("Range"), size)
+
+        if byte_range == "invalid":
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        body = self.pack.data(blob)
+        if byte_range:
+            start, end = byte_range
+            body = body[start:end + 1]
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-type", self.guess_type(rel_path))
+        self.send_validators(etag, entry["mtime"], rel_path)
+        self.end_headers()
+        return PackBody(body)
+
+    def copyfile(self, source, outputfile):
+        outputfile.write(source.view)
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def main():
+    parser = argparse.ArgumentParser(description="Construir e inspeccionar paquetes de assets")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Empaquetar el directorio de un juego")
+    build.add_argument("root", help="Directorio del juego")
+    build.add_argument("-o", "--output", help=f"Archivo de salida (por defecto <root>{PACK_SUFFIX})")
+    inspect = commands.add_parser("inspect", help="Mostrar el contenido de un paquete")
+    inspect.add_argument("pack", help="Archivo del paquete")
+    inspect.add_argument("--verify", action="store_true", help="Comprobar los hashes")
+    inspect.add_argument("--limit", type=int, default=20, help="Entradas a listar (0 = todas)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        stats = build_pack(args.root, args.output)
+        print(f"Paquete: {stats['path']}")
+        print(f"  {stats['files']} archivos, {stats['variants']} variantes precomprimidas")
+        print(f"  {format_size(stats['source_bytes'])} de origen, "
+              f"{format_size(stats['unique_bytes'])} únicos, paquete de "
+              f"{format_size(stats['pack_bytes'])} en {stats['seconds']} s")
+        return
+
+    with AssetPack(args.pack) as pack:
+        print(f"Paquete: {args.pack} ({format_size(len(pack.mmap))}, "
+              f"creado {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(pack.created_at))})")
+        print(f"{len(pack.files)} archivos\n")
+        print(f"{'ruta':<50} {'tamaño':>10} {'offset':>10}  etag      variantes")
+        listed = sorted(pack.files.items())
+        for rel_path, entry in listed[:args.limit or None]:
+            variants = ",".join(sorted(entry.get("variants", {})))
+            print(f"{rel_path:<50} {format_size(entry['size']):>10} {entry['offset']:>10}  "
+                  f"{entry['etag'][:8]}  {variants}")
+        if args.limit and len(listed) > args.limit:
+            print(f"... y {len(listed) - args.limit} más")
+        if args.verify:
+            corrupt = pack.verify()
+            if corrupt:
+                print(f"\n{len(corrupt)} archivos no coinciden con su hash:")
+                for rel_path in corrupt:
+                    print(f"  {rel_path}")
+                sys.exit(1)
+            print("\nTodos los hashes coinciden")
+
+if __name__ == "__main__":
+    main()
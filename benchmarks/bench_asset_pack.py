@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Comparación de GameServer sirviendo desde el directorio o desde el paquete
+de assets mapeado en memoria (asset_pack.py)
+Por defecto usa el fixture "phaser" y pide sus sprites, mapas y scripts
+(muchos archivos pequeños), que es donde más pesa el coste por archivo
+"""
+
+import argparse
+import email.message
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from asset_pack import build_pack, served_files  # noqa: E402
+from bench_game_server import client_loop, percentile  # noqa: E402
+from fixtures import ensure_fixture  # noqa: E402
+from game_server import GameServer  # noqa: E402
+
+def run(directory, pack, files, clients, duration):
+    server = GameServer(directory, port=0, open_browser=False, log_requests=False, pack=pack)
+    server.create_web_server()
+    threading.Thread(target=server.server.serve_forever, daemon=True).start()
+
+    latencies = []
+    counters = {"bytes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client_loop,
+                                args=(server.port, files, deadline, True, latencies, counters, lock))
+               for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.server.shutdown()
+    server.server.server_close()
+    return {
+        "rps": len(latencies) / elapsed,
+        "mb_per_sec": counters["bytes"] / elapsed / 1_000_000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": counters["errors"]
+    }
+
+class NullWriter:
+    def write(self, data):
+        return len(data)
+
+def handler_cost(directory, pack, files, iterations):
+    """Microsegundos de send_head + copyfile por petición, sin red ni cliente"""
+    server = GameServer(directory, port=0, open_browser=False, log_requests=False, pack=pack)
+    server.create_web_server()
+    try:
+        handler = server.server.RequestHandlerClass.__new__(server.server.RequestHandlerClass)
+        handler.directory = directory
+        handler.server = server.server
+        handler.client_address = ("127.0.0.1", 0)
+        handler.command = "GET"
+        handler.request_version = "HTTP/1.1"
+        handler.requestline = "GET / HTTP/1.1"
+        handler.close_connection = False
+        handler.headers = email.message.Message()
+        handler.wfile = NullWriter()
+        start = time.perf_counter()
+        for i in range(iterations):
+            handler.path = "/" + files[i % len(files)]
+            body = handler.send_head()
+            if body:
+                try:
+                    handler.copyfile(body, handler.wfile)
+                finally:
+                    body.close()
+        return (time.perf_counter() - start) * 1e6 / iterations
+    finally:
+        server.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Directorio vs paquete de assets en GameServer")
+    parser.add_argument("--dir", help="Directorio del juego (por defecto un checkout del fixture phaser)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=3.0, help="Segundos por modo y ronda")
+    parser.add_argument("--rounds", type=int, default=3, help="Rondas alternando modos (mejor de N)")
+    parser.add_argument("--max-size", type=int, default=64 * 1024,
+                        help="Solo se piden archivos de hasta este tamaño")
+    parser.add_argument("--iterations", type=int, default=20000,
+                        help="Peticiones de la medición sin red")
+    args = parser.parse_args()
+
+    workdir = None
+    directory = args.dir
+    if not directory:
+        workdir = tempfile.mkdtemp(prefix="bench-pack-")
+        directory = os.path.join(workdir, "game")
+        subprocess.run(["git", "clone", "-q", "--depth", "1",
+                        f"file://{ensure_fixture('phaser')}", directory], check=True)
+    try:
+        stats = build_pack(directory)
+        files = [path for path in served_files(directory)
+                 if os.path.getsize(os.path.join(directory, path)) <= args.max_size]
+        print(f"=== GameServer: directorio vs paquete ({len(files)} archivos, "
+              f"{args.clients} clientes, mejor de {args.rounds} x {args.duration}s) ===")
+        print(f"Paquete: {stats['files']} archivos, {stats['pack_bytes']} bytes, "
+              f"construido en {stats['seconds']} s")
+
+        print("\nCoste del handler por petición (sin red, mejor de las rondas):")
+        costs = {}
+        for _ in range(args.rounds):
+            for mode, pack in (("directorio", False), ("paquete", True)):
+                cost = handler_cost(directory, pack, files, args.iterations)
+                costs[mode] = min(costs.get(mode, cost), cost)
+        for mode, cost in costs.items():
+            print(f"{mode:<11} {cost:8.1f} µs")
+        print(f"Paquete / directorio: {costs['directorio'] / costs['paquete']:.2f}x más rápido")
+
+        print("\nCarga HTTP de extremo a extremo:")
+        best = {}
+        for _ in range(args.rounds):
+            # Modos alternados para repartir el ruido del sistema
+            for mode, pack in (("directorio", False), ("paquete", True)):
+                result = run(directory, pack, files, args.clients, args.duration)
+                if mode not in best or result["rps"] > best[mode]["rps"]:
+                    best[mode] = result
+        for mode, result in best.items():
+            print(f"{mode:<11} {result['rps']:8.1f} req/s  {result['mb_per_sec']:7.1f} MB/s  "
+                  f"p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms  "
+                  f"errores {result['errors']}")
+        speedup = best["paquete"]["rps"] / best["directorio"]["rps"] if best["directorio"]["rps"] else 0
+        print(f"Paquete / directorio: {speedup:.2f}x")
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
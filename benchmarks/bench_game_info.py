@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tamaño, latencia y memoria de /api/game_info según lo que pide el cliente
+Sobre un checkout del fixture "monorepo" (100.000 archivos) compara el
+documento completo (lista o árbol compacto) con el resumen y una página
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fixtures import ensure_fixture  # noqa: E402
+
+CASES = [
+    ("completo (lista)", ""),
+    ("completo (árbol)", "?format=tree"),
+    ("resumen", "?view=summary"),
+    ("página de 100", "?limit=100"),
+    ("página de 100 (árbol)", "?limit=100&format=tree"),
+    ("prefijo + página", "?prefix=packages/pkg005/&limit=100"),
+]
+
+def fetch(client, query):
+    """Consumir la respuesta por bloques (el cliente de prueba no la bufferiza)"""
+    response = client.get("/api/game_info" + query)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return size
+
+def measure(client, query, requests):
+    """(bytes, ms por petición, pico de memoria en KB)"""
+    start = time.perf_counter()
+    for _ in range(requests):
+        size = fetch(client, query)
+    elapsed = (time.perf_counter() - start) / requests
+    # La memoria se mide aparte: tracemalloc ralentiza mucho las peticiones
+    tracemalloc.start()
+    fetch(client, query)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, elapsed * 1000, peak // 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de /api/game_info")
+    parser.add_argument("--fixture", default="monorepo")
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-game-info-")
+    os.environ.setdefault("PROJECT_INDEX_DIR", os.path.join(workdir, "index"))
+    os.environ.setdefault("SHARED_STATE_DIR", os.path.join(workdir, "state"))
+    os.environ.setdefault("FILE_WATCHER", "off")
+    try:
+        game_dir = os.path.join(workdir, "game")
+        subprocess.run(["git", "clone", "-q", ensure_fixture(args.fixture), game_dir], check=True)
+        import main
+        import project_index
+        # create_app() inicializa el proceso (y adopta GAME_DIR): el juego se cambia después
+        app = main.create_app()
+        main.importer.game_path = game_dir
+        # Como con FileWatcher activo: el índice no recorre el disco en cada petición
+        project_index.apply_changes(game_dir, None)
+        client = app.test_client()
+        # Calentar la detección y la lista ordenada (se calculan una vez por generación)
+        client.get("/api/game_info?limit=1")
+
+        print(f"=== /api/game_info sobre '{args.fixture}' ({args.requests} peticiones por caso) ===")
+        print(f"{'caso':<24} {'bytes':>10} {'ms':>9} {'pico KB':>9}")
+        for label, query in CASES:
+            size, ms, peak = measure(client, query, args.requests)
+            print(f"{label:<24} {size:>10} {ms:>9.1f} {peak:>9}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga del servidor web de GameServer
+Lanza N clientes concurrentes contra los modos simple y threaded (con la
+configuración por defecto del servidor) y mide throughput y latencias
+sirviendo los archivos estáticos del juego; el caso "threaded+idle" abre
+antes conexiones keep-alive que no envían nada, como pestañas inactivas
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_server import GameServer  # noqa: E402
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "hardcore_ninja_game", "public")
+DEFAULT_FILES = ["index.html", "game.js", "phaser.min.js"]
+
+def client_loop(port, files, deadline, keep_alive, latencies, counters, lock):
+    """Pedir archivos en bucle hasta `deadline`"""
+    connection = None
+    local_latencies = []
+    local_bytes = 0
+    errors = 0
+    i = 0
+    while time.perf_counter() < deadline:
+        path = "/" + files[i % len(files)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            connection.request("GET", path)
+            response = connection.getresponse()
+            body = response.read()
+            if response.status != 200:
+                errors += 1
+            local_bytes += len(body)
+            local_latencies.append(time.perf_counter() - start)
+            if not keep_alive or response.will_close:
+                connection.close()
+                connection = None
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            if connection:
+                connection.close()
+            connection = None
+    if connection:
+        connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        counters["bytes"] += local_bytes
+        counters["errors"] += errors
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def run(mode, directory, clients, duration, files, idle=0):
+    server = GameServer(directory, port=0, mode=mode, open_browser=False, log_requests=False)
+    server.create_web_server()
+    thread = threading.Thread(target=server.server.serve_forever, daemon=True)
+    thread.start()
+    # Conexiones abiertas e inactivas durante toda la medición
+    idle_sockets = [socket.create_connection(("127.0.0.1", server.port))
+                    for _ in range(idle)]
+
+    latencies = []
+    counters = {"bytes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client_loop,
+                         args=(server.port, files, deadline, True, latencies, counters, lock))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    for sock in idle_sockets:
+        sock.close()
+    server.server.shutdown()
+    server.server.server_close()
+
+    return {
+        "mode": mode,
+        "requests_per_sec": len(latencies) / elapsed,
+        "mb_per_sec": counters["bytes"] / elapsed / 1_000_000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": (statistics.mean(latencies) * 1000) if latencies else 0.0,
+        "errors": counters["errors"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de GameServer")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="Directorio a servir")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--idle", type=int, default=200,
+                        help="Conexiones keep-alive inactivas del caso threaded+idle")
+    parser.add_argument("--files", nargs="+", default=DEFAULT_FILES)
+    args = parser.parse_args()
+
+    print(f"=== Carga sobre GameServer: {args.clients} clientes, {args.duration}s ===")
+    # En modo simple una conexión inactiva bloquea el servidor: sin caso idle
+    cases = [("simple", "simple", 0), ("threaded", "threaded", 0),
+             ("threaded+idle", "threaded", args.idle)]
+    for name, mode, idle in cases:
+        result = run(mode, args.dir, args.clients, args.duration, args.files, idle)
+        print(f"{name:<14} {result['requests_per_sec']:8.1f} req/s  "
+              f"{result['mb_per_sec']:8.1f} MB/s  "
+              f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+              f"errores {result['errors']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Importaciones repetidas con y sin la caché de objetos de git (git_cache.py)
+Clona varias veces el mismo fixture (repositorio bare local) como haría el
+importador: directamente desde el origen o desde el espejo local, que se
+crea en la primera importación y después solo se actualiza
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fixtures import ensure_fixture  # noqa: E402
+from git_cache import GitCache  # noqa: E402
+
+def run(args):
+    return subprocess.run(args, capture_output=True, text=True)
+
+def clone(source, dest, strategy):
+    args = ["git", "clone", "-q"]
+    if strategy == "shallow":
+        args += ["--depth", "1"]
+        source = Path(source).as_uri() if os.path.isdir(source) else source
+    subprocess.run(args + [source, dest], check=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Importaciones con y sin caché de git")
+    parser.add_argument("--fixture", default="phaser")
+    parser.add_argument("--imports", type=int, default=5)
+    parser.add_argument("--strategy", choices=("full", "shallow"), default="full")
+    args = parser.parse_args()
+
+    origin = Path(ensure_fixture(args.fixture)).as_uri()
+    workdir = tempfile.mkdtemp(prefix="bench-git-cache-")
+    try:
+        cache = GitCache(root=os.path.join(workdir, "cache"), ttl=0)
+        print(f"=== {args.imports} importaciones de '{args.fixture}' ({args.strategy}) ===")
+        for mode in ("sin caché", "con caché"):
+            times = []
+            for i in range(args.imports):
+                dest = os.path.join(workdir, f"game-{i}")
+                start = time.perf_counter()
+                if mode == "sin caché":
+                    clone(origin, dest, args.strategy)
+                else:
+                    with cache.source(origin, run, log=lambda message: None,
+                                      shallow=args.strategy == "shallow") as mirror:
+                        clone(mirror, dest, args.strategy)
+                times.append(time.perf_counter() - start)
+                shutil.rmtree(dest)
+            print(f"{mode:<10} primera {times[0] * 1000:8.1f} ms  "
+                  f"siguientes {sum(times[1:]) / max(1, len(times) - 1) * 1000:8.1f} ms")
+        print(f"Espejos: {cache.stats()['entries']}, {cache.stats()['bytes']} bytes")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
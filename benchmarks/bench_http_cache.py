@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Bytes servidos en una recarga con caché caliente
+Compara una recarga sin validadores (comportamiento anterior: se descarga
+todo de nuevo) con una recarga condicional usando los ETags, en /game/<path>
+de main.py y en GameServer
+"""
+
+import http.client
+import os
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main  # noqa: E402
+from game_server import GameServer  # noqa: E402
+
+PUBLIC_DIR = os.path.join(ROOT, "hardcore_ninja_game", "public")
+
+def public_files():
+    files = []
+    for root, dirs, names in os.walk(PUBLIC_DIR):
+        for name in names:
+            files.append(os.path.relpath(os.path.join(root, name), PUBLIC_DIR).replace(os.sep, "/"))
+    return sorted(files)
+
+def reload_flask(files):
+    client = main.create_app().test_client()
+    etags = {}
+    cold = 0
+    for name in files:
+        response = client.get(f"/game/public/{name}")
+        cold += len(response.data)
+        etags[name] = response.headers.get("ETag")
+    warm = 0
+    for name in files:
+        response = client.get(f"/game/public/{name}", headers={"If-None-Match": etags[name]})
+        warm += len(response.data)
+    return cold, warm
+
+def reload_game_server(files):
+    server = GameServer(PUBLIC_DIR, port=0, open_browser=False, log_requests=False)
+    server.create_web_server()
+    threading.Thread(target=server.server.serve_forever, daemon=True).start()
+    connection = http.client.HTTPConnection("127.0.0.1", server.port)
+    etags = {}
+    cold = warm = 0
+    try:
+        for name in files:
+            connection.request("GET", f"/{name}")
+            response = connection.getresponse()
+            cold += len(response.read())
+            etags[name] = response.getheader("ETag")
+        for name in files:
+            connection.request("GET", f"/{name}", headers={"If-None-Match": etags[name]})
+            response = connection.getresponse()
+            warm += len(response.read())
+    finally:
+        connection.close()
+        server.server.shutdown()
+        server.server.server_close()
+    return cold, warm
+
+def main_bench():
+    files = public_files()
+    print(f"=== Recarga con caché caliente ({len(files)} archivos de public/) ===")
+    for label, func in (("main.py /game/<path>", reload_flask), ("GameServer", reload_game_server)):
+        cold, warm = func(files)
+        print(f"{label:<22} antes: {cold:>10} bytes   después: {warm:>6} bytes")
+
+if __name__ == "__main__":
+    main_bench()
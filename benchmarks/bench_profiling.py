@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark del coste del perfilado
+Mide /api/status sin los hooks de perfilado, con el perfilado desactivado
+y con cProfile y sampling activos
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from profiling import profiler  # noqa: E402
+
+app = main.create_app()
+
+def measure(client, path, duration):
+    requests_done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        response = client.get(path)
+        assert response.status_code == 200
+        requests_done += 1
+    return requests_done / (time.perf_counter() - start)
+
+def hook_cost(path, iterations=200000):
+    """Microsegundos por petición de los hooks con el perfilado desactivado"""
+    profiler.configure(enabled=False)
+    with app.test_request_context(path):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            main.start_request_profile()
+            main.finish_request_profile(None)
+        return (time.perf_counter() - start) * 1e6 / iterations
+
+def without_hooks(run):
+    """Ejecutar `run` con los hooks de perfilado quitados de la app"""
+    before = app.before_request_funcs[None]
+    teardown = app.teardown_request_funcs[None]
+    app.before_request_funcs[None] = [f for f in before if f is not main.start_request_profile]
+    app.teardown_request_funcs[None] = [f for f in teardown
+                                        if f is not main.finish_request_profile]
+    try:
+        return run()
+    finally:
+        app.before_request_funcs[None] = before
+        app.teardown_request_funcs[None] = teardown
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="Coste del perfilado sobre /api/status")
+    parser.add_argument("--duration", type=float, default=2.0, help="Segundos por escenario y ronda")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--path", default="/api/status")
+    args = parser.parse_args()
+
+    client = app.test_client()
+    client.get(args.path)  # Calentar
+
+    scenarios = {
+        "sin hooks": (None, None),
+        "desactivado": (False, None),
+        "cprofile": (True, "cprofile"),
+        "sampling": (True, "sampling")
+    }
+    # Rondas intercaladas; se toma la mejor de cada escenario para reducir el ruido
+    results = {name: 0.0 for name in scenarios}
+    for _ in range(args.rounds):
+        for name, (enabled, mode) in scenarios.items():
+            run = lambda: measure(client, args.path, args.duration)
+            if enabled is None:
+                rps = without_hooks(run)
+            else:
+                profiler.configure(enabled=enabled, mode=mode)
+                rps = run()
+                profiler.configure(enabled=False)
+                profiler.clear()
+            results[name] = max(results[name], rps)
+
+    baseline = results["sin hooks"]
+    print(f"=== Perfilado sobre {args.path} ===")
+    for name, rps in results.items():
+        print(f"{name:<12} {rps:10.1f} req/s  ({(baseline - rps) * 100 / baseline:+6.1f}% coste)")
+    # El throughput tiene ruido de varios puntos; el coste directo de los hooks
+    # desactivados se mide aparte y se compara con la duración de una petición
+    cost = hook_cost(args.path)
+    print(f"Hooks desactivados: {cost:.2f} µs por petición "
+          f"({cost * baseline / 1e4:.3f}% de una petición de {1e6 / baseline:.0f} µs)")
+
+if __name__ == "__main__":
+    main_bench()
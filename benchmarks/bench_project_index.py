@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark del índice de proyecto
+Compara os.walk / Path.rglob (recorrido anterior) con project_index sobre un
+árbol sintético con node_modules y .git, y el refresh por mtimes con el
+índice mantenido por FileWatcher (file_watcher.py)
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import project_index  # noqa: E402
+from file_watcher import FileWatcher  # noqa: E402
+
+def build_tree(root, total_files, files_per_dir=100):
+    """Crear un árbol con ~80% de archivos en el proyecto y ~20% en node_modules"""
+    project_files = int(total_files * 0.8)
+    ignored_files = total_files - project_files
+    for base, count in (("src", project_files), ("node_modules/pkg", ignored_files)):
+        for i in range(count):
+            directory = os.path.join(root, base, f"d{i // files_per_dir}")
+            if i % files_per_dir == 0:
+                os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"f{i}.js"), "w") as f:
+                f.write("x")
+    os.makedirs(os.path.join(root, ".git"), exist_ok=True)
+    with open(os.path.join(root, ".git", "HEAD"), "w") as f:
+        f.write("0" * 40)
+    with open(os.path.join(root, "package.json"), "w") as f:
+        f.write('{"main": "src/index.js"}')
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<42} {elapsed * 1000:10.1f} ms")
+    return result
+
+def walk_old(root):
+    return [os.path.join(r, f) for r, dirs, files in os.walk(root) for f in files]
+
+def rglob_old(root):
+    return [p for p in Path(root).rglob("*") if p.is_file()]
+
+def watched_index(root, backend):
+    """Coste por consulta y latencia de un cambio con el índice vigilado"""
+    key = os.path.abspath(root)
+    applied = threading.Event()
+
+    def on_change(paths):
+        project_index.apply_changes(key, paths)
+        applied.set()
+
+    watcher = timed(f"FileWatcher ({backend}): arranque + escaneo",
+                    lambda: start_watcher(root, on_change, backend, applied))
+    try:
+        print(f"Backend: {watcher.stats()['backend']}, "
+              f"watches: {watcher.stats()['watches']}")
+        timed("Índice vigilado: refresh sin cambios", lambda: project_index.get_index(key))
+
+        applied.clear()
+        start = time.perf_counter()
+        with open(os.path.join(root, "src", "d1", "nuevo.js"), "w") as f:
+            f.write("x")
+        applied.wait(30)
+        elapsed = time.perf_counter() - start
+        print(f"{'Índice vigilado: cambio visible (debounce)':<42} {elapsed * 1000:10.1f} ms")
+        if "src/d1/nuevo.js".replace("/", os.sep) not in project_index.get_index(key).files:
+            print("ERROR: el cambio no llegó al índice")
+    finally:
+        watcher.stop()
+
+def start_watcher(root, on_change, backend, applied):
+    watcher = FileWatcher(root, on_change, backend=backend).start()
+    applied.wait(60)
+    return watcher
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de project_index")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--backend", choices=("inotify", "polling"), default="inotify",
+                        help="Backend de FileWatcher")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_index_")
+    root = os.path.join(workdir, "game")
+    cache_dir = os.path.join(workdir, "cache")
+    try:
+        print(f"Generando árbol sintético de {args.files} archivos...")
+        build_tree(root, args.files)
+        print()
+
+        timed("os.walk (GameImporter anterior)", lambda: walk_old(root))
+        timed("Path.rglob + is_file (GameServer anterior)", lambda: rglob_old(root))
+
+        index = project_index.ProjectIndex(root, cache_dir=cache_dir)
+        timed("ProjectIndex: escaneo inicial", index.refresh)
+        timed("ProjectIndex: refresh sin cambios", index.refresh)
+
+        with open(os.path.join(root, "src", "d0", "nuevo.js"), "w") as f:
+            f.write("x")
+        timed("ProjectIndex: refresh con 1 dir modificado", index.refresh)
+
+        reloaded = project_index.ProjectIndex(root, cache_dir=cache_dir)
+        timed("ProjectIndex: carga desde disco", reloaded.refresh)
+        print()
+        print(f"Archivos indexados: {len(reloaded.files)} "
+              f"(node_modules y .git excluidos)")
+        print()
+        watched_index(root, args.backend)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
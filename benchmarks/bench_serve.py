@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark del servidor de la app
+Compara el servidor de desarrollo (app.run con debug=True, como antes) con
+serve.py en modo threaded y prefork sobre /api/status y /game/<ruta>
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = ["/api/status", "/game/public/index.html", "/game/public/game.js"]
+
+def server_command(mode, port, connections):
+    if mode == "dev":
+        return [sys.executable, "-c",
+                f"import main; main.create_app().run(host='127.0.0.1', port={port}, debug=True)"]
+    return [sys.executable, "serve.py", "--mode", mode, "--host", "127.0.0.1",
+            "--port", str(port), "--connections", str(connections),
+            "--quiet"]
+
+def wait_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            connection.request("GET", "/api/status")
+            connection.getresponse().read()
+            connection.close()
+            return True
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.2)
+    return False
+
+def client_loop(args):
+    """Pedir `path` con keep-alive hasta `deadline`; devuelve (peticiones, errores)"""
+    port, path, deadline = args
+    connection = None
+    done = errors = 0
+    while time.time() < deadline:
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                done += 1
+            else:
+                errors += 1
+            if response.will_close:
+                connection.close()
+                connection = None
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            if connection:
+                connection.close()
+            connection = None
+    return done, errors
+
+def measure(pool, port, path, clients, duration):
+    # Los clientes son procesos para que el GIL del generador no sea el límite
+    deadline = time.time() + duration
+    results = pool.map(client_loop, [(port, path, deadline)] * clients)
+    return sum(r[0] for r in results) / duration, sum(r[1] for r in results)
+
+def run(mode, port, paths, clients, duration, connections, pool):
+    process = subprocess.Popen(server_command(mode, port, connections), cwd=ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    try:
+        if not wait_ready(port):
+            raise RuntimeError(f"El servidor {mode} no respondió")
+        return {path: measure(pool, port, path, clients, duration) for path in paths}
+    finally:
+        # El recargador del modo dev lanza un proceso hijo: detener el grupo entero
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de desarrollo frente a serve.py")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--connections", type=int, default=256)
+    parser.add_argument("--port", type=int, default=5650)
+    parser.add_argument("--modes", nargs="+", default=["dev", "threaded", "prefork"])
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    args = parser.parse_args()
+
+    print(f"=== {args.clients} clientes keep-alive, {args.duration}s por ruta, "
+          f"hasta {args.connections} conexiones ===")
+    with multiprocessing.Pool(args.clients) as pool:
+        for i, mode in enumerate(args.modes):
+            results = run(mode, args.port + i, args.paths, args.clients, args.duration,
+                          args.connections, pool)
+            for path, (rps, errors) in results.items():
+                print(f"{mode:<9} {path:<28} {rps:9.1f} req/s  errores {errors}")
+
+if __name__ == "__main__":
+    main()
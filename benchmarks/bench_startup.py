@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark del arranque en frío
+Importa main en procesos nuevos con `python -X importtime` y mide el tiempo
+acumulado de main, los módulos más caros y lo que tarda create_app(), que
+es lo que paga cada worker después de un despliegue o al escalar.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Presupuesto por defecto de `import main` (ms)
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "400"))
+
+CREATE_APP_SNIPPET = (
+    "import time; start = time.perf_counter(); import main; "
+    "imported = time.perf_counter(); main.create_app(); "
+    "print(imported - start, time.perf_counter() - imported)"
+)
+
+def parse_importtime(stderr):
+    """{módulo: (propio_us, acumulado_us)} a partir de la salida de -X importtime"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return modules
+
+def import_profile(module="main", env=None):
+    """Tiempos de importación de `module` en un intérprete nuevo"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return parse_importtime(result.stderr)
+
+def create_app_time(env=None):
+    """Segundos de (import main, create_app()) en un intérprete nuevo"""
+    result = subprocess.run([sys.executable, "-c", CREATE_APP_SNIPPET], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    imported, created = result.stdout.split()[-2:]
+    return float(imported), float(created)
+
+def measure(runs=5, env=None):
+    """Mejor de `runs` arranques: import main (ms), create_app (ms) y el perfil más rápido"""
+    best = None
+    for _ in range(runs):
+        modules = import_profile(env=env)
+        if best is None or modules["main"][1] < best["main"][1]:
+            best = modules
+    create_app = min(create_app_time(env)[1] for _ in range(runs))
+    return {
+        "import_ms": best["main"][1] / 1000,
+        "create_app_ms": create_app * 1000,
+        "modules": best
+    }
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque en frío de main.py")
+    parser.add_argument("--runs", type=int, default=5, help="Arranques (se toma el mejor)")
+    parser.add_argument("--top", type=int, default=15, help="Módulos más caros a mostrar")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS,
+                        help="Máximo de ms para import main (0 = sin límite)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = measure(args.runs)
+    print(f"=== Arranque de main.py (mejor de {args.runs}, "
+          f"{time.perf_counter() - start:.1f} s en total) ===")
+    print(f"import main    {result['import_ms']:8.1f} ms")
+    print(f"create_app()   {result['create_app_ms']:8.1f} ms")
+    print(f"\n{'módulo':<40} {'propio ms':>10} {'acumulado ms':>13}")
+    ranked = sorted(result["modules"].items(), key=lambda item: item[1][0], reverse=True)
+    for name, (self_us, cumulative_us) in ranked[:args.top]:
+        print(f"{name:<40} {self_us / 1000:>10.1f} {cumulative_us / 1000:>13.1f}")
+
+    if args.budget and result["import_ms"] > args.budget:
+        print(f"\nimport main supera el presupuesto de {args.budget:.0f} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main_bench()
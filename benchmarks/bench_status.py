@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark de /api/status
+Compara las peticiones por segundo con la caché de toolchain frente al
+comportamiento anterior (un `git --version` por cada petición)
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+app = main.create_app()
+legacy_mode = False
+
+@app.before_request
+def simulate_legacy_probe():
+    """Reproducir el coste anterior: un proceso git por petición"""
+    if legacy_mode:
+        try:
+            subprocess.run(["git", "--version"], capture_output=True, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            pass
+
+def measure(client, duration):
+    """Hacer peticiones a /api/status durante `duration` segundos"""
+    requests_done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        response = client.get('/api/status')
+        assert response.status_code == 200
+        requests_done += 1
+    elapsed = time.perf_counter() - start
+    return requests_done / elapsed
+
+def main_bench():
+    global legacy_mode
+    parser = argparse.ArgumentParser(description="Benchmark de /api/status")
+    parser.add_argument("--duration", type=float, default=3.0,
+                        help="Segundos por escenario")
+    args = parser.parse_args()
+
+    client = app.test_client()
+    client.get('/api/status')  # Calentar
+
+    legacy_mode = True
+    before = measure(client, args.duration)
+    legacy_mode = False
+    after = measure(client, args.duration)
+
+    print("=== Benchmark /api/status ===")
+    print(f"Antes (git --version por petición): {before:10.1f} req/s")
+    print(f"Después (toolchain en caché):       {after:10.1f} req/s")
+    print(f"Mejora: x{after / before:.1f}")
+
+if __name__ == "__main__":
+    main_bench()
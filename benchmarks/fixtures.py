@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Repositorios de juego sintéticos para los benchmarks
+Genera, de forma determinista, repositorios git bare locales de distintos
+tamaños: "small" (juego web mínimo), "phaser" (juego Node/Phaser con
+assets) y "monorepo" (100.000 archivos). Se guardan en FIXTURES_DIR y solo
+se regeneran si cambia FIXTURE_VERSION.
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.environ.get("BENCH_FIXTURES_DIR", os.path.join(ROOT, ".cache", "bench_fixtures"))
+FIXTURE_VERSION = 1
+
+WORDS = ["player", "enemy", "sprite", "update", "render", "physics", "scene", "velocity",
+         "collider", "tween", "camera", "input", "score", "socket", "emit", "frame"]
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data if isinstance(data, bytes) else data.encode())
+
+def script(rng, size):
+    """JavaScript falso pero comprimible como el código real"""
+    lines = []
+    total = 0
+    while total < size:
+        a, b, c = rng.choice(WORDS), rng.choice(WORDS), rng.choice(WORDS)
+        line = f"function {a}_{b}{rng.randint(0, 999)}(t){{return this.{c}.{a}(t*{rng.random():.4f});}}\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)
+
+def build_small(work, rng):
+    write(os.path.join(work, "index.html"),
+          "<!DOCTYPE html><html><head><title>Bench</title></head>"
+          "<body><script src=\"game.js\"></script></body></html>\n")
+    write(os.path.join(work, "game.js"), script(rng, 20_000))
+    for i in range(10):
+        write(os.path.join(work, "assets", f"tile{i}.png"), rng.randbytes(4_000))
+    write(os.path.join(work, "README.md"), "# Juego de prueba\n")
+
+def build_phaser(work, rng):
+    write(os.path.join(work, "package.json"), json.dumps({
+        "name": "bench-phaser-game",
+        "version": "1.0.0",
+        "main": "server/index.js",
+        "scripts": {"start": "node server/index.js"},
+        "dependencies": {}
+    }, indent=2))
+    write(os.path.join(work, "server", "index.js"), script(rng, 8_000))
+    write(os.path.join(work, "public", "index.html"),
+          "<!DOCTYPE html><html><head><title>Bench</title>"
+          "<script src=\"phaser.min.js\"></script></head>"
+          "<body><script src=\"game.js\"></script></body></html>\n")
+    write(os.path.join(work, "public", "phaser.min.js"), script(rng, 1_000_000))
+    write(os.path.join(work, "public", "game.js"), script(rng, 50_000))
+    for i in range(150):
+        write(os.path.join(work, "public", "assets", f"sprite{i:03d}.png"),
+              rng.randbytes(rng.randint(5_000, 40_000)))
+    for i in range(20):
+        write(os.path.join(work, "public", "assets", "maps", f"level{i}.json"),
+              json.dumps({"tiles": [rng.randint(0, 64) for _ in range(2_000)]}))
+
+def build_monorepo(work, rng, total_files=100_000, files_per_dir=100):
+    write(os.path.join(work, "index.html"), "<!DOCTYPE html><html><body></body></html>\n")
+    for i in range(total_files // files_per_dir):
+        package = os.path.join(work, "packages", f"pkg{i // 100:03d}", f"mod{i % 100:02d}")
+        os.makedirs(package, exist_ok=True)
+        for j in range(files_per_dir):
+            with open(os.path.join(package, f"file{j:03d}.js"), "w") as f:
+                f.write(f"export const v{j} = {rng.randint(0, 1_000_000)};\n")
+
+FIXTURES = {
+    "small": build_small,
+    "phaser": build_phaser,
+    "monorepo": build_monorepo,
+}
+
+def git(args, cwd):
+    subprocess.run(["git", "-c", "user.name=bench", "-c", "user.email=bench@localhost",
+                    "-c", "init.defaultBranch=main"] + args,
+                   cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def ensure_fixture(name, fixtures_dir=FIXTURES_DIR):
+    """Ruta del repositorio bare `name`, generándolo si no existe"""
+    bare = os.path.join(fixtures_dir, f"{name}.git")
+    marker = os.path.join(bare, "bench-fixture-version")
+    try:
+        with open(marker) as f:
+            if f.read().strip() == str(FIXTURE_VERSION):
+                return bare
+    except OSError:
+        pass
+
+    shutil.rmtree(bare, ignore_errors=True)
+    os.makedirs(fixtures_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix=f"fixture-{name}-") as work:
+        FIXTURES[name](work, random.Random(f"{name}-{FIXTURE_VERSION}"))
+        git(["init", "-q"], work)
+        git(["add", "-A"], work)
+        git(["commit", "-q", "-m", f"Fixture {name}"], work)
+        git(["clone", "-q", "--bare", work, bare], fixtures_dir)
+    # Necesario para probar la estrategia "partial" con file://
+    git(["config", "uploadpack.allowFilter", "true"], bare)
+    with open(marker, "w") as f:
+        f.write(str(FIXTURE_VERSION))
+    return bare
+
+if __name__ == "__main__":
+    for fixture in sys.argv[1:] or FIXTURES:
+        print(ensure_fixture(fixture))
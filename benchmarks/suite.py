@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks reproducible
+Genera los repositorios sintéticos de fixtures.py y mide, cada caso en su
+propio proceso (para aislar la memoria y las cachés):
+- import:<fixture>  tiempo total de clonado y preparación
+- detect:<fixture>  detección del tipo de juego en frío y en caliente
+- status            peticiones por segundo a /api/status
+- static:flask      /game/<ruta> de main.py bajo concurrencia
+- static:gameserver servidor web de GameServer bajo concurrencia
+- static:pack       GameServer sirviendo desde el paquete de assets
+- startup           import main y create_app() en un intérprete nuevo; si
+                    import main supera --startup-budget la suite falla
+El resultado se guarda en JSON y puede compararse con uno anterior:
+    python benchmarks/suite.py --output antes.json
+    python benchmarks/suite.py --baseline antes.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from bench_startup import STARTUP_BUDGET_MS  # noqa: E402
+from fixtures import FIXTURES, ensure_fixture  # noqa: E402
+
+DEFAULT_FIXTURES = ["small", "phaser", "monorepo"]
+# Fixture usado para los casos de archivos estáticos
+STATIC_FIXTURE = "phaser"
+STATIC_FILES = ["public/index.html", "public/game.js", "public/phaser.min.js",
+                "public/assets/sprite000.png"]
+
+# Diferencia absoluta mínima para considerar una regresión: por debajo de
+# esto el cambio se confunde con el ruido del sistema
+NOISE_FLOOR = {"s": 0.02, "ms": 1.0}
+
+def metric(value, unit, better="lower"):
+    return {"value": round(value, 6), "unit": unit, "better": better,
+            "floor": NOISE_FLOOR.get(unit, 0)}
+
+def max_rss_kb():
+    """Máximo de memoria residente del proceso (KB)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS la da en bytes, Linux en KB
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+def checkout(fixture, workdir, suffix=""):
+    """Clonar el fixture sin medir, para los casos que necesitan un juego"""
+    dest = os.path.join(workdir, f"{fixture}{suffix}")
+    subprocess.run(["git", "clone", "-q", "--depth", "1", f"file://{ensure_fixture(fixture)}",
+                    dest], check=True)
+    return dest
+
+# --- Casos (se ejecutan en el proceso hijo) -------------------------------------
+
+def case_import(fixture, workdir, args):
+    import main
+    # Mejor de `repeat` importaciones, cada una en un directorio nuevo
+    wall = clone = setup = float("inf")
+    for i in range(args.repeat):
+        importer = main.GameImporter(game_dir=os.path.join(workdir, f"{fixture}{i}"))
+        start = time.perf_counter()
+        if not importer.clone_repository(ensure_fixture(fixture), args.strategy):
+            raise RuntimeError("Error al clonar el fixture")
+        importer.setup_game()
+        wall = min(wall, time.perf_counter() - start)
+        clone = min(clone, importer.phases["clone"]["seconds"])
+        setup = min(setup, importer.phases["setup"]["seconds"])
+    return {
+        "wall": metric(wall, "s"),
+        "clone": metric(clone, "s"),
+        "setup": metric(setup, "s"),
+        "max_rss": metric(max_rss_kb(), "KB")
+    }
+
+def case_detect(fixture, workdir, args):
+    import main
+    cold = warm = float("inf")
+    for i in range(args.repeat):
+        # Cada repetición usa un checkout nuevo para que el índice empiece en frío
+        game_path = checkout(fixture, workdir, suffix=str(i))
+        importer = main.GameImporter(game_dir=game_path)
+        importer.game_path = game_path
+        start = time.perf_counter()
+        info = importer.detect_game_type()
+        cold = min(cold, time.perf_counter() - start)
+        # Importador nuevo: sin resultado memorizado, con el índice ya en memoria
+        importer = main.GameImporter(game_dir=game_path)
+        importer.game_path = game_path
+        start = time.perf_counter()
+        importer.detect_game_type()
+        warm = min(warm, time.perf_counter() - start)
+    return {
+        "cold": metric(cold * 1000, "ms"),
+        "warm": metric(warm * 1000, "ms"),
+        "files": metric(len(info["structure"]), "files", better="none"),
+        "max_rss": metric(max_rss_kb(), "KB")
+    }
+
+def case_status(workdir, args):
+    import main
+    client = main.create_app().test_client()
+    client.get('/api/status')
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.duration:
+        assert client.get('/api/status').status_code == 200
+        done += 1
+    return {"rps": metric(done / (time.perf_counter() - start), "req/s", better="higher"),
+            "max_rss": metric(max_rss_kb(), "KB")}
+
+def case_startup(workdir, args):
+    from bench_startup import measure
+    result = measure(args.repeat)
+    return {"import_ms": metric(result["import_ms"], "ms"),
+            "create_app_ms": metric(result["create_app_ms"], "ms")}
+
+def load_test(port, files, args):
+    from bench_game_server import client_loop, percentile
+    latencies = []
+    counters = {"bytes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=client_loop,
+                                args=(port, files, deadline, True, latencies, counters, lock))
+               for _ in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": metric(len(latencies) / elapsed, "req/s", better="higher"),
+        "mb_per_sec": metric(counters["bytes"] / elapsed / 1_000_000, "MB/s", better="higher"),
+        "p50": metric(percentile(latencies, 50) * 1000, "ms"),
+        "p99": metric(percentile(latencies, 99) * 1000, "ms"),
+        "errors": metric(counters["errors"], "errors"),
+        "max_rss": metric(max_rss_kb(), "KB")
+    }
+
+def case_static_flask(workdir, args):
+    import main
+    import serve
+    app = main.create_app()
+    main.importer.game_path = checkout(STATIC_FIXTURE, workdir)
+    server = serve.BoundedWSGIServer("127.0.0.1", 0, app, connections=args.clients,
+                                     handler=serve.QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        return load_test(server.server_port, [f"game/{f}" for f in STATIC_FILES], args)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def case_static_gameserver(workdir, args, pack=False):
+    from game_server import GameServer
+    server = GameServer(checkout(STATIC_FIXTURE, workdir), port=0, open_browser=False,
+                        log_requests=False, pack=pack)
+    server.create_web_server()
+    threading.Thread(target=server.server.serve_forever, daemon=True).start()
+    try:
+        return load_test(server.port, STATIC_FILES, args)
+    finally:
+        server.server.shutdown()
+        server.server.server_close()
+
+def run_case(case, args):
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    try:
+        kind, _, fixture = case.partition(":")
+        if kind == "import":
+            return case_import(fixture, workdir, args)
+        if kind == "detect":
+            return case_detect(fixture, workdir, args)
+        if case == "status":
+            return case_status(workdir, args)
+        if case == "static:flask":
+            return case_static_flask(workdir, args)
+        if case == "static:gameserver":
+            return case_static_gameserver(workdir, args)
+        if case == "static:pack":
+            return case_static_gameserver(workdir, args, pack=True)
+        if case == "startup":
+            return case_startup(workdir, args)
+        raise ValueError(f"Caso desconocido: {case}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+# --- Orquestación ---------------------------------------------------------------
+
+def case_list(fixtures):
+    cases = []
+    for fixture in fixtures:
+        cases += [f"import:{fixture}", f"detect:{fixture}"]
+    return cases + ["status", "static:flask", "static:gameserver", "static:pack",
+                    "startup"]
+
+def spawn_case(case, args):
+    """Ejecutar un caso en un proceso nuevo y devolver sus métricas"""
+    state_dir = tempfile.mkdtemp(prefix="bench-state-")
+    result_file = os.path.join(state_dir, "result.json")
+    # Estado, cachés e instancias fuera del árbol del proyecto
+    env = dict(os.environ,
+               SHARED_STATE_DIR=os.path.join(state_dir, "state"),
+               PROJECT_INDEX_DIR=os.path.join(state_dir, "index"),
+               DEPS_CACHE_DIR=os.path.join(state_dir, "deps"),
+               INSTANCES_DIR=os.path.join(state_dir, "games"))
+    command = [sys.executable, os.path.abspath(__file__), "--run-case", case,
+               "--result-file", result_file, "--duration", str(args.duration),
+               "--clients", str(args.clients), "--strategy", args.strategy,
+               "--repeat", str(args.repeat)]
+    try:
+        output = None if args.verbose else subprocess.DEVNULL
+        subprocess.run(command, cwd=ROOT, env=env, check=True, stdout=output, stderr=output)
+        with open(result_file) as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(baseline, current, threshold):
+    """Filas (métrica, antes, después, cambio, regresión) de las métricas comunes"""
+    rows = []
+    for name, new in sorted(current["metrics"].items()):
+        old = baseline["metrics"].get(name)
+        if not old or new["better"] == "none":
+            continue
+        if old["value"]:
+            change = (new["value"] - old["value"]) / old["value"]
+        else:
+            # Por ejemplo errores: de 0 a cualquier valor es una regresión
+            change = 0.0 if new["value"] == old["value"] else float("inf")
+        worse = change > threshold if new["better"] == "lower" else change < -threshold
+        worse = worse and abs(new["value"] - old["value"]) >= new.get("floor", 0)
+        rows.append((name, old["value"], new["value"], change, worse))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del importador y los servidores")
+    parser.add_argument("--fixtures", nargs="+", default=DEFAULT_FIXTURES, choices=list(FIXTURES))
+    parser.add_argument("--cases", nargs="+", help="Casos a ejecutar (por defecto todos)")
+    parser.add_argument("--duration", type=float, default=3.0,
+                        help="Segundos de los casos de throughput")
+    parser.add_argument("--clients", type=int, default=32, help="Clientes concurrentes")
+    parser.add_argument("--strategy", default="shallow", help="Estrategia de clonado")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Repeticiones de import y detect (se toma la mejor)")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="Resultados anteriores con los que comparar")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Empeoramiento relativo que cuenta como regresión (0.10 = 10%%)")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET_MS,
+                        help="Máximo de ms para import main en el caso startup (0 = sin límite)")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar la salida de cada caso")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        result = run_case(args.run_case, args)
+        with open(args.result_file, "w") as f:
+            json.dump(result, f)
+        return
+
+    cases = args.cases or case_list(args.fixtures)
+    for fixture in sorted({c.partition(":")[2] for c in cases if c.startswith(("import:", "detect:"))}
+                          | ({STATIC_FIXTURE} if any(c.startswith("static:") for c in cases) else set())):
+        print(f"Preparando fixture {fixture}...")
+        ensure_fixture(fixture)
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "duration": args.duration,
+            "clients": args.clients,
+            "strategy": args.strategy,
+            "repeat": args.repeat
+        },
+        "metrics": {}
+    }
+    for case in cases:
+        print(f"== {case}")
+        for name, value in spawn_case(case, args).items():
+            key = f"{case}.{name}"
+            results["metrics"][key] = value
+            print(f"   {name:<12} {value['value']:>14.3f} {value['unit']}")
+
+    failed = False
+    startup = results["metrics"].get("startup.import_ms")
+    if startup and args.startup_budget and startup["value"] > args.startup_budget:
+        print(f"import main tarda {startup['value']:.1f} ms, "
+              f"por encima del presupuesto de {args.startup_budget:.0f} ms")
+        failed = True
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, results, args.threshold)
+        print(f"\n=== Comparación con {args.baseline} "
+              f"({baseline['meta'].get('commit')}, umbral {args.threshold:.0%}) ===")
+        for name, old, new, change, worse in rows:
+            flag = "REGRESIÓN" if worse else ""
+            print(f"{name:<36} {old:>12.3f} -> {new:>12.3f} {change:>+8.1%} {flag}")
+        regressions = [row for row in rows if row[4]]
+        if regressions:
+            print(f"{len(regressions)} regresiones por encima del umbral")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
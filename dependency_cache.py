@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Caché de dependencias direccionada por contenido
+Guarda entornos ya instalados (paquetes de pip o node_modules) indexados por
+el hash de requirements / package-lock.json y los restaura copiándolos en
+lugar de volver a instalarlos. Son copias y no hardlinks: hay paquetes que
+modifican sus propios archivos (postinstall, parches, .pyc) y con un inodo
+compartido corromperían la entrada de la caché y los demás juegos. Donde el
+sistema de archivos lo admite (btrfs, XFS) la copia es un reflink que comparte
+los bloques hasta que se escribe.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+from metrics import registry
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+CACHE_REQUESTS = registry.counter("dependency_cache_requests_total",
+                                  "Restauraciones de dependencias por resultado",
+                                  ("kind", "result"))
+
+DEPS_CACHE_DIR = os.environ.get("DEPS_CACHE_DIR", "./.cache/deps")
+# Tamaño total máximo de la caché y antigüedad máxima de una entrada sin uso
+DEPS_CACHE_MAX_BYTES = int(os.environ.get("DEPS_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+DEPS_CACHE_MAX_AGE = int(os.environ.get("DEPS_CACHE_MAX_AGE", str(30 * 24 * 3600)))
+# Directorio local con wheels (pip) o caché de npm para instalar sin red
+DEPS_OFFLINE_DIR = os.environ.get("DEPS_OFFLINE_DIR")
+
+# Directorio (dentro del juego) donde se instalan los paquetes de Python
+PYTHON_PACKAGES_DIR = ".python_packages"
+
+# ioctl de Linux que clona un archivo compartiendo sus bloques (copy-on-write)
+FICLONE = 0x40049409
+
+def reflink(source, target):
+    """Clonar `source` en `target` con FICLONE; lanza OSError si no se admite"""
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source, target)
+
+def copy_tree(src, dst):
+    """Replicar `src` en `dst` con reflinks o, si no es posible, copiando"""
+    # Si el primer reflink falla el sistema de archivos no lo admite: no se reintenta
+    use_reflink = fcntl is not None and sys.platform.startswith("linux")
+    for root, dirs, files in os.walk(src):
+        rel_root = os.path.relpath(root, src)
+        target_root = os.path.normpath(os.path.join(dst, rel_root))
+        os.makedirs(target_root, exist_ok=True)
+        for name in dirs + files:
+            source = os.path.join(root, name)
+            target = os.path.join(target_root, name)
+            if os.path.islink(source):
+                # node_modules/.bin usa enlaces simbólicos relativos
+                if not os.path.lexists(target):
+                    os.symlink(os.readlink(source), target)
+            elif name in files:
+                if use_reflink:
+                    try:
+                        reflink(source, target)
+                        continue
+                    except OSError:
+                        use_reflink = False
+                shutil.copy2(source, target)
+        # os.walk no entra en enlaces simbólicos a directorios
+        dirs[:] = [d for d in dirs if not os.path.islink(os.path.join(root, d))]
+
+def tree_size(path):
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+def runtime_tag(kind):
+    """Identificador del intérprete para no mezclar entornos incompatibles"""
+    if kind == "python":
+        return f"{sys.implementation.cache_tag}-{sys.platform}-{platform.machine()}"
+    try:
+        version = subprocess.run(["node", "--version"], capture_output=True,
+                                 text=True, timeout=15).stdout.strip()
+    except (OSError, subprocess.TimeoutExpired):
+        version = "unknown"
+    return f"node-{version}-{sys.platform}-{platform.machine()}"
+
+class DependencyCache:
+    """Entornos instalados guardados por hash del manifiesto de dependencias"""
+
+    def __init__(self, root=DEPS_CACHE_DIR, max_bytes=DEPS_CACHE_MAX_BYTES,
+                 max_age=DEPS_CACHE_MAX_AGE, offline_dir=DEPS_OFFLINE_DIR):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.offline_dir = offline_dir
+
+    def key(self, kind, content):
+        digest = hashlib.sha256()
+        digest.update(runtime_tag(kind).encode())
+        digest.update(b"\0")
+        digest.update(content if isinstance(content, bytes) else content.encode())
+        return digest.hexdigest()[:32]
+
+    def entry_dir(self, kind, key):
+        return os.path.join(self.root, kind, key)
+
+    def restore(self, kind, key, dest):
+        """Restaurar una entrada en `dest`; devuelve False si no existe"""
+        entry = self.entry_dir(kind, key)
+        tree = os.path.join(entry, "tree")
+        if not os.path.isdir(tree):
+            return False
+        if os.path.exists(dest):
+            shutil.rmtree(dest)
+        copy_tree(tree, dest)
+        self._touch(entry)
+        return True
+
+    def store(self, kind, key, src):
+        """Guardar el entorno instalado en `src` bajo `key`"""
+        entry = self.entry_dir(kind, key)
+        if os.path.isdir(entry):
+            return
+        tmp_entry = f"{entry}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        copy_tree(src, os.path.join(tmp_entry, "tree"))
+        with open(os.path.join(tmp_entry, "meta.json"), "w") as f:
+            json.dump({"kind": kind, "size": tree_size(src), "created": time.time()}, f)
+        try:
+            os.replace(tmp_entry, entry)
+        except OSError:
+            # Otro proceso guardó la misma entrada primero
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self._touch(entry)
+        self.evict()
+
+    def _touch(self, entry):
+        """Marcar la entrada como usada (el mtime se usa para la antigüedad)"""
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+    def entries(self):
+        result = []
+        for kind in ("python", "node"):
+            kind_dir = os.path.join(self.root, kind)
+            if not os.path.isdir(kind_dir):
+                continue
+            for key in os.listdir(kind_dir):
+                entry = os.path.join(kind_dir, key)
+                meta_path = os.path.join(entry, "meta.json")
+                if key.endswith(".tmp") or not os.path.exists(meta_path):
+                    continue
+                try:
+                    with open(meta_path, "r") as f:
+                        meta = json.load(f)
+                    last_used = os.stat(entry).st_mtime
+                except (OSError, ValueError):
+                    continue
+                result.append({"kind": kind, "key": key, "path": entry,
+                               "size": meta.get("size", 0), "last_used": last_used})
+        return result
+
+    def evict(self):
+        """Eliminar entradas viejas y luego las menos usadas hasta caber en el límite"""
+        now = time.time()
+        entries = sorted(self.entries(), key=lambda e: e["last_used"])
+        removed = []
+        for entry in list(entries):
+            if now - entry["last_used"] > self.max_age:
+                shutil.rmtree(entry["path"], ignore_errors=True)
+                entries.remove(entry)
+                removed.append(entry["key"])
+        total = sum(e["size"] for e in entries)
+        while entries and total > self.max_bytes:
+            entry = entries.pop(0)
+            shutil.rmtree(entry["path"], ignore_errors=True)
+            total -= entry["size"]
+            removed.append(entry["key"])
+        return removed
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(e["size"] for e in entries),
+            "max_bytes": self.max_bytes,
+            "max_age": self.max_age,
+            "offline_dir": self.offline_dir
+        }
+
+    def pip_command(self, dependencies, dest):
+        args = [sys.executable, "-m", "pip", "install", "--target", dest]
+        if self.offline_dir:
+            args += ["--no-index", "--find-links", self.offline_dir]
+        return args + list(dependencies)
+
+    def npm_command(self, game_path):
+        has_lock = os.path.exists(os.path.join(game_path, "package-lock.json"))
+        args = ["npm", "ci" if has_lock else "install"]
+        if self.offline_dir:
+            # El directorio se usa como caché de npm (npm cache add <tarball> --cache DIR)
+            args += ["--offline", "--cache", self.offline_dir]
+        return args
+
+    def ensure(self, kind, content, dest, install):
+        """Restaurar `dest` desde la caché o instalarlo con `install()` y guardarlo.
+
+        `install` debe devolver True si la instalación terminó bien. Devuelve
+        "hit", "miss" o "failed".
+        """
+        result = self._ensure(kind, content, dest, install)
+        CACHE_REQUESTS.inc(kind=kind, result=result)
+        return result
+
+    def _ensure(self, kind, content, dest, install):
+        key = self.key(kind, content)
+        if self.restore(kind, key, dest):
+            return "hit"
+        if not install():
+            return "failed"
+        if os.path.isdir(dest):
+            self.store(kind, key, dest)
+        return "miss"
+
+    def ensure_python(self, game_path, dependencies, run=subprocess.run):
+        """Paquetes de Python del juego en <juego>/.python_packages"""
+        dest = os.path.join(game_path, PYTHON_PACKAGES_DIR)
+        content = "\n".join(sorted(d.strip() for d in dependencies if d.strip()))
+        install = lambda: run(self.pip_command(dependencies, dest)).returncode == 0
+        return self.ensure("python", content, dest, install)
+
+    def ensure_node(self, game_path, run=subprocess.run):
+        """node_modules del juego según package-lock.json (o package.json)"""
+        manifest = os.path.join(game_path, "package-lock.json")
+        if not os.path.exists(manifest):
+            manifest = os.path.join(game_path, "package.json")
+        with open(manifest, "rb") as f:
+            content = f.read()
+        dest = os.path.join(game_path, "node_modules")
+        install = lambda: run(self.npm_command(game_path), cwd=game_path).returncode == 0
+        return self.ensure("node", content, dest, install)
+
+dependency_cache = DependencyCache()
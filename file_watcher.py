@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Vigilancia de cambios en el directorio de un juego
+Usa inotify (vía ctypes, solo Linux) y, si no está disponible, compara
+periódicamente tamaños y mtimes. Los cambios se agrupan con un debounce para
+que ráfagas como un `npm install` lleguen como un único lote de rutas
+relativas; None en lugar del lote significa "puede haber cambiado todo"
+(cola de inotify desbordada, el directorio apareció o se cambió la versión
+activa) y obliga a revisar el árbol completo.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+
+from project_index import IGNORED_DIRS
+
+# auto (inotify si se puede, si no polling), inotify, polling u off
+WATCHER_BACKEND = os.environ.get("FILE_WATCHER", "auto")
+WATCHER_BACKENDS = ("auto", "inotify", "polling", "off")
+# Segundos sin eventos antes de entregar un lote
+WATCH_DEBOUNCE = float(os.environ.get("WATCH_DEBOUNCE", "0.2"))
+# Un lote se entrega como mucho a los WATCH_MAX_DELAY segundos de su primer evento
+WATCH_MAX_DELAY = float(os.environ.get("WATCH_MAX_DELAY", "2"))
+# Segundos entre recorridos del árbol en modo polling
+WATCH_POLL_INTERVAL = float(os.environ.get("WATCH_POLL_INTERVAL", "2"))
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")
+
+def load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+def ignored(rel_path, ignored_dirs):
+    return any(part in ignored_dirs for part in rel_path.split(os.sep))
+
+class InotifyBackend:
+    """Un watch de inotify por directorio; los directorios nuevos se añaden al vuelo"""
+
+    name = "inotify"
+
+    def __init__(self, root, ignored_dirs=IGNORED_DIRS):
+        self.root = root
+        self.ignored_dirs = ignored_dirs
+        self.libc = load_libc()
+        self.fd = None
+        self.watches = {}  # wd -> ruta relativa del directorio
+
+    def start(self):
+        if self.libc is None:
+            raise OSError("inotify no está disponible")
+        fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self.fd = fd
+        try:
+            self._add_tree("")
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, rel_dir):
+        path = os.path.join(self.root, rel_dir) if rel_dir else self.root
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            if errno in (2, 20):  # ENOENT, ENOTDIR: desapareció mientras se recorría
+                return
+            # ENOSPC: se alcanzó fs.inotify.max_user_watches
+            raise OSError(errno, f"inotify_add_watch falló en {path}")
+        self.watches[wd] = rel_dir
+
+    def _add_tree(self, rel_dir):
+        """Vigilar `rel_dir` y sus subdirectorios; devuelve las rutas encontradas"""
+        found = []
+        pending = [rel_dir]
+        while pending:
+            current = pending.pop()
+            self._add_watch(current)
+            try:
+                entries = os.scandir(os.path.join(self.root, current) if current else self.root)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    rel_path = os.path.join(current, entry.name) if current else entry.name
+                    found.append(rel_path)
+                    if (entry.is_dir(follow_symlinks=False)
+                            and entry.name not in self.ignored_dirs):
+                        pending.append(rel_path)
+        return found
+
+    def read(self, timeout):
+        """Rutas cambiadas en los próximos `timeout` segundos (None = todo)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length]
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            rel_dir = self.watches.get(wd)
+            if rel_dir is None:
+                continue
+            name = os.fsdecode(name.rstrip(b"\0"))
+            rel_path = os.path.join(rel_dir, name) if rel_dir and name else (name or rel_dir)
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if not rel_dir:
+                    return None  # Se eliminó o movió la raíz
+                continue
+            if rel_path and ignored(rel_path, self.ignored_dirs):
+                continue
+            changed.add(rel_path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # Lo que se creó dentro antes de añadir el watch no genera eventos
+                changed.update(self._add_tree(rel_path))
+        return changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        self.watches.clear()
+
+class PollingBackend:
+    """Compara tamaño y mtime de cada archivo cada `interval` segundos"""
+
+    name = "polling"
+
+    def __init__(self, root, ignored_dirs=IGNORED_DIRS, interval=WATCH_POLL_INTERVAL):
+        self.root = root
+        self.ignored_dirs = ignored_dirs
+        self.interval = interval
+        self.snapshot = {}
+        self.next_scan = 0
+
+    def _scan(self):
+        snapshot = {}
+        pending = [""]
+        while pending:
+            current = pending.pop()
+            try:
+                entries = os.scandir(os.path.join(self.root, current) if current else self.root)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    rel_path = os.path.join(current, entry.name) if current else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.ignored_dirs:
+                                pending.append(rel_path)
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    snapshot[rel_path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def start(self):
+        if not os.path.isdir(self.root):
+            raise OSError(f"{self.root} no existe")
+        self.snapshot = self._scan()
+        self.next_scan = time.monotonic() + self.interval
+
+    def read(self, timeout):
+        wait = self.next_scan - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0, wait))
+        self.next_scan = time.monotonic() + self.interval
+        snapshot = self._scan()
+        changed = {path for path, key in snapshot.items() if self.snapshot.get(path) != key}
+        changed.update(path for path in self.snapshot if path not in snapshot)
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        self.snapshot = {}
+
+class FileWatcher:
+    """Hilo que entrega a `on_change` lotes de rutas relativas cambiadas bajo `root`.
+
+    Si `root` es un enlace simbólico (releases) y pasa a apuntar a otro
+    directorio, se vuelve a vigilar el nuevo y se entrega None. `on_lost` se
+    llama cuando se deja de vigilar (root desapareció, cambió de destino o
+    falló el backend) para que quien dependa de los eventos vuelva a
+    comprobar el disco por su cuenta hasta el siguiente None.
+    """
+
+    def __init__(self, root, on_change, on_lost=None, backend=WATCHER_BACKEND,
+                 debounce=WATCH_DEBOUNCE, max_delay=WATCH_MAX_DELAY, ignored_dirs=IGNORED_DIRS,
+                 poll_interval=WATCH_POLL_INTERVAL):
+        self.root = root
+        self.on_change = on_change
+        self.on_lost = on_lost
+        self.requested_backend = backend
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.ignored_dirs = ignored_dirs
+        self.poll_interval = poll_interval
+        self.backend = None
+        self.target = None
+        self.batches = 0
+        self.full_rescans = 0
+        self.changed_paths = 0
+        self.last_batch_at = None
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.requested_backend == "off" or self._thread:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Detener el hilo; al cerrar el backend se llama a `on_lost`"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _open_backend(self):
+        """Backend sobre el destino actual de `root`, o None si no existe"""
+        if not os.path.isdir(self.root):
+            return None
+        if self.requested_backend in ("auto", "inotify"):
+            backend = InotifyBackend(self.root, self.ignored_dirs)
+            try:
+                backend.start()
+                return backend
+            except OSError as e:
+                if self.requested_backend == "inotify":
+                    raise
+                print(f"[FileWatcher] inotify no disponible ({e}), se usa polling")
+        backend = PollingBackend(self.root, self.ignored_dirs, self.poll_interval)
+        backend.start()
+        return backend
+
+    def _deliver(self, paths):
+        self.batches += 1
+        self.last_batch_at = time.time()
+        if paths is None:
+            self.full_rescans += 1
+        else:
+            self.changed_paths += len(paths)
+        try:
+            self.on_change(paths)
+        except Exception as e:
+            self.errors += 1
+            print(f"[FileWatcher] Error procesando cambios de {self.root}: {e}")
+
+    def _run(self):
+        pending = set()
+        full = False
+        first_event = last_event = None
+        while not self._stop.is_set():
+            target = os.path.realpath(self.root) if os.path.isdir(self.root) else None
+            if target != self.target or self.backend is None:
+                if self.backend:
+                    self._close_backend()
+                self.target = target
+                try:
+                    self.backend = self._open_backend()
+                except OSError as e:
+                    print(f"[FileWatcher] No se pudo vigilar {self.root}: {e}")
+                if self.backend is None:
+                    self._stop.wait(self.poll_interval)
+                    continue
+                # Lo anterior ya no es válido: revisar todo el árbol
+                self._deliver(None)
+                pending, full = set(), False
+                first_event = last_event = None
+
+            try:
+                changes = self.backend.read(self.debounce)
+            except OSError as e:
+                print(f"[FileWatcher] Error leyendo cambios de {self.root}: {e}")
+                self._close_backend()
+                continue
+
+            now = time.monotonic()
+            if changes is None or changes:
+                if changes is None:
+                    full = True
+                else:
+                    pending |= changes
+                first_event = first_event or now
+                last_event = now
+            if first_event and (now - last_event >= self.debounce
+                                or now - first_event >= self.max_delay):
+                self._deliver(None if full else pending)
+                pending, full = set(), False
+                first_event = last_event = None
+
+        if self.backend:
+            self._close_backend()
+
+    def _close_backend(self):
+        self.backend.close()
+        self.backend = None
+        if self.on_lost:
+            self.on_lost()
+
+    def stats(self):
+        return {
+            "root": self.root,
+            "target": self.target,
+            "backend": self.backend.name if self.backend else None,
+            "watches": len(self.backend.watches) if isinstance(self.backend, InotifyBackend) else None,
+            "batches": self.batches,
+            "full_rescans": self.full_rescans,
+            "changed_paths": self.changed_paths,
+            "last_batch_at": self.last_batch_at,
+            "errors": self.errors
+        }
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Generador de carga multijugador para juegos con Socket.IO
+Simula N bots que se conectan al servidor del juego (Socket.IO v4 sobre
+WebSocket, implementado con la biblioteca estándar) y envían `newPlayer`,
+`move` y `ability` a un ritmo configurable. Mide la latencia de difusión
+(move -> state propio, ability -> ability reenviada), los mensajes por
+segundo y el tamaño de los payloads recibidos.
+
+Puede lanzar el juego con el mismo supervisor que usa GameServer:
+    python game_load.py --launch ./hardcore_ninja_game --bots 10 25 50
+o atacar un servidor ya en marcha:
+    python game_load.py --url http://localhost:3000 --bots 50 --rate 20
+"""
+
+import argparse
+import base64
+import json
+import multiprocessing
+import os
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_RATE = 10           # move por segundo y bot
+DEFAULT_ABILITY_RATE = 0.5  # ability por segundo y bot
+DEFAULT_DURATION = 15
+# Segundos para que todos los bots se conecten al inicio de cada etapa
+DEFAULT_RAMP = 3
+
+class SocketIOError(Exception):
+    pass
+
+class SocketIOClient:
+    """Cliente Socket.IO v4 (Engine.IO 4) mínimo sobre WebSocket"""
+
+    def __init__(self, host, port, path="/socket.io/", timeout=10):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.timeout = timeout
+        self.sock = None
+        self.sid = None
+        self.buffer = b""
+
+    def connect(self):
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.sock.sendall((
+            f"GET {self.path}?EIO=4&transport=websocket HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode())
+        while b"\r\n\r\n" not in self.buffer:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise SocketIOError("Conexión cerrada durante el handshake")
+            self.buffer += chunk
+        head, self.buffer = self.buffer.split(b"\r\n\r\n", 1)
+        status_line = head.split(b"\r\n", 1)[0].decode(errors="replace")
+        if " 101 " not in status_line:
+            raise SocketIOError(f"Handshake rechazado: {status_line}")
+
+        # Engine.IO: "0{sid,...}"; Socket.IO: conectar al namespace "/"
+        packet = self.receive()
+        if not packet or packet[0] != "0":
+            raise SocketIOError(f"Paquete de apertura inesperado: {packet!r}")
+        self.send_text("40")
+        while True:
+            packet = self.receive()
+            if packet is None:
+                raise SocketIOError("Conexión cerrada antes de unirse al namespace")
+            if packet.startswith("40"):
+                self.sid = json.loads(packet[2:] or "{}").get("sid")
+                return self
+            if packet.startswith("44"):
+                raise SocketIOError(f"Conexión rechazada: {packet[2:]}")
+            self.handle_control(packet)
+
+    def handle_control(self, packet):
+        """Responder a los paquetes de Engine.IO; devuelve True si se consumió"""
+        if packet == "2":
+            self.send_text("3")  # ping -> pong
+            return True
+        if packet == "1":
+            raise SocketIOError("El servidor cerró la sesión")
+        return False
+
+    def emit(self, event, data):
+        self.send_text("42" + json.dumps([event, data], separators=(",", ":")))
+
+    def send_text(self, text):
+        payload = text.encode()
+        mask = os.urandom(4)
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x81, 0x80 | length)
+        elif length < 65536:
+            header = struct.pack("!BBH", 0x81, 0x80 | 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x81, 0x80 | 127, length)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self.sock.sendall(header + mask + masked)
+
+    def pending(self):
+        """Hay datos ya leídos o listos en el socket"""
+        return bool(self.buffer) or bool(select.select([self.sock], [], [], 0)[0])
+
+    def _read(self, size):
+        while len(self.buffer) < size:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise SocketIOError("Conexión cerrada por el servidor")
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def receive(self):
+        """Siguiente mensaje de texto (paquete de Engine.IO) o None si se cerró"""
+        message = b""
+        while True:
+            first, second = self._read(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self._read(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self._read(8))[0]
+            payload = self._read(length)
+            if opcode == 0x8:
+                return None
+            if opcode == 0x9:
+                self.sock.sendall(struct.pack("!BB", 0x8A, 0x80) + os.urandom(4))
+                continue
+            if opcode in (0x1, 0x0):
+                message += payload
+                if first & 0x80:
+                    return message.decode()
+
+    def close(self):
+        if self.sock:
+            try:
+                self.sock.sendall(struct.pack("!BB", 0x88, 0x80) + os.urandom(4))
+            except OSError:
+                pass
+            self.sock.close()
+            self.sock = None
+
+def new_stats():
+    return {"connected": 0, "connect_errors": 0, "disconnects": 0, "connect_times": [],
+            "sent": 0, "received": 0, "bytes_received": 0, "state_sizes": [],
+            "move_latencies": [], "ability_latencies": []}
+
+def merge_stats(total, stats):
+    for key, value in stats.items():
+        total[key] = total.get(key, [] if isinstance(value, list) else 0) + value
+    return total
+
+class Bot:
+    """Un jugador simulado: se une, se mueve y usa habilidades"""
+
+    def __init__(self, index, host, port, rate, ability_rate, start_at, deadline, stats, lock):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.ability_rate = ability_rate
+        self.start_at = start_at
+        self.deadline = deadline
+        self.stats = stats
+        self.lock = lock
+        self.rng = random.Random(index)
+        # Posiciones enviadas pendientes de verse en un "state": (x, y) -> instante
+        self.pending_moves = {}
+        self.local = new_stats()
+
+    def run(self):
+        time.sleep(max(0, self.start_at - time.time()))
+        client = SocketIOClient(self.host, self.port)
+        started = time.perf_counter()
+        try:
+            client.connect()
+        except (OSError, SocketIOError):
+            self.local["connect_errors"] += 1
+            self.flush()
+            return
+        self.local["connected"] += 1
+        self.local["connect_times"].append(time.perf_counter() - started)
+        try:
+            self.loop(client)
+        except (OSError, SocketIOError):
+            self.local["disconnects"] += 1
+        finally:
+            client.close()
+            self.flush()
+
+    def loop(self, client):
+        x, y = self.rng.randint(0, 2000), self.rng.randint(0, 2000)
+        client.emit("newPlayer", {"x": x, "y": y, "name": f"bot{self.index}",
+                                  "color": "#%06x" % self.rng.randint(0, 0xFFFFFF)})
+        self.local["sent"] += 1
+        interval = 1.0 / self.rate if self.rate > 0 else None
+        next_move = time.perf_counter() + (interval or 0)
+        needle_prefix = f'"id":"{client.sid}","x":'
+
+        while time.time() < self.deadline:
+            now = time.perf_counter()
+            if interval and now >= next_move:
+                # Coordenadas enteras: JSON.stringify las escribe igual que Python
+                x = (x + self.rng.randint(1, 7)) % 4000
+                y = (y + self.rng.randint(1, 7)) % 4000
+                self.pending_moves[(x, y)] = now
+                client.emit("move", {"x": x, "y": y})
+                self.local["sent"] += 1
+                if self.ability_rate and self.rng.random() < self.ability_rate / self.rate:
+                    client.emit("ability", {"type": "dash", "sentAt": time.time()})
+                    self.local["sent"] += 1
+                next_move += interval
+                if next_move < now:
+                    next_move = now + interval  # El bot no da abasto: no acumular
+
+            timeout = max(0.0, min(next_move - time.perf_counter(), 0.05)) if interval else 0.05
+            if not client.pending() and not select.select([client.sock], [], [], timeout)[0]:
+                continue
+            packet = client.receive()
+            if packet is None:
+                raise SocketIOError("Conexión cerrada por el servidor")
+            if client.handle_control(packet) or not packet.startswith("42"):
+                continue
+            self.on_event(packet, needle_prefix)
+
+    def on_event(self, packet, needle_prefix):
+        received = time.perf_counter()
+        self.local["received"] += 1
+        self.local["bytes_received"] += len(packet)
+        if packet.startswith('42["state"'):
+            self.local["state_sizes"].append(len(packet))
+            # Búsqueda de texto en lugar de json.loads: con muchos bots el
+            # cliente parsearía N² mensajes y sería él el cuello de botella
+            matched = None
+            for (x, y), sent in self.pending_moves.items():
+                if f'{needle_prefix}{x},"y":{y},' in packet:
+                    matched = sent
+            if matched is not None:
+                self.local["move_latencies"].append(received - matched)
+                # El estado ya refleja este movimiento: los anteriores no llegarán
+                self.pending_moves = {k: v for k, v in self.pending_moves.items() if v > matched}
+        elif packet.startswith('42["ability"'):
+            try:
+                data = json.loads(packet[2:])[1]
+                self.local["ability_latencies"].append(time.time() - data["sentAt"])
+            except (ValueError, KeyError, IndexError, TypeError):
+                pass
+
+    def flush(self):
+        with self.lock:
+            merge_stats(self.stats, self.local)
+        self.local = new_stats()
+
+def run_bots(args):
+    """Ejecutar un grupo de bots en hilos (cuerpo de cada proceso cliente)"""
+    host, port, indexes, rate, ability_rate, start_at, ramp, deadline = args
+    stats = new_stats()
+    lock = threading.Lock()
+    threads = []
+    for position, index in enumerate(indexes):
+        # Conexiones repartidas a lo largo de la rampa
+        offset = ramp * position / max(1, len(indexes))
+        bot = Bot(index, host, port, rate, ability_rate, start_at + offset, deadline, stats, lock)
+        thread = threading.Thread(target=bot.run, daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return stats
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def run_stage(host, port, bots, rate, ability_rate, duration, ramp, processes):
+    """Una etapa de carga con `bots` jugadores; devuelve el resumen"""
+    processes = max(1, min(processes, bots))
+    start_at = time.time() + 0.5
+    deadline = start_at + ramp + duration
+    groups = [list(range(i, bots, processes)) for i in range(processes)]
+    jobs = [(host, port, group, rate, ability_rate, start_at, ramp, deadline) for group in groups]
+    if processes == 1:
+        results = [run_bots(jobs[0])]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(run_bots, jobs)
+    stats = new_stats()
+    for result in results:
+        merge_stats(stats, result)
+
+    # Las tasas se calculan sobre toda la etapa, rampa incluida
+    elapsed = ramp + duration
+    sizes = stats["state_sizes"]
+    return {
+        "bots": bots,
+        "connected": stats["connected"],
+        "connect_errors": stats["connect_errors"],
+        "disconnects": stats["disconnects"],
+        "connect_p50_ms": percentile(stats["connect_times"], 50) * 1000,
+        "sent_per_sec": stats["sent"] / elapsed,
+        "target_sent_per_sec": bots * (rate + ability_rate),
+        "received_per_sec": stats["received"] / elapsed,
+        "received_mb_per_sec": stats["bytes_received"] / elapsed / 1_000_000,
+        "state_bytes_mean": sum(sizes) / len(sizes) if sizes else 0,
+        "state_bytes_max": max(sizes) if sizes else 0,
+        "move_latency_p50_ms": percentile(stats["move_latencies"], 50) * 1000,
+        "move_latency_p99_ms": percentile(stats["move_latencies"], 99) * 1000,
+        "move_latency_samples": len(stats["move_latencies"]),
+        "ability_latency_p50_ms": percentile(stats["ability_latencies"], 50) * 1000,
+        "ability_latency_p99_ms": percentile(stats["ability_latencies"], 99) * 1000
+    }
+
+def format_stage(result):
+    return (f"{result['bots']:>5} bots  conectados {result['connected']:>4}"
+            f" (errores {result['connect_errors']}, caídas {result['disconnects']})\n"
+            f"      enviados {result['sent_per_sec']:9.1f}/s (objetivo {result['target_sent_per_sec']:.1f}/s)"
+            f"  recibidos {result['received_per_sec']:9.1f}/s"
+            f"  {result['received_mb_per_sec']:7.2f} MB/s\n"
+            f"      state {result['state_bytes_mean']:8.0f} B de media, {result['state_bytes_max']} B máx"
+            f"  move->state p50 {result['move_latency_p50_ms']:7.1f} ms p99 {result['move_latency_p99_ms']:7.1f} ms"
+            f"  ability p50 {result['ability_latency_p50_ms']:7.1f} ms p99 {result['ability_latency_p99_ms']:7.1f} ms")
+
+def launch_game(game_path, port):
+    """Lanzar el juego con el supervisor de GameServer y esperar a que escuche"""
+    from game_server import GameServer
+    supervisor = GameServer(game_path, port=port, open_browser=False).create_supervisor()
+    if not supervisor:
+        raise SystemExit("Tipo de juego no soportado")
+    supervisor.start()
+    deadline = time.monotonic() + supervisor.startup_timeout + 5
+    while supervisor.state != "running":
+        if supervisor.state == "failed" or time.monotonic() > deadline:
+            for record in supervisor.output_since(0)[-20:]:
+                print(record["line"])
+            supervisor.stop()
+            raise SystemExit("El juego no llegó a aceptar conexiones")
+        time.sleep(0.2)
+    print(f"Juego en marcha en el puerto {port} (inicio en {supervisor.startup_latency} s)")
+    return supervisor
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Carga multijugador sintética para el servidor Socket.IO del juego",
+        epilog="Ejemplo: python game_load.py --launch ./hardcore_ninja_game --bots 10 25 50"
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Servidor ya en marcha (p. ej. http://localhost:3000)")
+    target.add_argument("--launch", metavar="GAME_PATH",
+                        help="Lanzar el juego con el supervisor de GameServer")
+    parser.add_argument("--port", type=int, default=3100, help="Puerto para --launch")
+    parser.add_argument("--bots", type=int, nargs="+", default=[10],
+                        help="Bots por etapa; varias cifras ejecutan varias etapas")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="move por segundo y bot")
+    parser.add_argument("--ability-rate", type=float, default=DEFAULT_ABILITY_RATE,
+                        help="ability por segundo y bot")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION,
+                        help="Segundos de cada etapa tras la rampa")
+    parser.add_argument("--ramp", type=float, default=DEFAULT_RAMP,
+                        help="Segundos para conectar a todos los bots")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                        help="Procesos cliente entre los que se reparten los bots")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    supervisor = None
+    if args.launch:
+        supervisor = launch_game(args.launch, args.port)
+        host, port = "127.0.0.1", args.port
+    else:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or (443 if url.scheme == "https" else 80)
+
+    results = []
+    try:
+        for bots in args.bots:
+            print(f"=== Etapa: {bots} bots, {args.rate} move/s, {args.ability_rate} ability/s, "
+                  f"{args.duration}s ===")
+            result = run_stage(host, port, bots, args.rate, args.ability_rate,
+                               args.duration, args.ramp, args.processes)
+            results.append(result)
+            print(format_stage(result))
+    finally:
+        if supervisor:
+            supervisor.stop()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"target": f"{host}:{port}", "rate": args.rate,
+                       "ability_rate": args.ability_rate, "stages": results}, f, indent=2)
+        print(f"Resultados guardados en {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -7,17 +7,95 @@ Alternativa para servir juegos que requieren servidor específico
 import os
 import sys
 import json
+import signal
+import argparse
 import subprocess
 from pathlib import Path
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import HTTPServer, ThreadingHTTPServer
 import socketserver
 import threading
+import time
 import webbrowser
 
+import project_index
+from asset_pack import ASSET_PACK, AssetPack, PackRequestHandler, ensure_pack
+from dependency_cache import dependency_cache, PYTHON_PACKAGES_DIR
+from supervisor import Supervisor
+from static_files import CachingRequestHandler
+
+# Modos del servidor web: "simple" atiende una petición a la vez (HTTP/1.0),
+# "threaded" usa un hilo por conexión con keep-alive (HTTP/1.1)
+SERVER_MODES = ("simple", "threaded")
+# Conexiones atendidas a la vez en modo threaded; con el máximo alcanzado las
+# nuevas esperan en el backlog del socket
+DEFAULT_CONNECTIONS = 256
+DEFAULT_BACKLOG = 128
+# Segundos que una conexión keep-alive inactiva puede ocupar un hilo
+DEFAULT_KEEPALIVE_TIMEOUT = 15
+
+class BoundedHTTPServer(ThreadingHTTPServer):
+    """Servidor HTTP con un hilo por conexión y un máximo de conexiones.
+    
+    Una conexión keep-alive inactiva ocupa solo su propio hilo; al llegar a
+    `connections` el bucle deja de aceptar y las nuevas esperan en el backlog.
+    """
+    
+    # La espera al cerrar la hace server_close() con las plazas del semáforo
+    block_on_close = False
+    
+    def __init__(self, server_address, handler_class, connections=DEFAULT_CONNECTIONS,
+                 backlog=DEFAULT_BACKLOG):
+        self.request_queue_size = backlog
+        self.connections = connections
+        self.slots = threading.BoundedSemaphore(connections)
+        self.stopping = False
+        super().__init__(server_address, handler_class)
+    
+    def process_request(self, request, client_address):
+        # Esperar una plaza sin bloquear shutdown() indefinidamente
+        while not self.slots.acquire(timeout=0.5):
+            if self.stopping:
+                self.shutdown_request(request)
+                return
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            self.slots.release()
+            raise
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.slots.release()
+    
+    def shutdown(self):
+        self.stopping = True
+        super().shutdown()
+    
+    def server_close(self):
+        """Cerrar el socket y esperar a que terminen las conexiones en curso"""
+        super().server_close()
+        for _ in range(self.connections):
+            self.slots.acquire()
+        for _ in range(self.connections):
+            self.slots.release()
+
 class GameServer:
-    def __init__(self, game_path, port=8000):
+    def __init__(self, game_path, port=8000, mode="threaded", connections=DEFAULT_CONNECTIONS,
+                 backlog=DEFAULT_BACKLOG, keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+                 open_browser=True, log_requests=True, pack=ASSET_PACK):
         self.game_path = Path(game_path)
         self.port = port
+        self.mode = mode
+        self.connections = connections
+        self.backlog = backlog
+        self.keepalive_timeout = keepalive_timeout
+        self.open_browser = open_browser
+        self.log_requests = log_requests
+        # Servir desde un paquete mapeado en memoria en lugar del directorio
+        self.pack = pack
+        self.asset_pack = None
         self.server = None
         self.game_info = None
         
@@ -33,49 +111,98 @@ class GameServer:
             "start_command": None
         }
         
-        # Buscar archivos principales
-        for file_path in self.game_path.rglob("*"):
-            if file_path.is_file():
-                name = file_path.name.lower()
+        # Buscar archivos principales (los más cercanos a la raíz primero)
+        index = project_index.get_index(self.game_path)
+        entries = index.entries()
+        for rel_path in sorted(entries, key=lambda path: (path.count(os.sep), path)):
+            file_path = self.game_path / rel_path
+            role = entries[rel_path][2]
+            
+            # HTML/JavaScript game
+            if role == "entry":
+                game_info["type"] = "web"
+                game_info["main_file"] = rel_path
+                game_info["server_required"] = True
+                break
                 
-                # HTML/JavaScript game
-                if name in ['index.html', 'game.html', 'main.html']:
-                    game_info["type"] = "web"
-                    game_info["main_file"] = str(file_path.relative_to(self.game_path))
-                    game_info["server_required"] = True
-                    break
-                    
-                # Python game
-                elif name in ['main.py', 'game.py', 'app.py']:
-                    game_info["type"] = "python"
-                    game_info["main_file"] = str(file_path.relative_to(self.game_path))
-                    game_info["start_command"] = [sys.executable, str(file_path)]
-                    break
-                    
-                # Node.js game
-                elif name == 'package.json':
-                    try:
-                        with open(file_path, 'r') as f:
-                            package_data = json.load(f)
-                            game_info["type"] = "node"
-                            game_info["main_file"] = package_data.get("main", "index.js")
-                            game_info["start_command"] = ["node", game_info["main_file"]]
-                            break
-                    except:
-                        continue
+            # Python game
+            elif role == "python_entry":
+                game_info["type"] = "python"
+                game_info["main_file"] = rel_path
+                # Ruta relativa: el proceso se lanza con cwd en el directorio del juego
+                game_info["start_command"] = [sys.executable, rel_path]
+                break
+                
+            # Node.js game
+            elif role == "manifest":
+                try:
+                    with open(file_path, 'r') as f:
+                        package_data = json.load(f)
+                        game_info["type"] = "node"
+                        game_info["main_file"] = package_data.get("main", "index.js")
+                        game_info["start_command"] = ["node", game_info["main_file"]]
+                        break
+                except:
+                    continue
         
         self.game_info = game_info
         return game_info
     
-    def start_web_server(self):
-        """Iniciar servidor web para juegos HTML/JS"""
-        class GameHTTPRequestHandler(SimpleHTTPRequestHandler):
+    def create_web_server(self):
+        """Crear el servidor HTTP según el modo configurado (sin iniciarlo)"""
+        game_path = str(self.game_path)
+        log_requests = self.log_requests
+        base_handler = CachingRequestHandler
+        if self.pack:
+            self.asset_pack = AssetPack(ensure_pack(game_path))
+            base_handler = PackRequestHandler
+        asset_pack = self.asset_pack
+        
+        class GameHTTPRequestHandler(base_handler):
+            pack = asset_pack
+            
             def __init__(self, *args, **kwargs):
-                super().__init__(*args, directory=str(self.game_path), **kwargs)
+                super().__init__(*args, directory=game_path, **kwargs)
+            
+            def log_message(self, format, *args):
+                if log_requests:
+                    super().log_message(format, *args)
         
-        try:
+        if self.mode == "threaded":
+            # HTTP/1.1 mantiene la conexión abierta entre peticiones; el timeout
+            # libera el hilo si el cliente deja la conexión inactiva
+            GameHTTPRequestHandler.protocol_version = "HTTP/1.1"
+            GameHTTPRequestHandler.timeout = self.keepalive_timeout
+            # Cabeceras y cuerpo van en escrituras separadas: con Nagle y el ACK
+            # retardado del cliente cada respuesta en keep-alive esperaría ~40 ms
+            GameHTTPRequestHandler.disable_nagle_algorithm = True
+            self.server = BoundedHTTPServer(('0.0.0.0', self.port), GameHTTPRequestHandler,
+                                            connections=self.connections, backlog=self.backlog)
+        else:
             self.server = HTTPServer(('0.0.0.0', self.port), GameHTTPRequestHandler)
-            print(f"Servidor web iniciado en puerto {self.port}")
+        
+        # Con puerto 0 el sistema asigna uno libre
+        self.port = self.server.server_address[1]
+        return self.server
+    
+    def stop(self):
+        """Detener el servidor web de forma ordenada"""
+        if self.server:
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+    
+    def start_web_server(self):
+        """Iniciar servidor web para juegos HTML/JS"""
+        try:
+            self.create_web_server()
+            if threading.current_thread() is threading.main_thread():
+                signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+            
+            print(f"Servidor web iniciado en puerto {self.port} (modo {self.mode})")
+            if self.asset_pack:
+                print(f"Sirviendo desde el paquete {self.asset_pack.path} "
+                      f"({len(self.asset_pack.files)} archivos)")
+            if self.mode == "threaded":
+                print(f"Conexiones: {self.connections}, backlog: {self.backlog}")
             print(f"Accede al juego en: http://localhost:{self.port}")
             
             if self.game_info and self.game_info.get("main_file"):
@@ -84,10 +211,11 @@ class GameServer:
                 print(f"URL del juego: {game_url}")
                 
                 # Intentar abrir en navegador (opcional)
-                try:
-                    webbrowser.open(game_url)
-                except:
-                    pass
+                if self.open_browser:
+                    try:
+                        webbrowser.open(game_url)
+                    except:
+                        pass
             
             self.server.serve_forever()
             
@@ -97,57 +225,99 @@ class GameServer:
             print(f"Error en el servidor: {e}")
         finally:
             if self.server:
-                self.server.shutdown()
+                # serve_forever ya terminó; se cierra el socket y se esperan
+                # las peticiones en curso
+                self.server.server_close()
     
-    def start_python_game(self):
-        """Ejecutar juego de Python"""
-        if not self.game_info or not self.game_info.get("start_command"):
+    def install_node_dependencies(self, run=subprocess.run):
+        """Instalar o restaurar node_modules si falta; `run` ejecuta npm"""
+        node_modules = self.game_path / "node_modules"
+        if node_modules.exists():
+            return
+        print("Instalando dependencias de Node.js...")
+        # Se restaura node_modules desde la caché si el lockfile ya se instaló antes
+        result = dependency_cache.ensure_node(str(self.game_path), run=run)
+        if result == "hit":
+            print("Dependencias restauradas desde la caché")
+        elif result == "failed":
+            print("Advertencia: npm no pudo instalar las dependencias")
+    
+    def create_supervisor(self):
+        """Crear un Supervisor con el comando de inicio del juego detectado"""
+        game_info = self.game_info or self.detect_game_type()
+        if not game_info:
+            return None
+        
+        env = os.environ.copy()
+        env["PORT"] = str(self.port)
+        # Sin buffer para que la salida llegue al supervisor línea a línea
+        env["PYTHONUNBUFFERED"] = "1"
+        port = self.port
+        prepare = None
+        
+        if game_info["type"] == "web":
+            # Los juegos estáticos se sirven con este mismo script en modo threaded
+            command = [sys.executable, os.path.abspath(__file__), str(self.game_path.resolve()),
+                       str(self.port), "--no-browser", "--quiet"]
+            if self.pack:
+                command.append("--pack")
+        elif game_info["type"] == "python" and game_info.get("start_command"):
+            command = game_info["start_command"]
+            # No se sabe si un juego de Python abre un puerto: solo se vigila el proceso
+            port = None
+            # Las dependencias instaladas al importar viven en .python_packages
+            packages_dir = self.game_path.resolve() / PYTHON_PACKAGES_DIR
+            if packages_dir.exists():
+                env["PYTHONPATH"] = os.pathsep.join(
+                    filter(None, [str(packages_dir), env.get("PYTHONPATH")]))
+        elif game_info["type"] == "node" and game_info.get("start_command"):
+            command = game_info["start_command"]
+            # Con el `run` del supervisor, stop() interrumpe la instalación
+            prepare = self.install_node_dependencies
+        else:
+            return None
+        
+        return Supervisor(command, cwd=self.game_path.resolve(), port=port, env=env,
+                          prepare=prepare, name=self.game_path.name)
+    
+    def run_supervised(self):
+        """Ejecutar el juego bajo el supervisor mostrando su salida"""
+        supervisor = self.create_supervisor()
+        if not supervisor:
             print("No se pudo determinar el comando de inicio")
             return
-            
+        
+        print(f"Ejecutando: {' '.join(supervisor.command)}")
+        supervisor.start()
+        seq = 0
         try:
-            print(f"Ejecutando: {' '.join(self.game_info['start_command'])}")
-            # Cambiar al directorio del juego
-            original_cwd = os.getcwd()
-            os.chdir(self.game_path)
-            
-            # Ejecutar el juego
-            subprocess.run(self.game_info["start_command"])
-            
+            while supervisor.alive:
+                for record in supervisor.output_since(seq):
+                    seq = record["seq"]
+                    print(record["line"])
+                time.sleep(0.2)
         except KeyboardInterrupt:
             print("\nJuego detenido por el usuario")
         except Exception as e:
             print(f"Error ejecutando el juego: {e}")
         finally:
-            os.chdir(original_cwd)
+            supervisor.stop()
+            status = supervisor.status()
+            print(f"Reinicios: {status['restarts']}, latencia de inicio: {status['startup_latency']} s")
+    
+    def start_python_game(self):
+        """Ejecutar juego de Python"""
+        if not self.game_info or not self.game_info.get("start_command"):
+            print("No se pudo determinar el comando de inicio")
+            return
+        self.run_supervised()
     
     def start_node_game(self):
         """Ejecutar juego de Node.js"""
         if not self.game_info or not self.game_info.get("start_command"):
             print("No se pudo determinar el comando de inicio")
             return
-            
-        try:
-            # Verificar si npm install es necesario
-            node_modules = self.game_path / "node_modules"
-            if not node_modules.exists():
-                print("Instalando dependencias de Node.js...")
-                subprocess.run(["npm", "install"], cwd=self.game_path)
-            
-            print(f"Ejecutando: {' '.join(self.game_info['start_command'])}")
-            # Cambiar al directorio del juego
-            original_cwd = os.getcwd()
-            os.chdir(self.game_path)
-            
-            # Ejecutar el juego
-            subprocess.run(self.game_info["start_command"])
-            
-        except KeyboardInterrupt:
-            print("\nJuego detenido por el usuario")
-        except Exception as e:
-            print(f"Error ejecutando el juego: {e}")
-        finally:
-            os.chdir(original_cwd)
+        self.run_supervised()
     
     def start(self):
         """Iniciar el servidor apropiado según el tipo de juego"""
@@ -177,20 +347,37 @@ class GameServer:
         else:
             print("Tipo de juego no soportado o no detectado")
             print("Archivos en el directorio:")
-            for file_path in self.game_path.rglob("*"):
-                if file_path.is_file():
-                    print(f"  - {file_path.relative_to(self.game_path)}")
+            for rel_path in project_index.get_index(self.game_path).paths():
+                print(f"  - {rel_path}")
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python game_server.py <directorio_del_juego> [puerto]")
-        print("Ejemplo: python game_server.py ./hardcore_ninja_game 8000")
-        sys.exit(1)
-    
-    game_path = sys.argv[1]
-    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    parser = argparse.ArgumentParser(
+        description="Servidor dedicado para juegos importados",
+        epilog="Ejemplo: python game_server.py ./hardcore_ninja_game 8000 --connections 512"
+    )
+    parser.add_argument("game_path", help="Directorio del juego")
+    parser.add_argument("port", nargs="?", type=int, default=8000, help="Puerto (por defecto 8000)")
+    parser.add_argument("--mode", choices=SERVER_MODES, default="threaded",
+                        help="Modo del servidor web (por defecto threaded)")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help="Conexiones simultáneas (un hilo cada una) en modo threaded")
+    parser.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG,
+                        help="Conexiones pendientes admitidas por el socket")
+    parser.add_argument("--keepalive-timeout", type=float, default=DEFAULT_KEEPALIVE_TIMEOUT,
+                        help="Segundos antes de cerrar una conexión keep-alive inactiva")
+    parser.add_argument("--no-browser", action="store_true",
+                        help="No abrir el navegador al iniciar")
+    parser.add_argument("--quiet", action="store_true",
+                        help="No imprimir cada petición HTTP")
+    parser.add_argument("--pack", action="store_true", default=ASSET_PACK,
+                        help="Servir desde el paquete de assets (se construye si falta)")
+    args = parser.parse_args()
     
-    server = GameServer(game_path, port)
+    server = GameServer(args.game_path, args.port, mode=args.mode,
+                        connections=args.connections,
+                        backlog=args.backlog, keepalive_timeout=args.keepalive_timeout,
+                        open_browser=not args.no_browser, log_requests=not args.quiet,
+                        pack=args.pack)
     server.start()
 
 if __name__ == "__main__":
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Caché local de objetos de git compartida por todas las importaciones
+Mantiene un repositorio bare (espejo) por cada repositorio de origen, que se
+actualiza con un fetch incremental; las importaciones clonan desde el espejo
+en local en lugar de descargar todos los objetos otra vez. Al crear el espejo
+de un fork se toman prestados los objetos de los espejos con el mismo nombre
+de repositorio, así que solo se descarga lo que difiere. Las importaciones
+superficiales usan un espejo superficial (--depth 1, solo ramas), que se
+completa la primera vez que se pide el historial entero.
+
+Los espejos se comparten entre procesos (workers, instancias) y se protegen
+con flock. Sin fcntl (Windows) no hay bloqueos entre procesos: la caché se
+desactiva en lugar de arriesgarse a que dos procesos escriban el mismo espejo.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin flock la caché queda desactivada
+    fcntl = None
+
+from dependency_cache import tree_size
+from metrics import registry
+
+CACHE_REQUESTS = registry.counter("git_cache_requests_total",
+                                  "Usos de la caché de objetos de git por resultado", ("result",))
+
+GIT_CACHE_ENABLED = os.environ.get("GIT_CACHE", "1") == "1"
+GIT_CACHE_DIR = os.environ.get("GIT_CACHE_DIR", "./.cache/git")
+# Tamaño total máximo de los espejos y antigüedad máxima de uno sin uso
+GIT_CACHE_MAX_BYTES = int(os.environ.get("GIT_CACHE_MAX_BYTES", str(5 * 1024 ** 3)))
+GIT_CACHE_MAX_AGE = int(os.environ.get("GIT_CACHE_MAX_AGE", str(30 * 24 * 3600)))
+# Segundos durante los que un espejo recién actualizado no vuelve a hacer fetch
+# (p. ej. varias importaciones del mismo repositorio en un lote)
+GIT_CACHE_TTL = int(os.environ.get("GIT_CACHE_TTL", "30"))
+# Solo se guardan ramas y etiquetas (no refs/pull/* y similares)
+MIRROR_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+# En un espejo superficial cada etiqueta añadiría un árbol completo: solo ramas
+SHALLOW_REFSPECS = ("+refs/heads/*:refs/heads/*",)
+# Segundos máximos de los comandos de git locales (config, rev-parse, gc)
+LOCAL_TIMEOUT = 120
+
+def normalize_url(url):
+    """URL sin barra final ni .git para que variantes del mismo origen compartan espejo"""
+    url = url.strip().rstrip("/")
+    return url[:-len(".git")] if url.endswith(".git") else url
+
+def repo_name(url):
+    """Nombre del repositorio (el de un fork coincide con el del original)"""
+    return os.path.basename(normalize_url(url)).lower()
+
+def git_local(args, timeout=LOCAL_TIMEOUT):
+    return subprocess.run(["git"] + args, capture_output=True, text=True, timeout=timeout)
+
+class GitCache:
+    """Espejos bare por repositorio de origen con expulsión por tamaño y antigüedad"""
+
+    def __init__(self, root=GIT_CACHE_DIR, max_bytes=GIT_CACHE_MAX_BYTES,
+                 max_age=GIT_CACHE_MAX_AGE, ttl=GIT_CACHE_TTL, enabled=GIT_CACHE_ENABLED):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.ttl = ttl
+        # Sin flock otro proceso podría actualizar o expulsar un espejo en uso
+        self.enabled = enabled and fcntl is not None
+
+    def key(self, url):
+        digest = hashlib.sha256(normalize_url(url).encode()).hexdigest()[:16]
+        name = re.sub(r"[^a-z0-9._-]", "_", repo_name(url))[:40] or "repo"
+        return f"{name}-{digest}"
+
+    def mirror_path(self, key):
+        return os.path.join(self.root, f"{key}.git")
+
+    def _meta_path(self, key):
+        return os.path.join(self.root, f"{key}.json")
+
+    @contextmanager
+    def _lock(self, key, shared=False, blocking=True):
+        """Bloqueo de un espejo entre hilos y entre procesos; cede None si está ocupado.
+
+        Compartido mientras se clona desde el espejo, exclusivo para crearlo,
+        actualizarlo o eliminarlo. Lo que se cede convierte un bloqueo
+        exclusivo en compartido al llamarlo. Sin fcntl no se puede bloquear y
+        el espejo se trata como ocupado.
+        """
+        if fcntl is None:
+            yield None
+            return
+        os.makedirs(self.root, exist_ok=True)
+        # Cada uso abre su propio descriptor, así que flock excluye también entre hilos
+        with open(os.path.join(self.root, f"{key}.lock"), "a") as lock_file:
+            mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            try:
+                fcntl.flock(lock_file, mode | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield None
+                return
+            yield lambda: fcntl.flock(lock_file, fcntl.LOCK_SH)
+
+    def _read_meta(self, key):
+        try:
+            with open(self._meta_path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key, meta):
+        tmp_path = f"{self._meta_path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path(key))
+
+    def _valid(self, mirror):
+        """El espejo existe y su HEAD apunta a un commit"""
+        if not os.path.isdir(mirror):
+            return False
+        result = git_local(["-C", mirror, "rev-parse", "--verify", "--quiet", "HEAD^{commit}"])
+        return result.returncode == 0
+
+    def _fork_references(self, url, key):
+        """Espejos con el mismo nombre de repositorio, candidatos a compartir historia"""
+        name = repo_name(url)
+        references = []
+        for entry in self.entries():
+            if (entry["key"] != key and entry["name"] == name and not entry["shallow"]
+                    and os.path.isdir(entry["path"])):
+                references += ["--reference-if-able", entry["path"]]
+        return references
+
+    def _configure(self, mirror, shallow):
+        """Refspecs de un espejo completo o superficial"""
+        git_local(["-C", mirror, "config", "--unset-all", "remote.origin.fetch"])
+        for refspec in SHALLOW_REFSPECS if shallow else MIRROR_REFSPECS:
+            git_local(["-C", mirror, "config", "--add", "remote.origin.fetch", refspec])
+        if shallow:
+            git_local(["-C", mirror, "config", "remote.origin.tagOpt", "--no-tags"])
+        else:
+            git_local(["-C", mirror, "config", "--unset-all", "remote.origin.tagOpt"])
+
+    def _create(self, url, key, fetch, shallow):
+        mirror = self.mirror_path(key)
+        tmp_mirror = f"{mirror}.{os.getpid()}-{threading.get_ident()}.tmp"
+        shutil.rmtree(tmp_mirror, ignore_errors=True)
+        shutil.rmtree(mirror, ignore_errors=True)
+        try:
+            args = ["git", "clone", "--bare", "--progress"]
+            if shallow:
+                args += ["--depth", "1", "--no-single-branch", "--no-tags"]
+            else:
+                references = self._fork_references(url, key)
+                if references:
+                    # --dissociate copia lo prestado: el espejo no depende de
+                    # otros que se puedan expulsar
+                    args += references + ["--dissociate"]
+            result = fetch(args + [url, tmp_mirror])
+            if result.returncode != 0:
+                return result
+            self._configure(tmp_mirror, shallow)
+            # Necesario para clonar desde el espejo con --filter
+            git_local(["-C", tmp_mirror, "config", "uploadpack.allowFilter", "true"])
+            os.replace(tmp_mirror, mirror)
+            return result
+        finally:
+            shutil.rmtree(tmp_mirror, ignore_errors=True)
+
+    def _refresh(self, mirror, fetch, shallow, unshallow):
+        args = ["git", "-C", mirror, "fetch", "--prune", "--progress"]
+        if unshallow:
+            # Se pidió el historial completo: completar el espejo superficial
+            self._configure(mirror, shallow=False)
+            args += ["--unshallow"]
+        elif shallow:
+            args += ["--depth", "1"]
+        result = fetch(args + ["origin"])
+        if result.returncode == 0 and not self._valid(mirror):
+            # La rama por defecto cambió o se eliminó en el origen
+            head = git_local(["-C", mirror, "ls-remote", "--symref", "origin", "HEAD"])
+            match = re.match(r"ref: (refs/heads/\S+)\tHEAD", head.stdout)
+            if not match:
+                return subprocess.CompletedProcess(result.args, 1, "", "HEAD del origen desconocido")
+            git_local(["-C", mirror, "symbolic-ref", "HEAD", match[1]])
+        git_local(["-C", mirror, "gc", "--auto", "--quiet"])
+        return result
+
+    def _fresh(self, key, shallow):
+        """Metadatos del espejo si sirve sin tocar la red (válido, reciente y con
+        el historial necesario), o None"""
+        meta = self._read_meta(key)
+        if (meta and time.time() - meta.get("fetched_at", 0) < self.ttl
+                and (shallow or not meta.get("shallow")) and self._valid(self.mirror_path(key))):
+            return meta
+        return None
+
+    def _ensure(self, url, key, fetch, shallow):
+        """Dejar el espejo al día; devuelve (resultado, CompletedProcess o None, bytes descargados)"""
+        mirror = self.mirror_path(key)
+        meta = self._read_meta(key)
+        if meta and self._valid(mirror):
+            if self._fresh(key, shallow):
+                return "hit", None, 0
+            was_shallow = meta.get("shallow", False)
+            outcome, result = "refresh", self._refresh(mirror, fetch, was_shallow,
+                                                       unshallow=was_shallow and not shallow)
+            meta["shallow"] = was_shallow and shallow
+        else:
+            meta = {"url": normalize_url(url), "name": repo_name(url), "created": time.time(),
+                    "shallow": shallow}
+            outcome, result = "miss", self._create(url, key, fetch, shallow)
+        if result.returncode != 0:
+            return "error", result, 0
+        size_before = meta.get("size", 0)
+        meta["fetched_at"] = time.time()
+        meta["size"] = tree_size(mirror)
+        self._write_meta(key, meta)
+        return outcome, result, max(0, meta["size"] - size_before)
+
+    @contextmanager
+    def source(self, url, fetch, log=print, shallow=False, stats=None):
+        """Ruta del espejo de `url` al día para clonar desde él, o None si no se puede.
+
+        `fetch(args)` ejecuta los comandos de git que usan la red y devuelve un
+        CompletedProcess (el importador pasa run_git para seguir el progreso).
+        Con `shallow` basta un espejo superficial. Si se pasa `stats` se anotan
+        el resultado ("git_cache") y los bytes descargados al espejo
+        ("git_cache_bytes"). Mientras se clona el espejo tiene un bloqueo
+        compartido: otras importaciones pueden clonar a la vez, pero nadie lo
+        actualiza ni lo expulsa.
+        """
+        if stats is not None:
+            stats.update({"git_cache": None, "git_cache_bytes": 0})
+        if not self.enabled:
+            yield None
+            return
+        key = self.key(url)
+        os.makedirs(self.root, exist_ok=True)
+        # Dentro del TTL basta el bloqueo compartido: un lote de importaciones
+        # del mismo repositorio clona en paralelo
+        with self._lock(key, shared=True):
+            if self._fresh(key, shallow):
+                CACHE_REQUESTS.inc(result="hit")
+                if stats is not None:
+                    stats["git_cache"] = "hit"
+                self._touch(key)
+                log(f"Caché de git: hit ({key})")
+                yield self.mirror_path(key)
+                return
+        with self._lock(key) as to_shared:
+            outcome, result, fetched = self._ensure(url, key, fetch, shallow)
+            CACHE_REQUESTS.inc(result=outcome)
+            if stats is not None:
+                stats.update({"git_cache": outcome, "git_cache_bytes": fetched})
+            if outcome == "error":
+                log(f"Caché de git no disponible para {url}: {result.stderr.strip()}")
+                yield None
+                return
+            self._touch(key)
+            log(f"Caché de git: {outcome} ({key})")
+            to_shared()
+            yield self.mirror_path(key)
+        if outcome == "miss":
+            self.evict()
+
+    def _touch(self, key):
+        """Marcar el espejo como usado (el mtime del .json se usa para la antigüedad)"""
+        try:
+            os.utime(self._meta_path(key))
+        except OSError:
+            pass
+
+    def entries(self):
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        result = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            key = name[:-len(".json")]
+            meta = self._read_meta(key)
+            try:
+                last_used = os.stat(self._meta_path(key)).st_mtime
+            except OSError:
+                continue
+            if not meta:
+                continue
+            result.append({"key": key, "path": self.mirror_path(key), "url": meta.get("url"),
+                           "name": meta.get("name"), "size": meta.get("size", 0),
+                           "shallow": meta.get("shallow", False),
+                           "fetched_at": meta.get("fetched_at"), "last_used": last_used})
+        return result
+
+    def _remove(self, entry):
+        """Eliminar un espejo si nadie lo está usando; devuelve True si se eliminó"""
+        with self._lock(entry["key"], blocking=False) as acquired:
+            if not acquired:
+                return False
+            try:
+                os.unlink(self._meta_path(entry["key"]))
+            except OSError:
+                pass
+            shutil.rmtree(entry["path"], ignore_errors=True)
+            return True
+
+    def evict(self):
+        """Eliminar espejos viejos y luego los menos usados hasta caber en el límite"""
+        now = time.time()
+        entries = sorted(self.entries(), key=lambda e: e["last_used"])
+        removed = []
+        for entry in list(entries):
+            if now - entry["last_used"] > self.max_age and self._remove(entry):
+                entries.remove(entry)
+                removed.append(entry["key"])
+        total = sum(e["size"] for e in entries)
+        for entry in list(entries):
+            if total <= self.max_bytes:
+                break
+            if self._remove(entry):
+                total -= entry["size"]
+                removed.append(entry["key"])
+        return removed
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            "enabled": self.enabled,
+            "entries": len(entries),
+            "bytes": sum(e["size"] for e in entries),
+            "max_bytes": self.max_bytes,
+            "max_age": self.max_age,
+            "ttl": self.ttl,
+            "mirrors": sorted(({"key": e["key"], "url": e["url"], "size": e["size"],
+                                "shallow": e["shallow"],
+                                "fetched_at": e["fetched_at"], "last_used": e["last_used"]}
+                               for e in entries), key=lambda e: e["last_used"], reverse=True)
+        }
+
+git_cache = GitCache()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Progreso de clone y fetch de git
+Interpreta lo que git escribe en stderr con --progress (líneas separadas por
+\\r como "Receiving objects:  45% (450/1000), 1.20 MiB | 2.00 MiB/s") y
+calcula objetos recibidos, bytes, velocidad y tiempo restante estimado
+"""
+
+import codecs
+import re
+import time
+from collections import deque
+
+# "Receiving objects:  45% (450/1000), 1.20 MiB | 2.00 MiB/s" o "remote: Counting objects: 12"
+PROGRESS_RE = re.compile(
+    r"^(?:remote: )?(?P<stage>[A-Z][A-Za-z ]+):\s+"
+    r"(?:(?P<percent>\d+)% \((?P<count>\d+)/(?P<total>\d+)\)|(?P<plain>\d+))(?P<rest>.*)$")
+THROUGHPUT_RE = re.compile(
+    r"(?P<size>\d+(?:\.\d+)?) (?P<unit>GiB|MiB|KiB|bytes?)"
+    r"(?: \| (?P<rate>\d+(?:\.\d+)?) (?P<rate_unit>GiB|MiB|KiB|bytes?)/s)?")
+UNITS = {"byte": 1, "bytes": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3}
+# Líneas que no son de progreso que se conservan (errores, avisos)
+MESSAGE_CAPACITY = 50
+
+class GitProgress:
+    """Estado del progreso de un comando de git alimentado con su stderr"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.stage = None
+        self.percent = None
+        self.count = None
+        self.total = None
+        self.bytes = 0
+        self.throughput = None
+        self.eta = None
+        self.done = False
+        self.started = clock()
+        # Último momento en que cambió el progreso (para detectar bloqueos)
+        self.last_change = self.started
+        self.messages = deque(maxlen=MESSAGE_CAPACITY)
+        self._buffer = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._stage_start = None
+
+    def feed(self, data):
+        """Procesar un trozo de stderr; devuelve True si hubo progreso"""
+        text = self._buffer + self._decoder.decode(data)
+        *lines, self._buffer = re.split(r"[\r\n]", text)
+        progressed = False
+        for line in lines:
+            progressed |= self.parse_line(line)
+        return progressed
+
+    def close(self):
+        """Procesar lo que quede en el buffer al terminar el comando"""
+        line, self._buffer = self._buffer + self._decoder.decode(b"", final=True), ""
+        if line:
+            self.parse_line(line)
+
+    def parse_line(self, line):
+        line = line.strip()
+        if not line:
+            return False
+        match = PROGRESS_RE.match(line)
+        if not match:
+            self.messages.append(line)
+            return False
+
+        now = self.clock()
+        stage = match["stage"].strip()
+        if match["plain"] is not None:
+            count, total, percent = int(match["plain"]), None, None
+        else:
+            count, total, percent = int(match["count"]), int(match["total"]), int(match["percent"])
+        rest = match["rest"]
+        received = self.bytes
+        throughput = THROUGHPUT_RE.search(rest)
+        if throughput:
+            received = int(float(throughput["size"]) * UNITS[throughput["unit"]])
+
+        progressed = (stage, count, received) != (self.stage, self.count, self.bytes)
+        if stage != self.stage:
+            self._stage_start = (now, count, received)
+        self.stage = stage
+        self.count = count
+        self.total = total
+        self.percent = percent
+        self.bytes = received
+        self.done = rest.rstrip().endswith("done.")
+
+        start_time, start_count, start_bytes = self._stage_start
+        elapsed = now - start_time
+        if throughput and throughput["rate"]:
+            self.throughput = int(float(throughput["rate"]) * UNITS[throughput["rate_unit"]])
+        elif throughput and elapsed > 0:
+            self.throughput = int((received - start_bytes) / elapsed)
+        else:
+            self.throughput = None
+        # Tiempo restante según el ritmo de objetos de la etapa actual
+        if total and not self.done and elapsed > 0 and count > start_count:
+            rate = (count - start_count) / elapsed
+            self.eta = round((total - count) / rate, 1)
+        else:
+            self.eta = 0.0 if self.done else None
+
+        if progressed:
+            self.last_change = now
+        return progressed
+
+    def idle_for(self):
+        """Segundos desde el último avance"""
+        return self.clock() - self.last_change
+
+    def snapshot(self):
+        return {
+            "stage": self.stage,
+            "percent": self.percent,
+            "objects": self.count,
+            "total_objects": self.total,
+            "bytes": self.bytes,
+            "throughput": self.throughput,
+            "eta": self.eta,
+            "done": self.done,
+            "elapsed": round(self.clock() - self.started, 1)
+        }
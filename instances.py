@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Instancias de juego independientes
+Permite tener varios juegos importados a la vez, cada uno en su propio
+directorio, con un puerto asignado de un pool y su propio supervisor
+"""
+
+import os
+import re
+import threading
+import time
+
+from releases import remove_game
+from supervisor import port_open
+
+# Directorio donde se guardan los juegos de cada instancia
+INSTANCES_DIR = os.environ.get("INSTANCES_DIR", "./games")
+# Cantidad máxima de instancias
+MAX_INSTANCES = int(os.environ.get("MAX_INSTANCES", "10"))
+# Rango de puertos para los procesos de juego (inclusive)
+GAME_PORT_RANGE = os.environ.get("GAME_PORT_RANGE", "5101-5199")
+# Segundos sin actividad tras los que se detiene el proceso de una instancia
+INSTANCE_IDLE_TIMEOUT = int(os.environ.get("INSTANCE_IDLE_TIMEOUT", "1800"))
+REAPER_INTERVAL = 60
+
+INSTANCE_NAME_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,39}$")
+
+def active_connections(port):
+    """Conexiones TCP establecidas hacia `port` (Linux, vía /proc/net)"""
+    count = 0
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, "r") as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    local_port = int(fields[1].rsplit(":", 1)[1], 16)
+                    # 01 = ESTABLISHED
+                    if local_port == port and fields[3] == "01":
+                        count += 1
+        except (OSError, StopIteration, ValueError, IndexError):
+            continue
+    return count
+
+class PortPool:
+    """Asignación de puertos libres dentro de un rango"""
+
+    def __init__(self, port_range=GAME_PORT_RANGE):
+        start, _, end = port_range.partition("-")
+        self.start = int(start)
+        self.end = int(end or start)
+        self.in_use = set()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Reservar el primer puerto libre; devuelve None si no quedan"""
+        with self._lock:
+            for port in range(self.start, self.end + 1):
+                # Se descartan también los puertos ocupados por otros procesos
+                if port not in self.in_use and not port_open(port):
+                    self.in_use.add(port)
+                    return port
+        return None
+
+    def release(self, port):
+        with self._lock:
+            self.in_use.discard(port)
+
+    def stats(self):
+        return {"range": f"{self.start}-{self.end}", "in_use": sorted(self.in_use),
+                "free": self.end - self.start + 1 - len(self.in_use)}
+
+class GameInstance:
+    """Un juego importado con su directorio, su importador y su proceso"""
+
+    def __init__(self, name, game_dir, importer):
+        self.name = name
+        self.game_dir = game_dir
+        self.importer = importer
+        self.port = None
+        self.supervisor = None
+        self.created_at = time.time()
+        self.last_access = self.created_at
+
+    def touch(self):
+        self.last_access = time.time()
+
+    @property
+    def running(self):
+        return self.supervisor is not None and self.supervisor.alive
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "game_dir": self.game_dir,
+            "status": self.importer.status,
+            "game_path": self.importer.game_path,
+            "port": self.port,
+            # Archivos servidos por la aplicación principal
+            "files_url": f"/game/@{self.name}/",
+            "running": self.running,
+            "process": self.supervisor.status() if self.supervisor else None,
+            "created_at": self.created_at,
+            "last_access": self.last_access
+        }
+
+class InstanceManager:
+    """Registro de instancias con límite total y expulsión de las inactivas.
+
+    `create_importer(game_dir)` crea el importador de cada instancia y
+    `create_supervisor(game_dir, port)` el supervisor de su proceso.
+    """
+
+    def __init__(self, create_importer, create_supervisor, base_dir=INSTANCES_DIR,
+                 max_instances=MAX_INSTANCES, port_pool=None,
+                 idle_timeout=INSTANCE_IDLE_TIMEOUT):
+        self.create_importer = create_importer
+        self.create_supervisor = create_supervisor
+        self.base_dir = base_dir
+        self.max_instances = max_instances
+        self.ports = port_pool or PortPool()
+        self.idle_timeout = idle_timeout
+        self.instances = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def get(self, name):
+        return self.instances.get(name)
+
+    def list(self):
+        return sorted(list(self.instances.values()), key=lambda i: i.created_at)
+
+    def create(self, name):
+        """Registrar una instancia nueva.
+
+        Lanza ValueError si el nombre no es válido o ya existe y
+        OverflowError si se alcanzó el límite de instancias.
+        """
+        if not INSTANCE_NAME_PATTERN.match(name or ""):
+            raise ValueError("Nombre de instancia inválido (a-z, 0-9, '-' y '_', máximo 40)")
+        with self._lock:
+            if name in self.instances:
+                raise ValueError("La instancia ya existe")
+            if len(self.instances) >= self.max_instances:
+                raise OverflowError("Se alcanzó el límite de instancias")
+            game_dir = os.path.join(self.base_dir, name)
+            instance = GameInstance(name, game_dir, self.create_importer(game_dir))
+            self.instances[name] = instance
+        return instance
+
+    def discover(self):
+        """Registrar como listas las instancias que ya existen en disco"""
+        if not os.path.isdir(self.base_dir):
+            return
+        for name in sorted(os.listdir(self.base_dir)):
+            game_dir = os.path.join(self.base_dir, name)
+            if (not INSTANCE_NAME_PATTERN.match(name) or not os.path.isdir(game_dir)
+                    or name in self.instances or len(self.instances) >= self.max_instances):
+                continue
+            instance = GameInstance(name, game_dir, self.create_importer(game_dir))
+            instance.importer.game_path = game_dir
+            instance.importer.status = "ready"
+            self.instances[name] = instance
+
+    def start(self, name):
+        """Iniciar el proceso de una instancia en un puerto del pool"""
+        instance = self.instances[name]
+        with self._lock:
+            instance.touch()
+            if instance.running:
+                return instance
+            if instance.port is None:
+                instance.port = self.ports.acquire()
+                if instance.port is None:
+                    raise OverflowError("No quedan puertos libres")
+            supervisor = self.create_supervisor(instance.game_dir, instance.port)
+            if not supervisor:
+                self.ports.release(instance.port)
+                instance.port = None
+                raise ValueError("Tipo de juego no soportado")
+            instance.supervisor = supervisor
+            supervisor.start()
+        return instance
+
+    def stop(self, name):
+        """Detener el proceso de una instancia y devolver su puerto"""
+        instance = self.instances[name]
+        if instance.supervisor:
+            instance.supervisor.stop()
+        with self._lock:
+            instance.supervisor = None
+            if instance.port is not None:
+                self.ports.release(instance.port)
+                instance.port = None
+        return instance
+
+    def remove(self, name):
+        """Detener y eliminar una instancia junto con su directorio"""
+        self.stop(name)
+        with self._lock:
+            instance = self.instances.pop(name)
+        remove_game(instance.game_dir)
+        return instance
+
+    def reap_idle(self):
+        """Detener las instancias sin accesos ni jugadores conectados"""
+        now = time.time()
+        reaped = []
+        for instance in self.list():
+            if not instance.running:
+                continue
+            if instance.port is not None and active_connections(instance.port):
+                instance.touch()
+                continue
+            if now - instance.last_access > self.idle_timeout:
+                instance.importer.log(f"Instancia {instance.name} inactiva, deteniendo el juego")
+                self.stop(instance.name)
+                reaped.append(instance.name)
+        return reaped
+
+    def start_reaper(self, interval=REAPER_INTERVAL):
+        """Revisar periódicamente las instancias inactivas en segundo plano"""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reap_idle()
+                except Exception as e:
+                    print(f"[InstanceManager] Error revisando instancias: {e}")
+
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=loop, name="instance-reaper", daemon=True)
+            self._reaper.start()
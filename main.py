@@ -4,71 +4,607 @@ Hardcore Ninja Game Import and Configuration Tool for Replit
 Servidor principal para importar y configurar el juego desde GitHub
 """
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Blueprint, Flask, Response, g, render_template, request, jsonify, send_file
+import base64
+import binascii
+import bisect
+import hashlib
+import itertools
 import os
+import re
 import subprocess
 import sys
 import json
-import shutil
+import mimetypes
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
+from types import SimpleNamespace
 
-app = Flask(__name__)
+from werkzeug.utils import safe_join
+
+from git_progress import GitProgress
+from shared_state import SharedState
+from supervisor import port_open
+
+# Las cachés, las releases, las instancias, el perfilador, las métricas, el
+# índice del proyecto y static_files se importan dentro de las funciones que
+# los usan: importar main (cada worker) no los carga hasta la primera petición
+
+# Rutas y hooks de la app; create_app() los registra en cada Flask que crea
+views = Blueprint("importer", __name__)
 
 # Configuración
 GITHUB_REPO_URL = "https://github.com/search?q=hardcore+ninja+game&type=repositories"
 GAME_DIR = "./hardcore_ninja_game"
 PORT = 5000
+# Puerto en el que se ejecuta el proceso del juego
+GAME_PORT = int(os.environ.get("GAME_PORT", "5001"))
+# Estrategias de clonado: historial completo, superficial (--depth 1),
+# parcial sin blobs (--filter=blob:none) o actualización del checkout existente
+CLONE_STRATEGIES = ("full", "shallow", "partial", "update")
+CLONE_STRATEGY = os.environ.get("CLONE_STRATEGY", "shallow")
+# Aceptar en la API repositorios locales (rutas o file://) además de GitHub
+ALLOW_LOCAL_REPOS = os.environ.get("ALLOW_LOCAL_REPOS", "0") == "1"
+# Repositorios admitidos como máximo en una importación por lotes
+BATCH_IMPORT_LIMIT = int(os.environ.get("BATCH_IMPORT_LIMIT", "20"))
+# Segundos máximos de un clone o fetch
+CLONE_TIMEOUT = int(os.environ.get("CLONE_TIMEOUT", "300"))
+# Se aborta el clone si no avanza durante estos segundos (0 = sin límite)
+CLONE_STALL_TIMEOUT = int(os.environ.get("CLONE_STALL_TIMEOUT", "60"))
+# Segundos mínimos entre eventos de progreso del clone
+PROGRESS_INTERVAL = float(os.environ.get("PROGRESS_INTERVAL", "1"))
+# Generar variantes .gz/.br de los assets al terminar la importación
+PRECOMPRESS = os.environ.get("PRECOMPRESS", "1") == "1"
+# Construir el paquete de assets (asset_pack.py) al terminar la importación
+ASSET_PACK = os.environ.get("ASSET_PACK", "0") == "1"
+# Segundos que se consideran válidas las versiones detectadas de la toolchain
+TOOLCHAIN_TTL = int(os.environ.get("TOOLCHAIN_TTL", "600"))
+# Cantidad máxima de líneas de log que se conservan en memoria
+LOG_CAPACITY = int(os.environ.get("LOG_CAPACITY", "1000"))
+# Eventos que se conservan para reenviar a clientes SSE que se reconectan
+EVENT_CAPACITY = int(os.environ.get("EVENT_CAPACITY", "1000"))
+# Segundos entre heartbeats en /api/events
+EVENT_HEARTBEAT = float(os.environ.get("EVENT_HEARTBEAT", "15"))
+# Streams de /api/events abiertos a la vez; por encima se responde 503
+EVENTS_MAX_STREAMS = int(os.environ.get("EVENTS_MAX_STREAMS", "32"))
+# Segundos que dura un stream antes de cerrarlo para que el cliente se reconecte
+EVENTS_MAX_AGE = float(os.environ.get("EVENTS_MAX_AGE", "300"))
+# Importaciones que se ejecutan en paralelo
+IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", "2"))
+# Importaciones pendientes admitidas antes de rechazar nuevas (429)
+IMPORT_QUEUE_LIMIT = int(os.environ.get("IMPORT_QUEUE_LIMIT", "20"))
+# Trabajos terminados que se conservan para consulta
+JOB_HISTORY = int(os.environ.get("JOB_HISTORY", "100"))
+# Archivos por página en /api/game_info (por defecto y máximo)
+GAME_INFO_PAGE_SIZE = int(os.environ.get("GAME_INFO_PAGE_SIZE", "500"))
+GAME_INFO_MAX_PAGE_SIZE = int(os.environ.get("GAME_INFO_MAX_PAGE_SIZE", "5000"))
+# Rutas por fragmento al transmitir el listado completo de /api/game_info
+GAME_INFO_STREAM_CHUNK = 1000
+# Archivos cuyo contenido lee detect_game_type (dependencias y archivo principal)
+GAME_INFO_SOURCES = ("package.json", "requirements.txt")
+
+# Comandos usados para detectar las herramientas disponibles en el sistema
+TOOLCHAIN_COMMANDS = {
+    "git": ["git", "--version"],
+    "node": ["node", "--version"],
+    "npm": ["npm", "--version"],
+    "pip": [sys.executable, "-m", "pip", "--version"],
+}
+
+# Métricas expuestas en /metrics (se registran en app_metrics() al usarlas)
+_app_metrics = None
+
+def directory_size(path):
+    """Tamaño total en bytes de los archivos bajo `path`"""
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for file in files:
+            try:
+                total += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                pass
+    return total
+
+class LogBuffer:
+    """Buffer circular de registros de log con número de secuencia"""
+    
+    def __init__(self, capacity=LOG_CAPACITY):
+        self.records = deque(maxlen=capacity)
+        self.last_seq = 0
+        self._lock = threading.Lock()
+    
+    def append(self, message, level="info", phase=None, job_id=None):
+        """Agregar un registro y devolverlo"""
+        with self._lock:
+            self.last_seq += 1
+            record = {
+                "seq": self.last_seq,
+                "timestamp": time.time(),
+                "level": level,
+                "phase": phase,
+                "job_id": job_id,
+                "message": message
+            }
+            self.records.append(record)
+        return record
+    
+    def since(self, seq, limit=None):
+        """Obtener los registros con secuencia mayor a `seq`.
+        
+        Recorre el buffer desde el final, así que el coste depende solo de la
+        cantidad de registros nuevos.
+        """
+        with self._lock:
+            new_records = []
+            for record in reversed(self.records):
+                if record["seq"] <= seq:
+                    break
+                new_records.append(record)
+            first_seq = self.records[0]["seq"] if self.records else self.last_seq + 1
+        new_records.reverse()
+        if limit is not None:
+            new_records = new_records[:limit]
+        return new_records, first_seq
+    
+    def __len__(self):
+        return len(self.records)
+
+class EventBus:
+    """Difusión de eventos del importador a clientes Server-Sent Events.
+    
+    Hay un único productor que publica en un historial acotado; todos los
+    suscriptores leen de ese historial compartido y se despiertan con una
+    misma condición, sin colas por cliente.
+    
+    Cada stream ocupa un hilo del servidor mientras está abierto, por eso se
+    admiten como máximo `max_streams` y cada uno se cierra a los `max_age`
+    segundos: el navegador se reconecta solo y retoma desde Last-Event-ID.
+    """
+    
+    def __init__(self, capacity=EVENT_CAPACITY, max_streams=EVENTS_MAX_STREAMS,
+                 max_age=EVENTS_MAX_AGE):
+        self.events = deque(maxlen=capacity)
+        self.last_id = 0
+        self.subscribers = 0
+        self.max_streams = max_streams
+        self.max_age = max_age
+        self._condition = threading.Condition()
+    
+    def publish(self, event_type, data):
+        """Publicar un evento y despertar a los suscriptores"""
+        with self._condition:
+            self.last_id += 1
+            self.events.append({"id": self.last_id, "event": event_type, "data": data})
+            self._condition.notify_all()
+    
+    def _since(self, event_id):
+        new_events = []
+        for event in reversed(self.events):
+            if event["id"] <= event_id:
+                break
+            new_events.append(event)
+        new_events.reverse()
+        return new_events
+    
+    def wait(self, event_id, timeout):
+        """Esperar hasta que haya eventos posteriores a `event_id`"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.last_id > event_id, timeout)
+            return self._since(event_id)
+    
+    def stream(self, last_event_id=None, heartbeat=EVENT_HEARTBEAT):
+        """Generador de mensajes en formato text/event-stream.
+        
+        Reserva la plaza del suscriptor al llamarlo y devuelve None si ya hay
+        `max_streams` abiertos; la plaza se libera al agotarse o cerrarse el
+        EventStream devuelto, aunque no se haya empezado a leer.
+        """
+        with self._condition:
+            if self.subscribers >= self.max_streams:
+                return None
+            self.subscribers += 1
+        return EventStream(self, self._messages(last_event_id, heartbeat))
+    
+    def release(self):
+        with self._condition:
+            self.subscribers -= 1
+    
+    def _messages(self, last_event_id, heartbeat):
+        if last_event_id is None or last_event_id > self.last_id:
+            last_event_id = self.last_id
+        deadline = time.monotonic() + self.max_age
+        yield "retry: 3000\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Fin normal del stream: EventSource se reconecta tras `retry`
+                return
+            events = self.wait(last_event_id, min(heartbeat, remaining))
+            if not events:
+                if time.monotonic() < deadline:
+                    # Comentario SSE para mantener viva la conexión
+                    yield ": heartbeat\n\n"
+                continue
+            for event in events:
+                last_event_id = event["id"]
+                yield (f"id: {event['id']}\n"
+                       f"event: {event['event']}\n"
+                       f"data: {json.dumps(event['data'])}\n\n")
+
+class EventStream:
+    """Mensajes de un suscriptor de EventBus que ocupan una de sus plazas.
+    
+    Un generador cerrado antes de empezar no ejecuta su `finally`, así que la
+    plaza se libera aquí: al agotarse o en close(), que el servidor WSGI llama
+    siempre al terminar la respuesta.
+    """
+    
+    def __init__(self, bus, messages):
+        self.bus = bus
+        self.messages = messages
+        self.closed = False
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        try:
+            return next(self.messages)
+        except StopIteration:
+            self.close()
+            raise
+    
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.messages.close()
+            self.bus.release()
+
+class ImportCancelled(Exception):
+    """La importación fue cancelada mientras se ejecutaba"""
+
+class CloneStalled(Exception):
+    """El clone o fetch no avanzó durante CLONE_STALL_TIMEOUT segundos"""
 
 class GameImporter:
-    def __init__(self):
-        self.status = "waiting"
-        self.logs = []
+    # Caché de toolchain compartida por todas las instancias del proceso
+    toolchain = {}
+    toolchain_checked_at = None
+    _toolchain_lock = threading.Lock()
+    _toolchain_refreshing = False
+    
+    def __init__(self, game_dir=GAME_DIR, events=None, logs=None, job_id=None):
+        self.game_dir = game_dir
+        self.job_id = job_id
+        # `is not None`: un LogBuffer vacío es falso (define __len__) y se
+        # perdería el buffer compartido con el importador global
+        self.events = events if events is not None else EventBus()
+        self._status = "waiting"
+        self.logs = logs if logs is not None else LogBuffer()
         self.game_path = None
+        self.cancel_event = threading.Event()
+        self.phases = {}
+        self.progress = None
+        # Con releases se importa en `staging` y se activa al terminar
+        self._releases = None
+        self.staging = None
+        self._game_info_cache = None
+        self._listing_cache = None
+    
+    @property
+    def releases(self):
+        """ReleaseManager de game_dir o None con RELEASES=0 (se crea al usarlo:
+        releases importa asset_pack)"""
+        if self._releases is None:
+            from releases import RELEASES_ENABLED, ReleaseManager
+            self._releases = ReleaseManager(self.game_dir) if RELEASES_ENABLED else False
+        return self._releases or None
+    
+    @property
+    def status(self):
+        return self._status
     
-    def log(self, message):
+    @status.setter
+    def status(self, value):
+        changed = value != self._status
+        self._status = value
+        if changed:
+            self.events.publish("status", self.snapshot())
+    
+    def snapshot(self):
+        """Estado resumido del importador (sin logs)"""
+        return {
+            "status": self.status,
+            "job_id": self.job_id,
+            "last_log_seq": self.logs.last_seq,
+            "game_path": self.game_path,
+            "git_available": self.check_git_installed(),
+            "phases": self.phases,
+            "progress": self.progress.snapshot() if self.progress else None
+        }
+    
+    def log(self, message, level="info"):
         """Agregar mensaje al log"""
-        self.logs.append(message)
+        record = self.logs.append(message, level=level, phase=self.status,
+                                  job_id=self.job_id)
+        self.events.publish("log", record)
         print(f"[GameImporter] {message}")
     
+    def probe_tool(self, name):
+        """Ejecutar el comando de versión de una herramienta"""
+        try:
+            result = subprocess.run(TOOLCHAIN_COMMANDS[name], capture_output=True,
+                                    text=True, timeout=15, check=True)
+            return {"available": True, "version": result.stdout.strip()}
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+            return {"available": False, "version": None}
+    
+    def refresh_toolchain(self):
+        """Volver a detectar git, node, npm y pip y guardar el resultado en caché"""
+        toolchain = {name: self.probe_tool(name) for name in TOOLCHAIN_COMMANDS}
+        cls = type(self)
+        with cls._toolchain_lock:
+            changed = toolchain != cls.toolchain
+            cls.toolchain = toolchain
+            cls.toolchain_checked_at = time.time()
+            cls._toolchain_refreshing = False
+        if changed:
+            # git_available forma parte del estado que ven los clientes SSE
+            self.events.publish("status", self.snapshot())
+        return toolchain
+    
+    def get_toolchain(self):
+        """Obtener la toolchain en caché sin bloquear.
+        
+        Si la caché expiró se refresca en segundo plano y mientras tanto se
+        devuelven los valores anteriores.
+        """
+        cls = type(self)
+        with cls._toolchain_lock:
+            expired = (cls.toolchain_checked_at is None or
+                       time.time() - cls.toolchain_checked_at > TOOLCHAIN_TTL)
+            if expired and not cls._toolchain_refreshing:
+                cls._toolchain_refreshing = True
+                threading.Thread(target=self.refresh_toolchain, daemon=True).start()
+            return cls.toolchain
+    
     def check_git_installed(self):
-        """Verificar si git está instalado"""
+        """Verificar si git está instalado (usa la caché de la toolchain).
+        
+        Devuelve None mientras no termine la primera detección, que se hace en
+        segundo plano: hasta entonces no se sabe.
+        """
+        git = self.get_toolchain().get("git")
+        return git.get("available", False) if git is not None else None
+    
+    def cancel(self):
+        """Solicitar la cancelación de la operación en curso"""
+        self.cancel_event.set()
+    
+    def run_command(self, args, timeout, **kwargs):
+        """Ejecutar un comando que se puede cancelar con `cancel()`.
+        
+        Devuelve un `subprocess.CompletedProcess`; lanza `ImportCancelled` si se
+        cancela y `subprocess.TimeoutExpired` si supera `timeout`.
+        """
+        if self.cancel_event.is_set():
+            raise ImportCancelled()
+        
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   text=True, **kwargs)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=0.2)
+                return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+            except subprocess.TimeoutExpired:
+                if self.cancel_event.is_set() or time.monotonic() > deadline:
+                    process.kill()
+                    process.communicate()
+                    if self.cancel_event.is_set():
+                        raise ImportCancelled()
+                    raise subprocess.TimeoutExpired(args, timeout)
+    
+    def run_git(self, args, timeout=CLONE_TIMEOUT, stall_timeout=CLONE_STALL_TIMEOUT):
+        """Ejecutar un `git clone/fetch --progress` siguiendo su avance.
+        
+        El progreso se guarda en `self.progress` y se publica como eventos
+        "progress". Lanza `CloneStalled` si no avanza en `stall_timeout`
+        segundos, además de `ImportCancelled` y `subprocess.TimeoutExpired`
+        como `run_command`. El stderr devuelto solo tiene las líneas que no
+        son de progreso.
+        """
+        if self.cancel_event.is_set():
+            raise ImportCancelled()
+        
+        progress = self.progress = GitProgress()
+        process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.PIPE)
+        published = [0.0]
+        
+        def read_stderr():
+            fd = process.stderr.fileno()
+            while True:
+                data = os.read(fd, 65536)
+                if not data:
+                    break
+                now = time.monotonic()
+                if progress.feed(data) and now - published[0] >= PROGRESS_INTERVAL:
+                    published[0] = now
+                    self.events.publish("progress", dict(progress.snapshot(), job_id=self.job_id))
+            progress.close()
+        
+        reader = threading.Thread(target=read_stderr, daemon=True)
+        reader.start()
+        deadline = time.monotonic() + timeout
         try:
-            subprocess.run(["git", "--version"], capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+            while True:
+                try:
+                    process.wait(timeout=0.2)
+                    break
+                except subprocess.TimeoutExpired:
+                    if self.cancel_event.is_set():
+                        raise ImportCancelled()
+                    if time.monotonic() > deadline:
+                        raise subprocess.TimeoutExpired(args, timeout)
+                    if stall_timeout and progress.idle_for() > stall_timeout:
+                        raise CloneStalled(f"Sin progreso durante {stall_timeout} s "
+                                           f"(etapa: {progress.stage or 'conexión'})")
+        finally:
+            if process.returncode is None:
+                process.kill()
+                process.wait()
+            reader.join()
+            process.stderr.close()
+        
+        self.events.publish("progress", dict(progress.snapshot(), job_id=self.job_id))
+        return subprocess.CompletedProcess(args, process.returncode, "",
+                                           "\n".join(progress.messages))
+    
+    @contextmanager
+    def phase(self, name):
+        """Medir la duración de una fase de la importación"""
+        stats = {"seconds": None}
+        self.phases[name] = stats
+        start = time.perf_counter()
+        from profiling import profiler
+        try:
+            with profiler.profile("phase", name):
+                yield stats
+        finally:
+            elapsed = time.perf_counter() - start
+            stats["seconds"] = round(elapsed, 3)
+            app_metrics().import_phases.observe(elapsed, phase=name)
     
-    def clone_repository(self, repo_url):
+    def clone_url(self, repo_url):
+        """Convertir rutas locales a file:// para que git respete --depth y --filter"""
+        if os.path.isdir(repo_url):
+            return Path(repo_url).resolve().as_uri()
+        return repo_url
+    
+    def clone_args(self, repo_url, strategy, dest, mirror=None):
+        """Construir el comando `git clone` para la estrategia indicada.
+        
+        Con `mirror` (espejo de git_cache) se clona desde él: con el historial
+        completo por ruta, para que git enlace los objetos con hardlinks, y con
+        file:// para que respete --depth y --filter.
+        """
+        args = ["git", "clone", "--progress"]
+        if strategy == "shallow":
+            args += ["--depth", "1"]
+        elif strategy == "partial":
+            args += ["--filter=blob:none"]
+        if mirror:
+            source = mirror if strategy == "full" else self.clone_url(mirror)
+        else:
+            source = self.clone_url(repo_url)
+        return args + [source, dest]
+    
+    def mirror_source(self, repo_url, strategy, stats):
+        """Espejo local (git_cache) desde el que clonar con `strategy`.
+        
+        El clon parcial va directamente al origen: un espejo descargaría todos
+        los blobs que esa estrategia evita. Salvo full, las demás se conforman
+        con un espejo superficial.
+        """
+        if strategy == "partial":
+            stats["git_cache"] = None
+            return nullcontext()
+        from git_cache import git_cache
+        return git_cache.source(self.clone_url(repo_url), self.run_git, self.log,
+                                shallow=strategy != "full", stats=stats)
+    
+    def update_checkout(self, repo_url, dest, mirror=None):
+        """Actualizar un checkout existente con fetch + reset en lugar de reclonar"""
+        commands = [
+            ["remote", "set-url", "origin", self.clone_url(repo_url)],
+            ["fetch", "--progress", "--depth", "1",
+             self.clone_url(mirror) if mirror else "origin", "HEAD"],
+            ["reset", "--hard", "FETCH_HEAD"],
+            # Se conservan las dependencias instaladas (node_modules, paquetes de Python)
+            ["clean", "-fd", "-e", "node_modules", "-e", ".python_packages"],
+        ]
+        for command in commands:
+            args = ["git", "-C", dest] + command
+            if command[0] == "fetch":
+                result = self.run_git(args)
+            else:
+                result = self.run_command(args, timeout=CLONE_TIMEOUT)
+            if result.returncode != 0:
+                break
+        return result
+    
+    def clone_repository(self, repo_url, strategy=CLONE_STRATEGY):
         """Clonar repositorio desde GitHub"""
         try:
+            self.progress = None
             self.status = "cloning"
-            self.log(f"Clonando repositorio desde: {repo_url}")
-            
-            # Limpiar directorio si existe
-            if os.path.exists(GAME_DIR):
-                shutil.rmtree(GAME_DIR)
+            self.log(f"Clonando repositorio desde: {repo_url} (estrategia: {strategy})")
+            previous_objects = os.path.join(self.game_dir, ".git", "objects")
+            # Con releases el juego activo no se toca hasta publicar la nueva versión
+            dest = self.staging = self.releases.stage() if self.releases else self.game_dir
+            objects_dir = os.path.join(dest, ".git", "objects")
             
-            # Clonar repositorio
-            result = subprocess.run(
-                ["git", "clone", repo_url, GAME_DIR],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+            with self.phase("clone") as stats, \
+                    self.mirror_source(repo_url, strategy, stats) as mirror:
+                if strategy == "update" and os.path.isdir(previous_objects):
+                    bytes_before = directory_size(previous_objects)
+                    result = None
+                    if self.staging:
+                        # Copia local de la versión activa (objetos con hardlinks)
+                        result = self.run_git(["git", "clone", "--progress", "--local",
+                                               "--no-checkout",
+                                               os.path.realpath(self.game_dir), dest])
+                    if result is None or result.returncode == 0:
+                        result = self.update_checkout(repo_url, dest, mirror)
+                else:
+                    if strategy == "update":
+                        self.log("No hay un checkout previo, se hará un clon superficial")
+                        strategy = "shallow"
+                    bytes_before = 0
+                    
+                    # Limpiar directorio si existe
+                    if not self.staging and os.path.lexists(dest):
+                        from releases import remove_game
+                        remove_game(dest)
+                    
+                    # Clonar repositorio (desde el espejo local si lo hay)
+                    result = self.run_git(self.clone_args(repo_url, strategy, dest, mirror))
+                    if mirror and result.returncode == 0:
+                        # El checkout sigue apuntando al repositorio original
+                        result = self.run_command(["git", "-C", dest, "remote", "set-url",
+                                                   "origin", self.clone_url(repo_url)],
+                                                  timeout=CLONE_TIMEOUT)
+                
+                stats["strategy"] = strategy
+                # Lo descargado al espejo más lo que ocupa el checkout nuevo
+                stats["bytes"] = (max(0, directory_size(objects_dir) - bytes_before)
+                                  + stats.get("git_cache_bytes", 0))
             
             if result.returncode == 0:
-                self.log("Repositorio clonado exitosamente")
-                self.game_path = GAME_DIR
+                self.log(f"Repositorio clonado exitosamente "
+                         f"({stats['bytes']} bytes en {stats['seconds']} s)")
+                self.game_path = dest
                 return True
             else:
-                self.log(f"Error al clonar: {result.stderr}")
+                self.log(f"Error al clonar: {result.stderr}", level="error")
                 return False
                 
         except subprocess.TimeoutExpired:
-            self.log("Timeout al clonar el repositorio")
+            self.log("Timeout al clonar el repositorio", level="error")
+            return False
+        except CloneStalled as e:
+            self.log(f"Clonado abortado: {e}", level="error")
             return False
+        except ImportCancelled:
+            raise
         except Exception as e:
-            self.log(f"Error inesperado: {str(e)}")
+            self.log(f"Error inesperado: {str(e)}", level="error")
             return False
     
     def detect_game_type(self):
@@ -76,6 +612,14 @@ class GameImporter:
         if not self.game_path or not os.path.exists(self.game_path):
             return None
         
+        # El índice solo relee los directorios modificados; si no cambió
+        # nada se reutiliza el resultado anterior
+        import project_index
+        index = project_index.get_index(self.game_path)
+        cache_key = (index.root, index.generation)
+        if self._game_info_cache and self._game_info_cache[0] == cache_key:
+            return self._game_info_cache[1]
+        
         game_info = {
             "type": "unknown",
             "main_file": None,
@@ -83,163 +627,1315 @@ class GameImporter:
             "structure": []
         }
         
-        # Escanear archivos en el directorio del juego
-        for root, dirs, files in os.walk(self.game_path):
-            for file in files:
-                rel_path = os.path.relpath(os.path.join(root, file), self.game_path)
-                game_info["structure"].append(rel_path)
-                
-                # Detectar tipo de juego
-                if file.endswith('.html') and 'index' in file.lower():
-                    game_info["type"] = "web"
-                    game_info["main_file"] = rel_path
-                elif file.endswith('.py') and 'main' in file.lower():
-                    game_info["type"] = "python"
-                    game_info["main_file"] = rel_path
-                elif file.endswith('.js') and 'main' in file.lower():
-                    game_info["type"] = "javascript"
-                    game_info["main_file"] = rel_path
-                elif file == 'package.json':
-                    game_info["type"] = "node"
-                    try:
-                        with open(os.path.join(root, file), 'r') as f:
-                            package_data = json.load(f)
-                            if "main" in package_data:
-                                game_info["main_file"] = package_data["main"]
-                    except:
-                        pass
-                elif file == 'requirements.txt':
-                    try:
-                        with open(os.path.join(root, file), 'r') as f:
-                            deps = f.read().strip().split('\n')
-                            game_info["dependencies"].extend(deps)
-                    except:
-                        pass
+        # Recorrer los archivos del índice
+        for rel_path in index.paths():
+            file = os.path.basename(rel_path)
+            game_info["structure"].append(rel_path)
+            
+            # Detectar tipo de juego
+            if file.endswith('.html') and 'index' in file.lower():
+                game_info["type"] = "web"
+                game_info["main_file"] = rel_path
+            elif file.endswith('.py') and 'main' in file.lower():
+                game_info["type"] = "python"
+                game_info["main_file"] = rel_path
+            elif file.endswith('.js') and 'main' in file.lower():
+                game_info["type"] = "javascript"
+                game_info["main_file"] = rel_path
+            elif file == 'package.json':
+                game_info["type"] = "node"
+                try:
+                    with open(os.path.join(self.game_path, rel_path), 'r') as f:
+                        package_data = json.load(f)
+                        if "main" in package_data:
+                            game_info["main_file"] = package_data["main"]
+                except:
+                    pass
+            elif file == 'requirements.txt':
+                try:
+                    with open(os.path.join(self.game_path, rel_path), 'r') as f:
+                        deps = f.read().strip().split('\n')
+                        game_info["dependencies"].extend(deps)
+                except:
+                    pass
         
+        self._game_info_cache = (cache_key, game_info, index)
         return game_info
     
+    def file_listing(self):
+        """Información del juego y sus rutas en orden lexicográfico.
+        
+        Devuelve (game_info, rutas, entradas_del_índice, versión, fuentes) o
+        None si no hay juego; `fuentes` son las rutas de GAME_INFO_SOURCES. En este orden cada prefijo es un rango contiguo, así que
+        /api/game_info pagina y filtra con búsqueda binaria y genera el árbol
+        compacto en una sola pasada. La lista se ordena una vez por generación
+        del índice.
+        
+        La versión resume el contenido (HEAD y ruta, tamaño y mtime de cada
+        archivo) y no la generación, que solo vale dentro de este proceso: es
+        la misma tras un reinicio y en todos los workers mientras no cambien
+        los archivos.
+        """
+        game_info = self.detect_game_type()
+        if game_info is None:
+            return None
+        cache_key, _, index = self._game_info_cache
+        listing = self._listing_cache
+        if not listing or listing[0] != cache_key:
+            paths = sorted(game_info["structure"])
+            # Copia: el FileWatcher puede estar modificando el índice ahora
+            entries = index.entries()
+            digest = hashlib.sha1(str(index.head).encode())
+            for path in paths:
+                # Eliminado después de detect_game_type: la próxima generación lo quita
+                size, mtime, _ = entries.get(path, (0, 0, None))
+                digest.update(f"{path}\0{size}\0{mtime}\n".encode("utf-8", "surrogateescape"))
+            sources = [path for path in paths if os.path.basename(path) in GAME_INFO_SOURCES]
+            listing = self._listing_cache = (cache_key, paths, entries,
+                                             digest.hexdigest()[:16], sources)
+        return (game_info,) + listing[1:]
+    
+    def verify_files(self, rel_paths):
+        """Releer del disco el tamaño y mtime de `rel_paths` si el índice no
+        tiene FileWatcher; devuelve True si alguno cambió"""
+        if not self.game_path:
+            return False
+        import project_index
+        return project_index.get_index(self.game_path).verify(rel_paths)
+    
     def setup_game(self):
         """Configurar el juego para ejecución"""
         try:
-            self.status = "setting_up"
-            game_info = self.detect_game_type()
-            
-            if not game_info:
-                self.log("No se pudo detectar la estructura del juego")
-                self.status = "ready"  # Marcar como listo aún si no se detecta
-                return False
-            
-            self.log(f"Tipo de juego detectado: {game_info['type']}")
-            self.log(f"Archivo principal: {game_info['main_file']}")
-            
-            # Instalar dependencias según el tipo
-            if game_info["type"] == "python" and game_info["dependencies"]:
-                self.log("Instalando dependencias de Python...")
-                try:
-                    subprocess.run([sys.executable, "-m", "pip", "install"] + game_info["dependencies"], 
-                                 timeout=60, check=False)
-                except:
-                    self.log("Advertencia: Algunas dependencias no se pudieron instalar")
-            
-            self.status = "ready"
-            self.log("Juego configurado y listo para ejecutar")
-            return True
-            
+            with self.phase("setup"):
+                return self._setup_game()
+        except ImportCancelled:
+            raise
         except Exception as e:
-            self.log(f"Error en la configuración: {str(e)}")
+            self.log(f"Error en la configuración: {str(e)}", level="error")
             self.status = "ready"  # Marcar como listo incluso con errores
             return False
+    
+    def _setup_game(self):
+        """Detectar el tipo de juego e instalar sus dependencias"""
+        self.status = "setting_up"
+        with self.phase("scan"):
+            game_info = self.detect_game_type()
+        
+        if not game_info:
+            self.log("No se pudo detectar la estructura del juego", level="error")
+            self.status = "ready"  # Marcar como listo aún si no se detecta
+            return False
+        
+        self.log(f"Tipo de juego detectado: {game_info['type']}")
+        self.log(f"Archivo principal: {game_info['main_file']}")
+        
+        # Instalar dependencias según el tipo
+        if game_info["type"] == "python" and game_info["dependencies"]:
+            self.log("Instalando dependencias de Python...")
+            try:
+                with self.phase("dependencies") as stats:
+                    # Se restauran desde la caché si ya se instalaron antes
+                    # con el mismo requirements
+                    from dependency_cache import dependency_cache
+                    result = dependency_cache.ensure_python(
+                        self.game_path, game_info["dependencies"],
+                        run=lambda args, **kwargs: self.run_command(args, timeout=60, **kwargs))
+                    stats["cache"] = result
+                if result == "hit":
+                    self.log("Dependencias de Python restauradas desde la caché")
+                elif result == "failed":
+                    self.log("Advertencia: Algunas dependencias no se pudieron instalar", level="warning")
+            except ImportCancelled:
+                raise
+            except Exception:
+                self.log("Advertencia: Algunas dependencias no se pudieron instalar", level="warning")
+        
+        if PRECOMPRESS:
+            self.precompress_assets()
+        
+        if ASSET_PACK:
+            self.build_asset_pack()
+        
+        self.status = "ready"
+        self.log("Juego configurado y listo para ejecutar")
+        return True
+
+    def precompress_assets(self):
+        """Generar las variantes comprimidas de los assets del juego"""
+        self.log("Precomprimiendo assets...")
+        try:
+            # Importación diferida: solo se necesita al terminar una importación
+            import precompress
+            with self.phase("compress") as stats:
+                report = precompress.precompress_tree(self.game_path)
+                stats["report"] = report
+            for line in precompress.format_report(report):
+                self.log(line)
+        except OSError as e:
+            self.log(f"Advertencia: no se pudieron precomprimir los assets: {e}", level="warning")
+
+    def build_asset_pack(self):
+        """Empaquetar los archivos del juego para servirlos desde memoria"""
+        self.log("Construyendo el paquete de assets...")
+        try:
+            # Importación diferida, como precompress
+            import asset_pack
+            with self.phase("pack") as stats:
+                stats.update(asset_pack.build_pack(self.game_path))
+            self.log(f"Paquete de assets: {stats['files']} archivos, "
+                     f"{stats['pack_bytes']} bytes")
+        except OSError as e:
+            self.log(f"Advertencia: no se pudo construir el paquete de assets: {e}",
+                     level="warning")
+    
+    def publish_release(self, repo_url, strategy):
+        """Validar el staging y activarlo como versión actual del juego"""
+        game_info = self.detect_game_type()
+        if not game_info or not game_info["structure"]:
+            self.log("La versión importada no tiene archivos de juego, se descarta",
+                     level="error")
+            return False
+        commit = self.run_command(["git", "-C", self.staging, "rev-parse", "HEAD"], timeout=30)
+        with self.phase("publish") as stats:
+            release = self.releases.publish(
+                self.staging, repo_url=repo_url, strategy=strategy, job_id=self.job_id,
+                commit=commit.stdout.strip() or None, type=game_info["type"])
+            stats["release"] = release["id"]
+            stats["deduped_bytes"] = release["deduped_bytes"]
+        # El enlace apunta a otro árbol: el índice vuelve a mirar el disco
+        # hasta que el watcher lo vigile de nuevo
+        import project_index
+        project_index.unwatch(self.game_dir)
+        project_index.forget(self.staging)
+        self.staging = None
+        self.game_path = self.game_dir
+        self.log(f"Versión {release['id']} activada ({release['deduped_files']} archivos "
+                 f"compartidos con la anterior, {release['deduped_bytes']} bytes)")
+        return True
+    
+    def discard_staging(self):
+        """Eliminar el staging de una importación que no se publicó"""
+        if self.staging:
+            import project_index
+            project_index.forget(self.staging)
+            self.releases.discard(self.staging)
+            if self.game_path == self.staging:
+                self.game_path = None
+            self.staging = None
 
-# Instancia global del importador
+class ImportJob:
+    """Importación encolada con su propio importador y estado"""
+    
+    def __init__(self, repo_url, importer, strategy=CLONE_STRATEGY, target=None):
+        self.id = importer.job_id
+        self.repo_url = repo_url
+        self.strategy = strategy
+        # Importador que refleja el resultado al terminar (juego activo o instancia)
+        self.target = target
+        self.importer = importer
+        self.state = "queued"
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+    
+    @property
+    def finished(self):
+        return self.state in ("succeeded", "failed", "cancelled")
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "repo_url": self.repo_url,
+            "strategy": self.strategy,
+            "state": self.state,
+            "status": self.importer.status,
+            "game_path": self.importer.game_path,
+            "error": self.error,
+            "phases": self.importer.phases,
+            "progress": self.importer.progress.snapshot() if self.importer.progress else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+class JobManager:
+    """Ejecuta las importaciones en un pool acotado de hilos.
+    
+    Cada trabajo tiene su propio `GameImporter`; los que apuntan al mismo
+    directorio se serializan con un lock por directorio.
+    """
+    
+    def __init__(self, active_importer, max_workers=IMPORT_WORKERS,
+                 queue_limit=IMPORT_QUEUE_LIMIT, history=JOB_HISTORY):
+        self.active_importer = active_importer
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self.history = history
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._dir_locks = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="import-job")
+    
+    def pending(self):
+        """Cantidad de trabajos en cola o en ejecución"""
+        return sum(1 for job in list(self.jobs.values()) if not job.finished)
+    
+    def submit(self, repo_url, game_dir=GAME_DIR, strategy=CLONE_STRATEGY, target=None):
+        """Encolar una importación; devuelve None si la cola está llena"""
+        with self._lock:
+            if self.pending() >= self.queue_limit:
+                return None
+            job_importer = GameImporter(
+                game_dir=game_dir,
+                events=self.active_importer.events,
+                logs=self.active_importer.logs,
+                job_id=uuid.uuid4().hex
+            )
+            job = ImportJob(repo_url, job_importer, strategy,
+                            target=target or self.active_importer)
+            self.jobs[job.id] = job
+            self._prune()
+        job_importer.log(f"Importación encolada: {repo_url}")
+        self._publish(job)
+        job.future = self._executor.submit(self._run, job)
+        return job
+    
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+    
+    def list(self):
+        return sorted(list(self.jobs.values()), key=lambda job: job.created_at)
+    
+    def snapshot(self, job_id):
+        """Estado de un trabajo, aunque lo ejecute otro proceso del servidor"""
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job else shared_state.read(f"job-{job_id}")
+    
+    def snapshots(self):
+        """Estado de los trabajos de este proceso y de los demás workers"""
+        local = {job.id: job.to_dict() for job in self.list()}
+        for name in shared_state.names("job-"):
+            job_id = name[len("job-"):]
+            if job_id not in local:
+                data = shared_state.read(name)
+                if data:
+                    local[job_id] = data
+        return sorted(local.values(), key=lambda job: job["created_at"])
+    
+    def _publish(self, job):
+        """Guardar el estado del trabajo para los demás procesos"""
+        try:
+            shared_state.write(f"job-{job.id}", job.to_dict())
+        except OSError:
+            pass
+    
+    def current(self):
+        """Trabajo en ejecución más reciente, si hay alguno"""
+        running = [job for job in list(self.jobs.values()) if job.state == "running"]
+        return max(running, key=lambda job: job.started_at) if running else None
+    
+    def cancel(self, job_id):
+        """Cancelar un trabajo en cola o en ejecución"""
+        job = self.jobs.get(job_id)
+        if not job or job.finished:
+            return False
+        job.importer.cancel()
+        if job.future.cancel():
+            self._finish(job, "cancelled")
+        return True
+    
+    def _dir_lock(self, game_dir):
+        key = os.path.abspath(game_dir)
+        with self._lock:
+            return self._dir_locks.setdefault(key, threading.Lock())
+    
+    def _prune(self):
+        """Descartar los trabajos terminados más antiguos"""
+        finished = [job for job in self.list() if job.finished]
+        for job in finished[:max(0, len(self.jobs) - self.history)]:
+            del self.jobs[job.id]
+            shared_state.remove(f"job-{job.id}")
+    
+    def _finish(self, job, state, error=None):
+        job.state = state
+        job.error = error
+        job.finished_at = time.time()
+        app_metrics().import_jobs.inc(state=state)
+        if state != "succeeded" and job.importer.status != "ready":
+            job.importer.status = "cancelled" if state == "cancelled" else "error"
+        self._publish(job)
+    
+    def _run(self, job):
+        job_importer = job.importer
+        with self._dir_lock(job_importer.game_dir):
+            if job_importer.cancel_event.is_set():
+                self._finish(job, "cancelled")
+                return
+            job.state = "running"
+            job.started_at = time.time()
+            self._publish(job)
+            try:
+                if not job_importer.clone_repository(job.repo_url, job.strategy):
+                    self._finish(job, "failed", "Error al clonar el repositorio")
+                else:
+                    job_importer.setup_game()
+                    if job_importer.staging and not job_importer.publish_release(
+                            job.repo_url, job.strategy):
+                        self._finish(job, "failed", "La versión importada no es válida")
+                    else:
+                        self._finish(job, "succeeded")
+            except ImportCancelled:
+                job_importer.log("Importación cancelada", level="warning")
+                self._finish(job, "cancelled")
+            except Exception as e:
+                job_importer.log(f"Error inesperado: {str(e)}", level="error")
+                self._finish(job, "failed", str(e))
+            finally:
+                # Si no se publicó, la versión activa sigue intacta
+                job_importer.discard_staging()
+                self._activate(job)
+    
+    def _activate(self, job):
+        """Reflejar el resultado del trabajo en el importador de destino"""
+        active = job.target
+        if job.state == "succeeded":
+            active.game_path = job.importer.game_path
+            active.status = "ready"
+        elif active.game_path and not os.path.exists(active.game_path):
+            # El directorio anterior se eliminó antes de clonar
+            active.game_path = None
+            active.status = "waiting"
+        if active is self.active_importer:
+            publish_active_game()
+
+# Estado compartido con los demás workers del servidor de producción
+shared_state = SharedState()
+
+# Instancia global del importador (juego activo). Construirla es barato;
+# el trabajo de arranque (toolchain, disco, hilos) se hace en initialize()
 importer = GameImporter()
+jobs = JobManager(importer)
+
+# Proceso del juego supervisado (se crea al llamar a /start_game_server)
+game_supervisor = None
+supervisor_lock = threading.Lock()
+
+# Juegos adicionales, cada uno con su directorio, puerto y supervisor
+# (InstanceManager se crea en get_instances())
+_instances = None
+_instances_lock = threading.Lock()
+
+# Vigilancia del directorio del juego (se crea en initialize())
+game_watcher = None
+
+_initialized = False
+_init_lock = threading.Lock()
+
+def get_instances():
+    """InstanceManager del proceso; instances se importa la primera vez"""
+    global _instances
+    with _instances_lock:
+        if _instances is None:
+            from instances import InstanceManager
+            _instances = InstanceManager(
+                create_importer=lambda game_dir: GameImporter(
+                    game_dir=game_dir, events=importer.events, logs=importer.logs),
+                create_supervisor=lambda game_dir, port: create_game_supervisor(game_dir, port)
+            )
+        return _instances
+
+def initialize():
+    """Trabajo de arranque del proceso, diferido para que importar main sea rápido.
+    
+    Se ejecuta una sola vez por proceso, desde create_app().
+    """
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        # La toolchain se detecta en segundo plano; al terminar se publica el estado
+        importer.get_toolchain()
+        instances = get_instances()
+        instances.discover()
+        instances.start_reaper()
+        start_game_watcher()
+        
+        # Verificar si ya hay un juego importado al iniciar
+        if os.path.exists(GAME_DIR):
+            importer.game_path = GAME_DIR
+            importer.status = "ready"
+            importer.log("Juego Hardcore Ninja encontrado y listo para usar")
+        _initialized = True
+
+def start_game_watcher():
+    """Mantener índice, tipo detectado y cachés al día con los cambios de GAME_DIR"""
+    global game_watcher
+    from file_watcher import FileWatcher
+    import project_index
+    game_watcher = FileWatcher(GAME_DIR, on_game_files_changed,
+                               on_lost=lambda: project_index.unwatch(GAME_DIR)).start()
+
+def on_game_files_changed(paths):
+    """Aplicar un lote del watcher solo a las rutas tocadas (None = todo el árbol)"""
+    import project_index
+    import static_files
+    project_index.apply_changes(GAME_DIR, paths)
+    # detect_game_type() recalcula al cambiar la generación del índice
+    if paths is None:
+        static_files.asset_cache.clear()
+        static_files.etags.clear()
+    else:
+        for rel_path in paths:
+            path = os.path.abspath(os.path.join(GAME_DIR, rel_path))
+            static_files.asset_cache.invalidate(path)
+            static_files.etags.invalidate(path)
+    kind = "full" if paths is None else "incremental"
+    app_metrics().file_changes.inc(kind=kind)
+    sample = sorted(paths)[:20] if paths else []
+    importer.events.publish("files", {"kind": kind, "count": len(paths) if paths else None,
+                                      "paths": sample})
+
+def create_app():
+    """Fábrica de la app para servidores WSGI (p. ej. gunicorn 'main:create_app()').
+    
+    Cada llamada crea una app Flask con las rutas de `views`; el trabajo de
+    arranque del proceso (initialize()) se hace solo la primera vez.
+    """
+    app = Flask(__name__)
+    app.register_blueprint(views)
+    initialize()
+    return app
+
+def create_game_supervisor(game_dir, port):
+    """Supervisor del proceso de un juego (game_server se importa al usarlo)"""
+    from game_server import GameServer
+    return GameServer(game_dir, port=port).create_supervisor()
+
+def publish_active_game():
+    """Guardar el juego activo para que los demás procesos lo adopten"""
+    try:
+        shared_state.write("active_game", {"game_path": importer.game_path,
+                                           "status": importer.status})
+    except OSError:
+        pass
+
+@views.before_app_request
+def sync_active_game():
+    """Adoptar el juego activo si otro proceso lo cambió (un stat por petición)"""
+    # Con un trabajo en curso no se lee: el cambio quedaría marcado como visto
+    # sin aplicarse y se perdería; se adopta en la primera petición posterior
+    if jobs.current():
+        return
+    state = shared_state.read_if_changed("active_game")
+    if not state:
+        return
+    game_path = state.get("game_path")
+    if game_path and os.path.isdir(game_path):
+        importer.game_path = game_path
+        importer.status = state.get("status", "ready")
+    elif not game_path:
+        importer.game_path = None
+        importer.status = "waiting"
+
+@views.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@views.before_app_request
+def start_request_profile():
+    # Las consultas al propio perfilador no se perfilan
+    from profiling import profiler
+    if profiler.enabled and not request.path.startswith('/api/profile'):
+        g.profile_session = profiler.start("request", f"{request.method} {request.path}")
+
+@views.teardown_app_request
+def finish_request_profile(exc):
+    # Sin sesiones abiertas no hace falta consultar `g`
+    from profiling import profiler
+    if profiler.open_sessions:
+        session = g.pop('profile_session', None)
+        if session:
+            profiler.finish(session)
+
+@views.after_app_request
+def record_request_metrics(response):
+    """Contar la petición, su latencia y los bytes enviados por ruta"""
+    started = g.pop('request_started', None)
+    # Se usa la regla (/game/<path:filename>) y no la URL para acotar las series
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    recorded = app_metrics()
+    recorded.http_requests.inc(route=route, method=request.method, status=response.status_code)
+    if started is not None:
+        recorded.http_latency.observe(time.perf_counter() - started, route=route,
+                                      method=request.method)
+    if response.content_length:
+        recorded.http_bytes.inc(response.content_length, route=route)
+    return response
+
+def running_game_processes():
+    processes = 1 if game_supervisor and game_supervisor.alive else 0
+    # Sin InstanceManager todavía no hay instancias en ejecución
+    instances = _instances.list() if _instances else []
+    return processes + sum(1 for instance in instances if instance.running)
+
+def asset_cache_stats():
+    import static_files
+    return static_files.asset_cache.stats()
+
+def asset_cache_counts():
+    stats = asset_cache_stats()
+    return {(result,): stats[key] for result, key in
+            (("hit", "hits"), ("miss", "misses"), ("bypass", "bypasses"))}
+
+def app_metrics():
+    """Métricas de la app; metrics se importa y se registran la primera vez que se usan.
+    
+    El registro reutiliza las métricas que ya existen con el mismo nombre:
+    dos hilos que lleguen aquí a la vez obtienen los mismos objetos.
+    """
+    global _app_metrics
+    if _app_metrics is None:
+        import metrics
+        registry = metrics.registry
+        registry.gauge("game_processes_active", "Procesos de juego supervisados en ejecución",
+                       callback=running_game_processes)
+        registry.counter("asset_cache_lookups_total", "Búsquedas en la caché de assets en memoria",
+                         ("result",), callback=asset_cache_counts)
+        registry.gauge("asset_cache_hit_ratio", "Proporción de aciertos de la caché de assets",
+                       callback=lambda: asset_cache_stats()["hit_ratio"])
+        registry.gauge("asset_cache_bytes", "Bytes ocupados por la caché de assets",
+                       callback=lambda: asset_cache_stats()["bytes"])
+        registry.gauge("import_jobs_pending", "Importaciones en cola o en ejecución",
+                       callback=lambda: jobs.pending())
+        _app_metrics = SimpleNamespace(
+            http_requests=registry.counter(
+                "http_requests_total", "Peticiones HTTP atendidas",
+                ("route", "method", "status")),
+            http_latency=registry.histogram(
+                "http_request_duration_seconds", "Tiempo hasta generar la respuesta",
+                ("route", "method")),
+            http_bytes=registry.counter(
+                "http_response_bytes_total", "Bytes de cuerpo de respuesta con longitud conocida",
+                ("route",)),
+            import_phases=registry.histogram(
+                "import_phase_duration_seconds", "Duración de las fases de importación",
+                ("phase",), buckets=metrics.PHASE_BUCKETS),
+            import_jobs=registry.counter(
+                "import_jobs_total", "Trabajos de importación terminados", ("state",)),
+            file_changes=registry.counter(
+                "game_file_change_batches_total",
+                "Lotes de cambios del directorio del juego aplicados", ("kind",)),
+        )
+    return _app_metrics
+
+@views.route('/metrics')
+def get_metrics():
+    """Métricas de este proceso en formato de texto de Prometheus"""
+    import metrics
+    app_metrics()
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+@views.route('/api/profile', methods=['GET', 'POST', 'DELETE'])
+def profile_settings():
+    """Estado del perfilado, activarlo/desactivarlo o borrar los perfiles guardados"""
+    from profiling import profiler
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        try:
+            profiler.configure(enabled=data.get('enabled'), mode=data.get('mode'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    elif request.method == 'DELETE':
+        profiler.clear()
+    return jsonify(profiler.status())
+
+@views.route('/api/profile/<int:profile_id>')
+def get_profile(profile_id):
+    """Datos de un perfil y, para cProfile, las funciones más costosas"""
+    from profiling import profiler
+    record = profiler.get(profile_id)
+    if not record:
+        return jsonify({"error": "Perfil no encontrado"}), 404
+    info = profiler.describe(record)
+    info["summary"] = record.get("summary")
+    return jsonify(info)
 
-# Verificar si ya hay un juego importado al iniciar
-if os.path.exists(GAME_DIR):
-    importer.game_path = GAME_DIR
-    importer.status = "ready"
-    importer.log("Juego Hardcore Ninja encontrado y listo para usar")
+@views.route('/api/profile/<int:profile_id>/download')
+def download_profile(profile_id):
+    """Descargar un perfil como .pstats (cProfile) o pilas colapsadas (sampling)"""
+    from profiling import profiler
+    record = profiler.get(profile_id)
+    if not record:
+        return jsonify({"error": "Perfil no encontrado"}), 404
+    if "pstats" in record:
+        # Se abre con pstats.Stats(archivo) o con snakeviz
+        body, mimetype, extension = record["pstats"], "application/octet-stream", "pstats"
+    else:
+        # Formato de flamegraph.pl / speedscope
+        body, mimetype, extension = record["collapsed"], "text/plain", "collapsed.txt"
+    response = Response(body, mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=profile-{profile_id}.{extension}"
+    return response
 
-@app.route('/')
+@views.route('/')
 def index():
     """Página principal"""
     return render_template('index.html')
 
-@app.route('/api/status')
+@views.route('/api/status')
 def get_status():
     """Obtener estado actual del importador"""
+    job = jobs.current()
+    return jsonify((job.importer if job else importer).snapshot())
+
+@views.route('/api/events')
+def stream_events():
+    """Stream de Server-Sent Events con cambios de estado y nuevos logs"""
+    last_event_id = request.headers.get('Last-Event-ID',
+                                        request.args.get('last_event_id'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        last_event_id = None
+    
+    messages = importer.events.stream(last_event_id)
+    if messages is None:
+        # Sin plaza: el cliente vuelve al polling y reintenta más tarde
+        return (jsonify({"error": "Demasiados streams de eventos abiertos"}), 503,
+                {"Retry-After": "30"})
+    
+    # Sin stream_with_context: los mensajes no usan la petición y así
+    # Response.close() llega al EventStream y libera su plaza
+    return Response(
+        messages,
+        mimetype='text/event-stream',
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@views.route('/api/logs')
+def get_logs():
+    """Obtener los registros de log posteriores al cursor `since`"""
+    since = request.args.get('since', 0, type=int)
+    limit = request.args.get('limit', None, type=int)
+    records, first_seq = importer.logs.since(since, limit)
     return jsonify({
-        "status": importer.status,
-        "logs": importer.logs,
-        "game_path": importer.game_path,
-        "git_available": importer.check_git_installed()
+        "logs": records,
+        "last_seq": records[-1]["seq"] if records else max(since, first_seq - 1),
+        # Indica si se perdieron registros porque salieron del buffer
+        "truncated": since + 1 < first_seq
     })
 
-@app.route('/api/import', methods=['POST'])
+@views.route('/api/toolchain')
+def get_toolchain():
+    """Obtener las versiones detectadas de git, node, npm y pip"""
+    return jsonify({
+        "toolchain": importer.get_toolchain(),
+        "checked_at": importer.toolchain_checked_at,
+        "ttl": TOOLCHAIN_TTL
+    })
+
+@views.route('/api/toolchain/refresh', methods=['POST'])
+def refresh_toolchain():
+    """Forzar una nueva detección de la toolchain"""
+    toolchain = importer.refresh_toolchain()
+    return jsonify({
+        "toolchain": toolchain,
+        "checked_at": importer.toolchain_checked_at,
+        "ttl": TOOLCHAIN_TTL
+    })
+
+@views.route('/api/import', methods=['POST'])
 def import_game():
     """Importar juego desde GitHub"""
-    data = request.get_json()
+    data = request.get_json() or {}
+    repo_url, strategy, error = parse_import_request(data)
+    if error:
+        return error
+    
+    # Encolar la importación; se ejecuta en el pool de trabajos
+    job = jobs.submit(repo_url, strategy=strategy)
+    if not job:
+        return jsonify({"error": "Demasiadas importaciones pendientes"}), 429
+    return job_accepted(job)
+
+def parse_import_request(data):
+    """Validar repo_url y strategy; devuelve (repo_url, strategy, respuesta_de_error)"""
     repo_url = data.get('repo_url', '').strip()
     
     if not repo_url:
-        return jsonify({"error": "URL del repositorio requerida"}), 400
+        return None, None, (jsonify({"error": "URL del repositorio requerida"}), 400)
     
-    # Validar URL de GitHub
-    if not repo_url.startswith('https://github.com/'):
-        return jsonify({"error": "URL debe ser de GitHub"}), 400
+    # Validar URL de GitHub (o repositorio local si ALLOW_LOCAL_REPOS=1)
+    is_local = repo_url.startswith('file://') or os.path.isdir(repo_url)
+    if not repo_url.startswith('https://github.com/') and not (ALLOW_LOCAL_REPOS and is_local):
+        return None, None, (jsonify({"error": "URL debe ser de GitHub"}), 400)
     
-    # Iniciar proceso de importación
-    success = importer.clone_repository(repo_url)
+    strategy = data.get('strategy', CLONE_STRATEGY)
+    if strategy not in CLONE_STRATEGIES:
+        return None, None, (jsonify({"error": f"Estrategia inválida, usa una de: {', '.join(CLONE_STRATEGIES)}"}), 400)
     
-    if success:
-        importer.setup_game()
-        return jsonify({"success": True})
-    else:
-        return jsonify({"error": "Error al importar el juego"}), 500
+    return repo_url, strategy, None
+
+def job_accepted(job, **extra):
+    """Respuesta 202 para un trabajo encolado"""
+    response = jsonify({"success": True, "job_id": job.id, "job": job.to_dict(), **extra})
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return response, 202
 
-@app.route('/api/game_info')
+@views.route('/api/jobs')
+def list_jobs():
+    """Listar los trabajos de importación"""
+    return jsonify({
+        "jobs": jobs.snapshots(),
+        "workers": jobs.max_workers,
+        "pending": jobs.pending()
+    })
+
+@views.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """Obtener el estado de un trabajo de importación"""
+    job = jobs.snapshot(job_id)
+    if not job:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    return jsonify(job)
+
+@views.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancelar un trabajo de importación"""
+    job = jobs.get(job_id)
+    if not job:
+        if jobs.snapshot(job_id):
+            return jsonify({"error": "El trabajo se ejecuta en otro proceso del servidor"}), 409
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    if not jobs.cancel(job_id):
+        return jsonify({"error": "El trabajo ya terminó", "job": job.to_dict()}), 409
+    return jsonify({"success": True, "job": job.to_dict()})
+
+def switch_release(target, release_id=None):
+    """Activar una versión del juego de `target` (la anterior si no se indica)"""
+    if not target.releases:
+        return jsonify({"error": "Las versiones están desactivadas (RELEASES=0)"}), 409
+    try:
+        if release_id is None:
+            release_id = target.releases.rollback()
+        else:
+            target.releases.activate(release_id)
+    except KeyError:
+        return jsonify({"error": "Versión no encontrada"}), 404
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 409
+    except OSError as e:
+        return jsonify({"error": f"No se pudo activar la versión: {e}"}), 500
+    
+    import project_index
+    project_index.unwatch(target.game_dir)
+    target.game_path = target.game_dir
+    target.status = "ready"
+    target.log(f"Versión {release_id} activada")
+    if target is importer:
+        publish_active_game()
+    return jsonify({"success": True, "current": release_id})
+
+@views.route('/api/releases')
+def list_releases():
+    """Versiones conservadas del juego activo"""
+    if not importer.releases:
+        return jsonify({"enabled": False, "current": None, "releases": []})
+    return jsonify({"enabled": True, "current": importer.releases.current(),
+                    "keep": importer.releases.keep, "releases": importer.releases.list()})
+
+@views.route('/api/releases/<release_id>/activate', methods=['POST'])
+def activate_release(release_id):
+    """Volver a una versión concreta del juego activo"""
+    return switch_release(importer, release_id)
+
+@views.route('/api/releases/rollback', methods=['POST'])
+def rollback_release():
+    """Volver a la versión anterior del juego activo"""
+    return switch_release(importer)
+
+@views.route('/api/game_info')
 def get_game_info():
-    """Obtener información del juego importado"""
+    """Obtener información del juego importado.
+    
+    Sin parámetros devuelve el documento completo (con `structure`) como un
+    stream. Parámetros:
+      view=summary      solo tipo, archivo principal, dependencias y file_count
+      limit, cursor     página de `limit` rutas tras `cursor` (next_cursor en
+                        la respuesta; null en la última página)
+      prefix            solo las rutas que empiezan por `prefix`
+      format=tree       rutas como árbol {"dir": {...}, "archivo": tamaño}
+    Con limit, cursor o prefix las rutas van en orden lexicográfico.
+    """
     if not importer.game_path:
         return jsonify({"error": "No hay juego importado"}), 404
     
-    game_info = importer.detect_game_type()
-    return jsonify(game_info)
+    view = request.args.get('view', 'full')
+    output = request.args.get('format', 'list')
+    prefix = request.args.get('prefix', '')
+    if view not in ('full', 'summary') or output not in ('list', 'tree'):
+        return jsonify({"error": "Usa view=full|summary y format=list|tree"}), 400
+    paged = any(name in request.args for name in ('limit', 'cursor', 'prefix'))
+    try:
+        limit = int(request.args.get('limit', GAME_INFO_PAGE_SIZE))
+        after = decode_cursor(request.args['cursor']) if 'cursor' in request.args else None
+    except ValueError:
+        return jsonify({"error": "limit o cursor inválido"}), 400
+    if paged and not 1 <= limit <= GAME_INFO_MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit debe estar entre 1 y {GAME_INFO_MAX_PAGE_SIZE}"}), 400
+    
+    def select():
+        """Listado y, si hay paginación, la página pedida: (listado, página, rango)"""
+        listing = importer.file_listing()
+        if listing is None or not paged:
+            return listing, None, None
+        paths = listing[1]
+        first, end = prefix_range(paths, prefix)
+        start = first if after is None else max(first, bisect.bisect_right(paths, after))
+        return listing, paths[start:min(end, start + limit)], (first, start, end)
+    
+    listing, page, bounds = select()
+    if listing is None:
+        return jsonify({"error": "No hay juego importado"}), 404
+    # Sin FileWatcher el índice no ve las ediciones en el sitio: antes de la
+    # ETag se comprueban los archivos cuyo tamaño o contenido sale en la respuesta
+    checked = listing[4]
+    if output == 'tree' and view != 'summary':
+        checked = itertools.chain(checked, listing[1] if page is None else page)
+    if importer.verify_files(checked):
+        listing, page, bounds = select()
+        if listing is None:
+            return jsonify({"error": "No hay juego importado"}), 404
+    game_info, paths, entries, version, _ = listing
+    
+    # La respuesta solo depende del contenido del juego y de los parámetros
+    etag = hashlib.sha1(f"{version}\0{request.query_string!r}".encode()).hexdigest()[:20]
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    
+    document = {
+        "type": game_info["type"],
+        "main_file": game_info["main_file"],
+        "dependencies": game_info["dependencies"],
+        "file_count": len(paths),
+        "version": version
+    }
+    if view == 'summary':
+        response = jsonify(document)
+    elif paged:
+        first, start, end = bounds
+        document["prefix"] = prefix
+        document["matched"] = end - first
+        document["next_cursor"] = encode_cursor(page[-1]) if start + limit < end else None
+        if output == 'tree':
+            document["tree"] = json.loads("".join(tree_chunks(page, entries)))
+        else:
+            document["structure"] = page
+        response = jsonify(document)
+    else:
+        # Documento completo: se genera por fragmentos en lugar de en memoria
+        if output == 'tree':
+            key, body = "tree", tree_chunks(paths, entries)
+        else:
+            key, body = "structure", list_chunks(game_info["structure"])
+        head = json.dumps(document)[:-1] + f', "{key}": '
+        response = Response(itertools.chain([head], body, ["}"]), mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response
+
+def encode_cursor(path):
+    return base64.urlsafe_b64encode(path.encode("utf-8", "surrogateescape")).decode()
+
+def decode_cursor(cursor):
+    """Ruta codificada en un cursor; lanza ValueError si no es válido"""
+    try:
+        return base64.b64decode(cursor.encode(), altchars=b"-_", validate=True).decode(
+            "utf-8", "surrogateescape")
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(str(e))
 
-@app.route('/game/<path:filename>')
+def prefix_range(paths, prefix):
+    """Rango [inicio, fin) de las rutas ordenadas que empiezan por `prefix`"""
+    if not prefix:
+        return 0, len(paths)
+    start = bisect.bisect_left(paths, prefix)
+    if prefix[-1] == chr(sys.maxunicode):
+        return start, len(paths)
+    # La primera cadena mayor que todas las que empiezan por `prefix`
+    end = bisect.bisect_left(paths, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo=start)
+    return start, end
+
+def list_chunks(paths):
+    """Array JSON de rutas en fragmentos de GAME_INFO_STREAM_CHUNK"""
+    yield "["
+    for offset in range(0, len(paths), GAME_INFO_STREAM_CHUNK):
+        chunk = json.dumps(paths[offset:offset + GAME_INFO_STREAM_CHUNK])[1:-1]
+        yield ("," if offset else "") + chunk
+    yield "]"
+
+def tree_chunks(paths, entries):
+    """Árbol JSON {"dir": {...}, "archivo": tamaño} a partir de rutas en orden lexicográfico.
+    
+    Los directorios se escriben una sola vez, sin repetir el prefijo en cada
+    ruta; el orden garantiza que el contenido de cada directorio es contiguo.
+    """
+    # Codificador de cadenas en C de json (json.dumps por nombre es mucho más lento)
+    quote = json.encoder.encode_basestring_ascii
+    open_dirs = []
+    current_dir = ""
+    parts = ["{"]
+    separator = ""
+    for path in paths:
+        parent, _, name = path.rpartition(os.sep)
+        if parent != current_dir:
+            # Cerrar los directorios que no comparte y abrir los nuevos
+            dirs = parent.split(os.sep) if parent else []
+            common = 0
+            while (common < len(open_dirs) and common < len(dirs)
+                   and open_dirs[common] == dirs[common]):
+                common += 1
+            if len(open_dirs) > common:
+                parts.append("}" * (len(open_dirs) - common))
+                separator = ","
+            del open_dirs[common:]
+            for directory in dirs[common:]:
+                parts.append(separator + quote(directory) + ":{")
+                separator = ""
+                open_dirs.append(directory)
+            current_dir = parent
+        entry = entries.get(path)
+        parts.append(f"{separator}{quote(name)}:{entry[0] if entry else 0}")
+        separator = ","
+        if len(parts) >= GAME_INFO_STREAM_CHUNK:
+            yield "".join(parts)
+            parts = []
+    parts.append("}" * (len(open_dirs) + 1))
+    yield "".join(parts)
+
+@views.route('/game/<path:filename>')
 def serve_game_file(filename):
     """Servir archivos del juego"""
     if not importer.game_path:
         return "No hay juego importado", 404
+    return send_game_file(importer.game_path, filename)
+
+@views.route('/game/@<name>/<path:filename>')
+def serve_instance_file(name, filename):
+    """Servir archivos de una instancia.
     
-    try:
-        return send_from_directory(importer.game_path, filename)
-    except FileNotFoundError:
+    El prefijo @ las separa del juego activo: con /game/<instancia>/ una
+    instancia llamada como uno de sus directorios (public, assets...) lo
+    ocultaría.
+    """
+    instance = get_instances().get(name)
+    if not instance or not instance.importer.game_path:
+        return "Instancia no encontrada", 404
+    instance.touch()
+    return send_game_file(instance.importer.game_path, filename)
+
+def send_game_file(game_path, filename):
+    """Responder con un archivo del juego (caché en memoria, variantes y ETags)"""
+    import static_files
+    path = safe_join(game_path, filename)
+    if not path or not os.path.isfile(path):
         return "Archivo no encontrado", 404
+    
+    # Variante .br/.gz generada al importar, si el cliente la acepta
+    variant, encoding = static_files.precompressed_variant(
+        path, request.headers.get("Accept-Encoding"))
+    
+    served_path = os.path.abspath(variant or path)
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    
+    entry = static_files.asset_cache.get(served_path)
+    etag = entry.etag if entry else static_files.etags.get(served_path)
+    # werkzeug compara If-Range sin distinguir ETags débiles: si no coincide
+    # de forma fuerte se ignora el Range y se envía el archivo completo
+    if not static_files.if_range_matches(request.headers.get("If-Range"), etag):
+        request.environ.pop("HTTP_RANGE", None)
+
+    if entry:
+        # Archivo pequeño y frecuente: se responde desde memoria
+        response = Response(entry.data, mimetype=mimetype)
+        response.set_etag(entry.etag)
+        response.last_modified = entry.mtime
+        response.make_conditional(request, accept_ranges=True, complete_length=entry.size)
+    else:
+        # Archivo grande: send_file entrega el archivo abierto al servidor WSGI
+        # (wsgi.file_wrapper), que puede usar sendfile. El ETag por contenido
+        # se calcula una vez por tamaño+mtime; Flask responde 304 y 206 con él
+        response = send_file(served_path, mimetype=mimetype, etag=etag)
+    
+    response.headers["Cache-Control"] = static_files.cache_control(filename)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if variant or static_files.has_variants(path):
+        response.vary.add("Accept-Encoding")
+    return response
+
+@views.route('/api/deps_cache')
+def get_deps_cache():
+    """Estado de la caché de dependencias (pip / npm)"""
+    from dependency_cache import dependency_cache
+    return jsonify(dependency_cache.stats())
+
+@views.route('/api/deps_cache/evict', methods=['POST'])
+def evict_deps_cache():
+    """Aplicar la política de expulsión de la caché de dependencias"""
+    from dependency_cache import dependency_cache
+    removed = dependency_cache.evict()
+    return jsonify({"removed": removed, "stats": dependency_cache.stats()})
 
-@app.route('/start_game_server')
+@views.route('/api/git_cache')
+def get_git_cache():
+    """Estado de la caché de objetos de git (espejos por repositorio)"""
+    from git_cache import git_cache
+    return jsonify(git_cache.stats())
+
+@views.route('/api/git_cache/evict', methods=['POST'])
+def evict_git_cache():
+    """Aplicar la política de expulsión de la caché de git"""
+    from git_cache import git_cache
+    removed = git_cache.evict()
+    return jsonify({"removed": removed, "stats": git_cache.stats()})
+
+@views.route('/api/cache/stats')
+def get_cache_stats():
+    """Contadores de la caché de assets en memoria"""
+    import static_files
+    return jsonify(static_files.asset_cache.stats())
+
+@views.route('/api/watcher')
+def get_watcher_stats():
+    """Estado de la vigilancia del directorio del juego"""
+    if not game_watcher:
+        return jsonify({"enabled": False})
+    return jsonify(dict(game_watcher.stats(), enabled=game_watcher.requested_backend != "off"))
+
+@views.route('/api/cache/clear', methods=['POST'])
+def clear_cache():
+    """Vaciar la caché de assets en memoria"""
+    import static_files
+    static_files.asset_cache.clear()
+    return jsonify({"success": True, "stats": static_files.asset_cache.stats()})
+
+@views.route('/start_game_server')
 def start_game_server():
     """Iniciar el servidor del juego"""
+    global game_supervisor
     if not importer.game_path:
         return jsonify({"error": "No hay juego importado"}), 404
     
     try:
-        # Usar workflows para iniciar el servidor del juego en puerto 5001
-        from subprocess import Popen, PIPE
-        import signal
-        
-        # Cambiar al directorio del juego e iniciar servidor
-        game_server_cmd = f"cd {importer.game_path} && node server/index.js"
+        with supervisor_lock:
+            # Con releases game_path es un enlace simbólico y el supervisor
+            # guarda el directorio real: tras publicar otra versión difieren
+            game_dir = os.path.realpath(importer.game_path)
+            running = (game_supervisor is not None and game_supervisor.alive
+                       and os.path.realpath(game_supervisor.cwd) == game_dir)
+            if not running:
+                if game_supervisor:
+                    game_supervisor.stop()
+                if port_open(GAME_PORT):
+                    return jsonify({"error": f"El puerto {GAME_PORT} está ocupado "
+                                             f"por otro proceso"}), 409
+                # Lanzar el juego como proceso supervisado en GAME_PORT
+                game_supervisor = create_game_supervisor(importer.game_path, GAME_PORT)
+                if not game_supervisor:
+                    return jsonify({"error": "Tipo de juego no soportado"}), 400
+                game_supervisor.start()
         
         return jsonify({
             "success": True, 
             "message": "Servidor del juego iniciándose...",
-            "game_url": f"http://{request.host.split(':')[0]}:5001"
+            "game_url": f"http://{request.host.split(':')[0]}:{GAME_PORT}",
+            "process": game_supervisor.status()
         })
         
     except Exception as e:
         return jsonify({"error": f"Error al iniciar servidor: {str(e)}"}), 500
 
-@app.route('/play')
+@views.route('/api/game_process')
+def get_game_process():
+    """Estado del proceso del juego (latencia de inicio, reinicios...)"""
+    if not game_supervisor:
+        return jsonify({"state": "stopped"})
+    return jsonify(game_supervisor.status())
+
+@views.route('/api/game_process/output')
+def get_game_process_output():
+    """Salida del proceso del juego posterior al cursor `since`"""
+    if not game_supervisor:
+        return jsonify({"lines": [], "last_seq": 0})
+    since = request.args.get('since', 0, type=int)
+    lines = game_supervisor.output_since(since)
+    return jsonify({"lines": lines, "last_seq": lines[-1]["seq"] if lines else since})
+
+@views.route('/api/game_process/stop', methods=['POST'])
+def stop_game_process():
+    """Detener el proceso del juego"""
+    with supervisor_lock:
+        if game_supervisor:
+            game_supervisor.stop()
+    return jsonify({"success": True})
+
+@views.route('/api/instances', methods=['GET', 'POST'])
+def instances_collection():
+    """Listar instancias o crear una nueva e importar su juego"""
+    instances = get_instances()
+    if request.method == 'GET':
+        return jsonify({
+            "instances": [instance.to_dict() for instance in instances.list()],
+            "max_instances": instances.max_instances,
+            "ports": instances.ports.stats()
+        })
+    
+    job, instance, error = submit_instance_import(request.get_json() or {})
+    if error:
+        return error
+    return job_accepted(job, instance=instance.to_dict())
+
+def submit_instance_import(data):
+    """Crear una instancia y encolar la importación de su juego.
+    
+    Devuelve (trabajo, instancia, respuesta_de_error).
+    """
+    repo_url, strategy, error = parse_import_request(data)
+    if error:
+        return None, None, error
+    
+    try:
+        instance = get_instances().create(data.get('name', '').strip())
+    except ValueError as e:
+        return None, None, (jsonify({"error": str(e)}), 400)
+    except OverflowError as e:
+        return None, None, (jsonify({"error": str(e)}), 429)
+    
+    job = jobs.submit(repo_url, game_dir=instance.game_dir, strategy=strategy,
+                      target=instance.importer)
+    if not job:
+        get_instances().remove(instance.name)
+        return None, None, (jsonify({"error": "Demasiadas importaciones pendientes"}), 429)
+    return job, instance, None
+
+def default_instance_name(repo_url):
+    """Nombre de instancia a partir de propietario y repositorio (los forks no chocan)"""
+    parts = repo_url.strip().rstrip('/').removesuffix('.git').split('/')[-2:]
+    return re.sub(r'[^a-z0-9_-]+', '-', '-'.join(parts).lower()).strip('-')[-40:]
+
+@views.route('/api/import/batch', methods=['POST'])
+def import_batch():
+    """Importar varios repositorios, cada uno en su propia instancia.
+    
+    Los trabajos se ejecutan en paralelo en el pool de importaciones y
+    comparten los espejos de la caché de git. Cada elemento puede ser una URL
+    o un objeto con repo_url y, opcionalmente, name y strategy.
+    """
+    data = request.get_json() or {}
+    repositories = data.get('repositories')
+    if not isinstance(repositories, list) or not repositories:
+        return jsonify({"error": "Lista de repositorios requerida"}), 400
+    if len(repositories) > BATCH_IMPORT_LIMIT:
+        return jsonify({"error": f"Máximo {BATCH_IMPORT_LIMIT} repositorios por lote"}), 400
+    
+    accepted = []
+    errors = []
+    for position, item in enumerate(repositories):
+        if isinstance(item, str):
+            item = {"repo_url": item}
+        if not isinstance(item, dict) or not isinstance(item.get('repo_url', ''), str):
+            errors.append({"index": position, "error": "Elemento inválido", "status": 400})
+            continue
+        item = dict(item)
+        item.setdefault('strategy', data.get('strategy', CLONE_STRATEGY))
+        item.setdefault('name', default_instance_name(item.get('repo_url', '')))
+        job, instance, error = submit_instance_import(item)
+        if error:
+            response, status = error
+            errors.append({"index": position, "repo_url": item.get('repo_url'),
+                           "error": response.get_json()["error"], "status": status})
+            continue
+        accepted.append({"job_id": job.id, "job": job.to_dict(), "instance": instance.to_dict()})
+    
+    if accepted:
+        status = 202
+    else:
+        status = 429 if all(error["status"] == 429 for error in errors) else 400
+    return jsonify({"success": bool(accepted), "jobs": accepted, "errors": errors}), status
+
+@views.route('/api/instances/<name>', methods=['GET', 'DELETE'])
+def instance_detail(name):
+    """Estado de una instancia o eliminarla junto con su juego"""
+    instance = get_instances().get(name)
+    if not instance:
+        return jsonify({"error": "Instancia no encontrada"}), 404
+    if request.method == 'DELETE':
+        get_instances().remove(name)
+        return jsonify({"success": True})
+    return jsonify(instance.to_dict())
+
+@views.route('/api/instances/<name>/releases')
+def instance_releases(name):
+    """Versiones conservadas del juego de una instancia"""
+    instance = get_instances().get(name)
+    if not instance:
+        return jsonify({"error": "Instancia no encontrada"}), 404
+    releases = instance.importer.releases
+    return jsonify({"enabled": bool(releases),
+                    "current": releases.current() if releases else None,
+                    "releases": releases.list() if releases else []})
+
+@views.route('/api/instances/<name>/rollback', methods=['POST'])
+def rollback_instance(name):
+    """Volver a la versión anterior (o a `release` del cuerpo) de una instancia"""
+    instance = get_instances().get(name)
+    if not instance:
+        return jsonify({"error": "Instancia no encontrada"}), 404
+    data = request.get_json(silent=True) or {}
+    return switch_release(instance.importer, data.get('release'))
+
+@views.route('/api/instances/<name>/start', methods=['GET', 'POST'])
+def start_instance(name):
+    """Iniciar el juego de una instancia en un puerto del pool"""
+    instance = get_instances().get(name)
+    if not instance:
+        return jsonify({"error": "Instancia no encontrada"}), 404
+    if not instance.importer.game_path:
+        return jsonify({"error": "La instancia no tiene un juego importado"}), 409
+    
+    try:
+        instance = get_instances().start(name)
+    except OverflowError as e:
+        return jsonify({"error": str(e)}), 503
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Error al iniciar servidor: {str(e)}"}), 500
+    
+    return jsonify({
+        "success": True,
+        "message": "Servidor del juego iniciándose...",
+        "game_url": f"http://{request.host.split(':')[0]}:{instance.port}",
+        "process": instance.supervisor.status()
+    })
+
+@views.route('/api/instances/<name>/stop', methods=['POST'])
+def stop_instance(name):
+    """Detener el juego de una instancia y liberar su puerto"""
+    if not get_instances().get(name):
+        return jsonify({"error": "Instancia no encontrada"}), 404
+    get_instances().stop(name)
+    return jsonify({"success": True})
+
+@views.route('/play')
 def play_game():
     """Redirigir al juego"""
     if not importer.game_path:
@@ -247,9 +1943,23 @@ def play_game():
     
     # Obtener información del host para la URL del juego
     host_ip = request.host.split(':')[0]
-    game_url = f"http://{host_ip}:5001"
+    game_url = f"http://{host_ip}:{GAME_PORT}"
+    return render_play_page(game_url, '/start_game_server')
+
+@views.route('/play/<name>')
+def play_instance(name):
+    """Página para iniciar el juego de una instancia"""
+    instance = get_instances().get(name)
+    if not instance or not instance.importer.game_path:
+        return "Instancia no encontrada o sin juego importado. <a href='/'>Volver al inicio</a>", 404
     
-    # Mostrar página con instrucciones para ejecutar el juego
+    instance.touch()
+    # El puerto se asigna al iniciar; hasta entonces se muestra el último conocido
+    game_url = f"http://{request.host.split(':')[0]}:{instance.port}" if instance.port else "(se asigna al iniciar)"
+    return render_play_page(game_url, f'/api/instances/{name}/start')
+
+def render_play_page(game_url, start_url):
+    """Página con instrucciones para ejecutar el juego"""
     return f"""
     <!DOCTYPE html>
     <html lang="es">
@@ -329,10 +2039,11 @@ def play_game():
                 btn.innerHTML = '<i class="spinner-border spinner-border-sm me-2"></i>Iniciando...';
                 
                 try {{
-                    const response = await fetch('/start_game_server');
+                    const response = await fetch('{start_url}');
                     const data = await response.json();
                     
                     if (data.success) {{
+                        document.getElementById('gameUrl').textContent = data.game_url;
                         status.innerHTML = `
                             <div class="alert alert-success">
                                 <i class="fas fa-check-circle"></i> ¡Servidor iniciado exitosamente!
@@ -375,5 +2086,7 @@ if __name__ == '__main__':
     print("=== Hardcore Ninja Game Importer ===")
     print(f"Servidor iniciando en puerto {PORT}")
     print("Accede a http://localhost:5000 para comenzar")
+    print("Servidor de desarrollo; en producción usa: python serve.py")
     
-    app.run(host='0.0.0.0', port=PORT, debug=True)
+    # El depurador y el recargador solo se activan con FLASK_DEBUG=1
+    create_app().run(host='0.0.0.0', port=PORT, debug=os.environ.get("FLASK_DEBUG") == "1")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Métricas en formato de texto de Prometheus
+Contadores, gauges e histogramas con etiquetas guardados en memoria, sin
+dependencias externas. Cada proceso tiene su propio registro: con varios
+workers cada uno expone sus propias series.
+"""
+
+import bisect
+import threading
+
+# Buckets (segundos) para peticiones HTTP y para fases de importación
+REQUEST_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PHASE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+               for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+class Metric:
+    """Serie con etiquetas.
+
+    Con `callback` los valores se leen al exportar: el callback devuelve un
+    número o un dict {(valores de etiquetas...): valor}.
+    """
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labels=(), callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self):
+        if self.callback:
+            value = self.callback()
+            values = value if isinstance(value, dict) else {(): value}
+            with self._lock:
+                self._values = {tuple(str(v) for v in key): val for key, val in values.items()}
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{format_labels(self.label_names, key)} {format_value(value)}"
+                for key, value in items]
+
+    def render(self):
+        return self.header() + self.samples()
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=REQUEST_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Conteos por bucket (no acumulados), suma y total
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total, count))
+                     for key, (counts, total, count) in sorted(self._values.items())]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = format_labels(self.label_names, key, [("le", format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.label_names, key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Registrar una métrica; si ya existe con ese nombre se reutiliza"""
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labels=(), callback=None):
+        return self.register(Counter(name, documentation, labels, callback))
+
+    def gauge(self, name, documentation, labels=(), callback=None):
+        return self.register(Gauge(name, documentation, labels, callback))
+
+    def histogram(self, name, documentation, labels=(), buckets=REQUEST_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self):
+        """Texto de exposición de todas las métricas"""
+        lines = []
+        for name in sorted(self.metrics):
+            try:
+                lines.extend(self.metrics[name].render())
+            except Exception as e:
+                # Un callback roto no debe romper el resto de la exportación
+                lines.append(f"# ERROR {name}: {e}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Precompresión de los assets del juego
+Genera variantes .gz (y .br si el módulo brotli está instalado) junto a cada
+archivo comprimible para que los servidores las envíen sin comprimir en
+cada petición
+"""
+
+import gzip
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import project_index
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Extensiones que vale la pena comprimir
+COMPRESSIBLE_EXTENSIONS = {".js", ".mjs", ".html", ".css", ".json", ".svg",
+                           ".txt", ".map", ".xml", ".wasm"}
+# Archivos más pequeños que esto no se comprimen
+MIN_SIZE = int(os.environ.get("PRECOMPRESS_MIN_SIZE", "256"))
+# Solo se guarda la variante si ahorra al menos este porcentaje
+MIN_SAVING = 0.1
+
+SIDECARS = [(".gz", "gzip")]
+if brotli:
+    SIDECARS.insert(0, (".br", "br"))
+
+def compress(data, suffix):
+    if suffix == ".br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def precompress_file(path):
+    """Crear las variantes comprimidas de un archivo.
+
+    Devuelve {"original": bytes, ".gz": bytes, ".br": bytes}; las variantes
+    que no se guardan no aparecen.
+    """
+    stat = os.stat(path)
+    sizes = {"original": stat.st_size}
+    data = None
+    for suffix, encoding in SIDECARS:
+        sidecar = path + suffix
+        try:
+            sidecar_stat = os.stat(sidecar)
+            if sidecar_stat.st_mtime_ns >= stat.st_mtime_ns:
+                sizes[suffix] = sidecar_stat.st_size
+                continue  # Ya está al día
+        except OSError:
+            pass
+
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        compressed = compress(data, suffix)
+        if len(compressed) > len(data) * (1 - MIN_SAVING):
+            # No compensa; quitar una variante vieja si existía
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+            continue
+
+        tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, sidecar)
+        sizes[suffix] = len(compressed)
+    return sizes
+
+def eligible_files(root):
+    index = project_index.get_index(root)
+    for rel_path, (size, mtime, role) in index.entries().items():
+        extension = os.path.splitext(rel_path)[1].lower()
+        if extension in COMPRESSIBLE_EXTENSIONS and size >= MIN_SIZE:
+            yield rel_path, extension
+
+def precompress_tree(root, workers=None):
+    """Precomprimir en paralelo los archivos elegibles de `root`.
+
+    zlib y brotli liberan el GIL mientras comprimen, así que un pool de hilos
+    aprovecha todos los núcleos. Devuelve un reporte de tamaños por extensión.
+    """
+    files = list(eligible_files(root))
+    workers = workers or os.cpu_count() or 1
+    report = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda item: precompress_file(os.path.join(root, item[0])), files)
+        for (rel_path, extension), sizes in zip(files, results):
+            entry = report.setdefault(extension, {"files": 0, "original": 0, "gzip": 0, "br": 0})
+            entry["files"] += 1
+            entry["original"] += sizes["original"]
+            # Si no se guardó variante se cuenta el tamaño original
+            entry["gzip"] += sizes.get(".gz", sizes["original"])
+            entry["br"] += sizes.get(".br", sizes["original"])
+    return report
+
+def format_report(report):
+    """Líneas de texto con el ahorro por tipo de archivo"""
+    lines = []
+    for extension, entry in sorted(report.items()):
+        original = entry["original"] or 1
+        line = (f"{extension:<6} {entry['files']:>5} archivos  {entry['original']:>10} bytes"
+                f"  gzip {entry['gzip']:>10} ({100 - entry['gzip'] * 100 // original}% menos)")
+        if brotli:
+            line += f"  br {entry['br']:>10} ({100 - entry['br'] * 100 // original}% menos)"
+        lines.append(line)
+    return lines
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python precompress.py <directorio_del_juego>")
+        sys.exit(1)
+
+    report = precompress_tree(sys.argv[1])
+    if not brotli:
+        print("Módulo brotli no disponible: solo se generan variantes .gz")
+    for line in format_report(report):
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Perfilado opcional de peticiones y fases de importación
+Con el perfilado activo cada petición de Flask y cada fase de GameImporter
+se mide con cProfile (descargable como .pstats) o con un muestreador de
+pilas (descargable como pilas colapsadas para flamegraph.pl/speedscope).
+Los últimos perfiles se guardan en memoria. Desactivado, el coste es una
+comprobación de un booleano.
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+PROFILE_MODES = ("cprofile", "sampling")
+PROFILE_ENABLED = os.environ.get("PROFILE", "0") == "1"
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "cprofile")
+# Perfiles que se conservan en memoria
+PROFILE_CAPACITY = int(os.environ.get("PROFILE_CAPACITY", "20"))
+# Segundos entre muestras en modo sampling
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", "0.005"))
+# Solo se guardan los perfiles que duran al menos esto (segundos)
+PROFILE_MIN_DURATION = float(os.environ.get("PROFILE_MIN_DURATION", "0"))
+# Funciones listadas en el resumen de un perfil de cProfile
+SUMMARY_LINES = 30
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def collapse_stack(frame):
+    """Pila de `frame` en formato colapsado: raíz;...;hoja"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+class Sampler:
+    """Hilo que toma muestras de las pilas de los hilos registrados"""
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.sessions = {}  # ident del hilo -> lista de Counter de pilas
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, ident, stacks):
+        with self._lock:
+            self.sessions.setdefault(ident, []).append(stacks)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profile-sampler",
+                                                daemon=True)
+                self._thread.start()
+
+    def remove(self, ident, stacks):
+        with self._lock:
+            targets = self.sessions.get(ident, [])
+            if stacks in targets:
+                targets.remove(stacks)
+            if not targets:
+                self.sessions.pop(ident, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self.sessions:
+                    # Sin sesiones el hilo termina; add() lo vuelve a lanzar
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for ident, targets in self.sessions.items():
+                    frame = frames.get(ident)
+                    if frame is None:
+                        continue
+                    stack = collapse_stack(frame)
+                    for stacks in targets:
+                        stacks[stack] += 1
+
+class ProfileSession:
+    def __init__(self, kind, name, mode):
+        self.kind = kind
+        self.name = name
+        self.mode = mode
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.thread = threading.get_ident()
+        self.profile = None
+        self.stacks = None
+
+class Profiler:
+    """Perfilado bajo demanda con un almacén acotado de resultados"""
+
+    def __init__(self, enabled=PROFILE_ENABLED, mode=PROFILE_MODE,
+                 capacity=PROFILE_CAPACITY, min_duration=PROFILE_MIN_DURATION,
+                 interval=PROFILE_INTERVAL):
+        self.enabled = enabled
+        self.mode = mode if mode in PROFILE_MODES else "cprofile"
+        self.capacity = capacity
+        self.min_duration = min_duration
+        self.sampler = Sampler(interval)
+        self.profiles = OrderedDict()
+        self.skipped = 0
+        self.open_sessions = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._active = threading.local()
+
+    def configure(self, enabled=None, mode=None):
+        if mode is not None:
+            if mode not in PROFILE_MODES:
+                raise ValueError(f"Modo inválido, usa uno de: {', '.join(PROFILE_MODES)}")
+            self.mode = mode
+        if enabled is not None:
+            self.enabled = bool(enabled)
+
+    def start(self, kind, name):
+        """Empezar a perfilar el hilo actual; devuelve None si no es posible"""
+        session = ProfileSession(kind, name, self.mode)
+        if session.mode == "cprofile":
+            # cProfile y pstats solo se importan si se llega a perfilar
+            import cProfile
+            # cProfile no admite perfiles anidados en el mismo hilo
+            if getattr(self._active, "profile", None):
+                self.skipped += 1
+                return None
+            session.profile = cProfile.Profile()
+            try:
+                session.profile.enable()
+            except ValueError:
+                # Otro perfilador activo en el intérprete
+                self.skipped += 1
+                return None
+            self._active.profile = session
+        else:
+            session.stacks = Counter()
+            self.sampler.add(session.thread, session.stacks)
+        with self._lock:
+            self.open_sessions += 1
+        return session
+
+    def finish(self, session):
+        """Terminar la sesión y guardar el perfil si supera la duración mínima"""
+        duration = time.perf_counter() - session.start
+        if session.profile:
+            session.profile.disable()
+            self._active.profile = None
+        else:
+            self.sampler.remove(session.thread, session.stacks)
+        with self._lock:
+            self.open_sessions -= 1
+        if duration < self.min_duration:
+            return None
+
+        record = {
+            "kind": session.kind,
+            "name": session.name,
+            "mode": session.mode,
+            "started_at": session.started_at,
+            "duration": round(duration, 6)
+        }
+        if session.profile:
+            import io
+            import marshal
+            import pstats
+            stats = pstats.Stats(session.profile)
+            record["pstats"] = marshal.dumps(stats.stats)
+            output = io.StringIO()
+            stats.stream = output
+            stats.sort_stats("cumulative").print_stats(SUMMARY_LINES)
+            record["summary"] = output.getvalue()
+        else:
+            record["samples"] = sum(session.stacks.values())
+            record["collapsed"] = "".join(f"{stack} {count}\n" for stack, count
+                                          in session.stacks.most_common())
+
+        with self._lock:
+            record["id"] = next(self._ids)
+            self.profiles[record["id"]] = record
+            while len(self.profiles) > self.capacity:
+                self.profiles.popitem(last=False)
+        return record
+
+    @contextmanager
+    def profile(self, kind, name):
+        """Perfilar el bloque si el perfilado está activo"""
+        session = self.start(kind, name) if self.enabled else None
+        try:
+            yield
+        finally:
+            if session:
+                self.finish(session)
+
+    def get(self, profile_id):
+        return self.profiles.get(profile_id)
+
+    def list(self):
+        with self._lock:
+            records = list(self.profiles.values())
+        return [self.describe(record) for record in reversed(records)]
+
+    def describe(self, record):
+        """Datos del perfil sin el contenido binario"""
+        info = {key: value for key, value in record.items()
+                if key not in ("pstats", "collapsed", "summary")}
+        info["formats"] = ["pstats"] if "pstats" in record else ["collapsed"]
+        return info
+
+    def clear(self):
+        with self._lock:
+            self.profiles.clear()
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "mode": self.mode,
+            "modes": list(PROFILE_MODES),
+            "capacity": self.capacity,
+            "min_duration": self.min_duration,
+            "interval": self.sampler.interval,
+            "skipped": self.skipped,
+            "profiles": self.list()
+        }
+
+profiler = Profiler()
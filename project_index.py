@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Índice de archivos del proyecto compartido por el importador y GameServer
+Recorre el árbol una sola vez con os.scandir, ignora directorios pesados
+(.git, node_modules...) y guarda el resultado en disco para reutilizarlo
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+# Directorios que nunca se recorren
+IGNORED_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", ".cache",
+                ".python_packages"}
+# Directorio donde se guardan los índices persistentes
+INDEX_CACHE_DIR = os.environ.get("PROJECT_INDEX_DIR", "./.cache/project_index")
+INDEX_VERSION = 2
+# Variantes precomprimidas (precompress.py) que se guardan junto al original:
+# no son archivos del proyecto y no se indexan
+SIDECAR_SUFFIXES = (".gz", ".br")
+
+ENTRY_FILES = {"index.html", "game.html", "main.html"}
+PYTHON_ENTRY_FILES = {"main.py", "game.py", "app.py"}
+LOCK_FILES = {"package-lock.json", "yarn.lock", "pnpm-lock.yaml"}
+ASSET_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico",
+                    ".mp3", ".ogg", ".wav", ".ttf", ".woff", ".woff2"}
+
+def classify(name):
+    """Rol de un archivo según su nombre"""
+    lower = name.lower()
+    extension = os.path.splitext(lower)[1]
+    if lower in ENTRY_FILES:
+        return "entry"
+    if lower in PYTHON_ENTRY_FILES:
+        return "python_entry"
+    if lower == "package.json":
+        return "manifest"
+    if lower == "requirements.txt":
+        return "requirements"
+    if lower in LOCK_FILES:
+        return "lockfile"
+    if extension in (".js", ".mjs", ".py"):
+        return "script"
+    if extension in (".html", ".css", ".json"):
+        return "document"
+    if extension in ASSET_EXTENSIONS:
+        return "asset"
+    return "other"
+
+def is_sidecar(name, names):
+    """`name` es una variante .gz/.br de otro archivo de `names` (mismo directorio)"""
+    base, suffix = os.path.splitext(name)
+    return suffix in SIDECAR_SUFFIXES and base in names
+
+def git_head(root):
+    """Commit al que apunta HEAD, o None si no es un repositorio git"""
+    git_dir = os.path.join(root, ".git")
+    try:
+        with open(os.path.join(git_dir, "HEAD"), "r") as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+
+    if not head.startswith("ref: "):
+        return head
+
+    ref = head[5:]
+    try:
+        with open(os.path.join(git_dir, ref), "r") as f:
+            return f.read().strip()
+    except OSError:
+        pass
+
+    # La referencia puede estar empaquetada
+    try:
+        with open(os.path.join(git_dir, "packed-refs"), "r") as f:
+            for line in f:
+                if line.rstrip().endswith(" " + ref):
+                    return line.split(" ", 1)[0]
+    except OSError:
+        pass
+    return head
+
+class ProjectIndex:
+    """Índice persistente (ruta, tamaño, mtime, rol) de los archivos de un proyecto.
+
+    La validez se comprueba con el HEAD de git y el mtime de cada directorio:
+    si HEAD cambia se reconstruye todo, y si solo cambia un directorio se
+    vuelven a leer únicamente sus entradas. Mientras un FileWatcher lo
+    mantiene al día (`watched`), refresh() no toca el disco y los cambios
+    llegan por apply_changes().
+    """
+
+    def __init__(self, root, cache_dir=INDEX_CACHE_DIR, ignored=IGNORED_DIRS):
+        self.root = os.path.abspath(root)
+        self.cache_dir = cache_dir
+        self.ignored = set(ignored)
+        self.head = None
+        self.dirs = {}
+        self.files = {}
+        self.generation = 0
+        self.loaded = False
+        self.watched = False
+        self._lock = threading.Lock()
+
+    @property
+    def cache_path(self):
+        key = hashlib.sha1(self.root.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def paths(self):
+        """Rutas relativas ordenadas por profundidad y nombre"""
+        with self._lock:
+            paths = list(self.files)
+        return sorted(paths, key=lambda path: (path.count(os.sep), path))
+
+    def by_role(self, role):
+        with self._lock:
+            return [path for path, entry in self.files.items() if entry[2] == role]
+
+    def entries(self):
+        """Copia de {ruta: [tamaño, mtime_ns, rol]}.
+
+        El FileWatcher modifica `files` desde otro hilo con apply_changes():
+        quien lo recorra debe usar esta copia, tomada con el índice bloqueado.
+        Las entradas se reemplazan, nunca se modifican, así que basta una
+        copia superficial.
+        """
+        with self._lock:
+            return dict(self.files)
+
+    def refresh(self):
+        """Dejar el índice al día con el disco y devolverlo"""
+        with self._lock:
+            if not self.loaded:
+                self._load()
+                self.loaded = True
+            if self.watched and self.dirs:
+                return self
+
+            head = git_head(self.root)
+            if head != self.head or not self.dirs:
+                self._full_scan()
+                self.head = head
+                changed = True
+            else:
+                changed = self._incremental_scan()
+
+            if changed:
+                self.generation += 1
+                self._save()
+        return self
+
+    def verify(self, rel_paths):
+        """Comparar con el disco las entradas de `rel_paths` y corregir las que cambiaron.
+
+        Sin FileWatcher refresh() solo ve los mtime de los directorios, que
+        detectan archivos nuevos o eliminados pero no una edición en el sitio;
+        quien muestre tamaños o contenido de ciertos archivos los comprueba
+        aquí. Devuelve True si alguna entrada cambió (y con ella la generación).
+        """
+        if self.watched:
+            return False
+        changed = False
+        with self._lock:
+            for rel_path in rel_paths:
+                entry = self.files.get(rel_path)
+                if entry is None:
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.root, rel_path))
+                except OSError:
+                    del self.files[rel_path]
+                    changed = True
+                    continue
+                if stat.st_size != entry[0] or stat.st_mtime_ns != entry[1]:
+                    self.files[rel_path] = [stat.st_size, stat.st_mtime_ns, entry[2]]
+                    changed = True
+            if changed:
+                self.generation += 1
+                self._save()
+        return changed
+
+    def _scan_dir(self, rel_dir):
+        """Leer las entradas directas de un directorio; devuelve sus subdirectorios"""
+        abs_dir = os.path.join(self.root, rel_dir)
+        subdirs = []
+        with os.scandir(abs_dir) as scanned:
+            entries = list(scanned)
+        names = {entry.name for entry in entries}
+        for entry in entries:
+            if is_sidecar(entry.name, names):
+                continue
+            rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in self.ignored:
+                        subdirs.append(rel_path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    self.files[rel_path] = [stat.st_size, stat.st_mtime_ns, classify(entry.name)]
+            except OSError:
+                continue
+        self.dirs[rel_dir] = os.stat(abs_dir).st_mtime_ns
+        return subdirs
+
+    def _scan_tree(self, rel_dir):
+        pending = [rel_dir]
+        while pending:
+            current = pending.pop()
+            try:
+                pending.extend(self._scan_dir(current))
+            except OSError:
+                continue
+
+    def _full_scan(self):
+        self.dirs = {}
+        self.files = {}
+        self._scan_tree("")
+
+    def _forget(self, rel_dir, recursive):
+        """Quitar del índice los archivos de un directorio"""
+        prefix = rel_dir + os.sep if rel_dir else ""
+        for path in [p for p in self.files if p.startswith(prefix)]:
+            if recursive or os.path.dirname(path) == rel_dir:
+                del self.files[path]
+        if recursive:
+            for path in [d for d in self.dirs if d == rel_dir or d.startswith(prefix)]:
+                del self.dirs[path]
+
+    def _incremental_scan(self):
+        """Volver a leer solo los directorios cuyo mtime cambió"""
+        changed = False
+        for rel_dir, mtime in list(self.dirs.items()):
+            if rel_dir not in self.dirs:
+                continue  # Eliminado junto con un directorio padre
+            try:
+                current_mtime = os.stat(os.path.join(self.root, rel_dir)).st_mtime_ns
+            except OSError:
+                self._forget(rel_dir, recursive=True)
+                changed = True
+                continue
+            if current_mtime == mtime:
+                continue
+
+            changed = True
+            self._forget(rel_dir, recursive=False)
+            for subdir in self._scan_dir(rel_dir):
+                if subdir not in self.dirs:
+                    self._scan_tree(subdir)
+        return changed
+
+    def apply_changes(self, rel_paths):
+        """Releer solo los directorios que contienen `rel_paths` (None = todo)"""
+        with self._lock:
+            if not self.loaded:
+                self._load()
+                self.loaded = True
+            if rel_paths is None or not self.dirs:
+                self._full_scan()
+                self.head = git_head(self.root)
+            else:
+                parents = {os.path.dirname(rel_path) for rel_path in rel_paths
+                           if not any(part in self.ignored for part in rel_path.split(os.sep))}
+                rel_dirs = set()
+                for rel_dir in parents:
+                    # El directorio conocido y existente más cercano detecta lo
+                    # nuevo y lo eliminado
+                    while rel_dir and (rel_dir not in self.dirs or
+                                       not os.path.isdir(os.path.join(self.root, rel_dir))):
+                        rel_dir = os.path.dirname(rel_dir)
+                    rel_dirs.add(rel_dir)
+                if not rel_dirs:
+                    return False
+                for rel_dir in sorted(rel_dirs, key=lambda path: path.count(os.sep)):
+                    if rel_dir not in self.dirs:
+                        continue  # Ya releído junto con un directorio padre
+                    self._rescan_dir(rel_dir)
+            self.generation += 1
+            self._save()
+        return True
+
+    def _rescan_dir(self, rel_dir):
+        if not os.path.isdir(os.path.join(self.root, rel_dir)):
+            self._forget(rel_dir, recursive=True)
+            return
+        self._forget(rel_dir, recursive=False)
+        try:
+            subdirs = set(self._scan_dir(rel_dir))
+        except OSError:
+            self._forget(rel_dir, recursive=True)
+            return
+        for known in [d for d in self.dirs if d and os.path.dirname(d) == rel_dir]:
+            if known not in subdirs:
+                self._forget(known, recursive=True)
+        for subdir in subdirs:
+            if subdir not in self.dirs:
+                self._scan_tree(subdir)
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.root:
+            return
+        self.head = data["head"]
+        self.dirs = data["dirs"]
+        self.files = data["files"]
+
+    def _save(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            # json.dumps usa el codificador en C; json.dump escribe por partes y es mucho más lento
+            data = json.dumps({
+                "version": INDEX_VERSION,
+                "root": self.root,
+                "head": self.head,
+                "dirs": self.dirs,
+                "files": self.files
+            }, separators=(",", ":"))
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"[ProjectIndex] No se pudo guardar el índice: {e}")
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_index(root):
+    """Índice actualizado de `root`, compartido dentro del proceso"""
+    key = os.path.abspath(root)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = ProjectIndex(key)
+    return index.refresh()
+
+def apply_changes(root, rel_paths):
+    """Aplicar al índice de `root` los cambios de un FileWatcher y marcarlo como vigilado"""
+    key = os.path.abspath(root)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = ProjectIndex(key)
+    changed = index.apply_changes(rel_paths)
+    index.watched = True
+    return changed
+
+def unwatch(root):
+    """Volver a comprobar el disco en cada refresh() (el watcher se detuvo)"""
+    index = _indexes.get(os.path.abspath(root))
+    if index:
+        index.watched = False
+
+def forget(root):
+    """Descartar el índice de `root` en memoria y en disco (p. ej. un staging)"""
+    key = os.path.abspath(root)
+    with _indexes_lock:
+        index = _indexes.pop(key, None) or ProjectIndex(key)
+    try:
+        os.unlink(index.cache_path)
+    except OSError:
+        pass
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Versiones (releases) de un juego importado
+Cada importación se clona en un directorio nuevo junto al del juego
+(<juego>.releases/<id>) y, una vez validada, se activa cambiando de forma
+atómica el enlace simbólico <juego> para que apunte a ella. Se conservan las
+últimas RELEASES_KEEP versiones para volver a una anterior al instante; los
+archivos que no cambian entre versiones se comparten con hardlinks.
+
+Un archivo compartido es el mismo inodo en varias versiones: escribir en él
+en el sitio cambiaría también las anteriores. Por eso los archivos
+deduplicados quedan de solo lectura (sin permisos de escritura); quien
+necesite modificarlos debe reemplazarlos (escribir otro archivo y
+renombrarlo), como hacen git, precompress y los instaladores. Ejecutando
+como root los permisos no lo impiden.
+"""
+
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+import uuid
+
+from asset_pack import PACK_SUFFIX
+
+# Importar en un directorio de staging y activar con un enlace simbólico
+RELEASES_ENABLED = os.environ.get("RELEASES", "1") == "1"
+# Versiones que se conservan (la activa siempre se conserva)
+RELEASES_KEEP = int(os.environ.get("RELEASES_KEEP", "3"))
+# Directorios que no se deduplican: git puede reescribir sus archivos
+DEDUPE_IGNORED_DIRS = {".git"}
+# Bits de escritura que se quitan a los archivos compartidos entre versiones
+WRITE_BITS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+# Archivos de releases_dir asociados a una versión además de su directorio
+RELEASE_FILE_SUFFIXES = (".json", PACK_SUFFIX)
+# Un staging sin publicar se considera abandonado pasado este tiempo (segundos);
+# antes puede ser una importación en curso en otro proceso
+STALE_STAGING = 3600
+CHUNK_SIZE = 1024 * 1024
+
+# Serializa activaciones y limpiezas dentro del proceso
+_swap_lock = threading.Lock()
+
+def same_content(path_a, path_b, size):
+    """Comparar dos archivos del mismo tamaño byte a byte"""
+    if size == 0:
+        return True
+    with open(path_a, "rb") as a, open(path_b, "rb") as b:
+        while True:
+            chunk = a.read(CHUNK_SIZE)
+            if chunk != b.read(CHUNK_SIZE):
+                return False
+            if not chunk:
+                return True
+
+def dedupe_tree(path, previous):
+    """Sustituir por hardlinks a `previous` los archivos de `path` que no cambiaron.
+
+    Devuelve (archivos, bytes) compartidos. Solo se enlazan archivos con el
+    mismo contenido y los mismos permisos (sin contar los de escritura), y el
+    archivo compartido queda de solo lectura.
+    """
+    files = saved = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = [d for d in dirnames if d not in DEDUPE_IGNORED_DIRS]
+        rel_dir = os.path.relpath(dirpath, path)
+        for name in filenames:
+            new_file = os.path.join(dirpath, name)
+            old_file = os.path.normpath(os.path.join(previous, rel_dir, name))
+            try:
+                new_stat = os.lstat(new_file)
+                old_stat = os.lstat(old_file)
+            except OSError:
+                continue
+            if (not stat.S_ISREG(new_stat.st_mode) or not stat.S_ISREG(old_stat.st_mode)
+                    or new_stat.st_ino == old_stat.st_ino
+                    or new_stat.st_size != old_stat.st_size
+                    or new_stat.st_mode & ~WRITE_BITS != old_stat.st_mode & ~WRITE_BITS):
+                continue
+            try:
+                if not same_content(new_file, old_file, new_stat.st_size):
+                    continue
+                if old_stat.st_mode & WRITE_BITS:
+                    os.chmod(old_file, stat.S_IMODE(old_stat.st_mode) & ~WRITE_BITS)
+                tmp_file = f"{new_file}.dedupe-{uuid.uuid4().hex[:8]}"
+                os.link(old_file, tmp_file)
+                os.replace(tmp_file, new_file)
+            except OSError:
+                # Por ejemplo, otro sistema de archivos: no se puede enlazar
+                return files, saved
+            files += 1
+            saved += new_stat.st_size
+    return files, saved
+
+def release_id_of(name):
+    """Id de la versión a la que pertenece una entrada de releases_dir.
+
+    Son <id> (su directorio), <id>.json y <id>.assets.pack; los ids pueden
+    contener puntos, así que se quita el sufijo conocido en lugar de cortar
+    por el primer punto.
+    """
+    for suffix in RELEASE_FILE_SUFFIXES:
+        if name.endswith(suffix) and len(name) > len(suffix):
+            return name[:-len(suffix)]
+    return name
+
+class ReleaseManager:
+    """Versiones de `game_dir`, que pasa a ser un enlace simbólico a la activa"""
+
+    def __init__(self, game_dir, keep=RELEASES_KEEP):
+        self.game_dir = os.path.normpath(game_dir)
+        self.releases_dir = self.game_dir + ".releases"
+        self.keep = max(1, keep)
+
+    def path(self, release_id):
+        return os.path.join(self.releases_dir, release_id)
+
+    def _meta_path(self, release_id):
+        return os.path.join(self.releases_dir, f"{release_id}.json")
+
+    def stage(self):
+        """Ruta (todavía inexistente) donde clonar una nueva versión"""
+        os.makedirs(self.releases_dir, exist_ok=True)
+        release_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        return self.path(release_id)
+
+    def discard(self, staging):
+        """Eliminar un staging que no llegó a publicarse"""
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def current(self):
+        """Id de la versión activa o None"""
+        if not os.path.islink(self.game_dir):
+            return None
+        return os.path.basename(os.readlink(self.game_dir))
+
+    def current_path(self):
+        current = self.current()
+        return self.path(current) if current else None
+
+    def list(self):
+        """Versiones publicadas, de la más reciente a la más antigua"""
+        try:
+            names = os.listdir(self.releases_dir)
+        except OSError:
+            return []
+        current = self.current()
+        releases = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.releases_dir, name), "r") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if os.path.isdir(self.path(meta["id"])):
+                meta["current"] = meta["id"] == current
+                releases.append(meta)
+        return sorted(releases, key=lambda meta: meta["created_at"], reverse=True)
+
+    def publish(self, staging, **meta):
+        """Deduplicar, registrar y activar el staging; devuelve sus metadatos"""
+        release_id = os.path.basename(staging)
+        previous = self.current_path()
+        files = saved = 0
+        if previous and os.path.isdir(previous):
+            files, saved = dedupe_tree(staging, previous)
+        meta.update({"id": release_id, "created_at": time.time(),
+                     "deduped_files": files, "deduped_bytes": saved})
+        tmp_meta = self._meta_path(release_id) + ".tmp"
+        with open(tmp_meta, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, self._meta_path(release_id))
+        self.activate(release_id)
+        self.prune()
+        return meta
+
+    def activate(self, release_id):
+        """Apuntar `game_dir` a la versión con un rename atómico del enlace"""
+        if (os.path.basename(release_id) != release_id or release_id.startswith(".")
+                or not os.path.isdir(self.path(release_id))
+                or not os.path.exists(self._meta_path(release_id))):
+            raise KeyError(release_id)
+        with _swap_lock:
+            self._adopt_legacy()
+            target = os.path.join(os.path.basename(self.releases_dir), release_id)
+            tmp_link = f"{self.game_dir}.swap-{uuid.uuid4().hex[:8]}"
+            os.symlink(target, tmp_link)
+            try:
+                os.replace(tmp_link, self.game_dir)
+            except OSError:
+                os.unlink(tmp_link)
+                raise
+
+    def rollback(self):
+        """Activar la versión anterior a la activa; devuelve su id"""
+        releases = self.list()
+        ids = [meta["id"] for meta in releases]
+        current = self.current()
+        position = ids.index(current) if current in ids else -1
+        if position + 1 >= len(ids):
+            raise LookupError("No hay una versión anterior a la activa")
+        previous = ids[position + 1]
+        self.activate(previous)
+        return previous
+
+    def _adopt_legacy(self):
+        """Convertir un `game_dir` real (anterior a las releases) en una versión"""
+        if os.path.islink(self.game_dir) or not os.path.isdir(self.game_dir):
+            return
+        os.makedirs(self.releases_dir, exist_ok=True)
+        release_id = f"legacy-{time.strftime('%Y%m%d-%H%M%S')}"
+        with open(self._meta_path(release_id), "w") as f:
+            json.dump({"id": release_id, "created_at": os.stat(self.game_dir).st_mtime,
+                       "repo_url": None, "legacy": True}, f)
+        os.rename(self.game_dir, self.path(release_id))
+        os.symlink(os.path.join(os.path.basename(self.releases_dir), release_id), self.game_dir)
+
+    def prune(self):
+        """Eliminar las versiones antiguas y los staging abandonados"""
+        with _swap_lock:
+            releases = self.list()
+            published = {meta["id"] for meta in releases}
+            keep = {meta["id"] for meta in releases[:self.keep]}
+            keep.add(self.current())
+            for name in os.listdir(self.releases_dir):
+                release_id = release_id_of(name)
+                path = os.path.join(self.releases_dir, name)
+                if release_id in keep:
+                    continue
+                if release_id not in published and not name.endswith(".json"):
+                    try:
+                        if time.time() - os.stat(path).st_mtime < STALE_STAGING:
+                            continue
+                    except OSError:
+                        continue
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.unlink(path)
+
+def remove_game(game_dir):
+    """Eliminar un juego con todas sus versiones (o su directorio si no tiene)"""
+    game_dir = os.path.normpath(game_dir)
+    if os.path.islink(game_dir):
+        os.unlink(game_dir)
+    else:
+        shutil.rmtree(game_dir, ignore_errors=True)
+    shutil.rmtree(game_dir + ".releases", ignore_errors=True)
+    try:
+        os.unlink(game_dir + PACK_SUFFIX)
+    except OSError:
+        pass
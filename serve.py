@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Servidor de producción del importador
+Ejecuta la app de Flask de main.py sin el servidor de desarrollo: con
+gunicorn si está instalado o, si no, con el servidor WSGI integrado en modo
+threaded (un proceso con un hilo por conexión hasta un máximo) o prefork
+(un proceso maestro que mantiene el worker vivo y lo recarga con SIGHUP)
+
+Los streams de /api/events ocupan un hilo mientras están abiertos; la app
+admite como máximo EVENTS_MAX_STREAMS y el servidor reserva esos hilos
+además de los que atienden las peticiones normales.
+
+La app guarda en memoria del proceso los trabajos de importación, los
+bloqueos por directorio, las instancias, el proceso del juego, el vigilante
+de archivos, los logs y los eventos, así que se atiende con un único worker:
+prefork y gunicorn no arrancan con más. shared_state conserva el juego
+activo y los trabajos cuando una recarga sustituye el worker.
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import ThreadedWSGIServer, WSGIRequestHandler
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    BaseApplication = None
+
+SERVER_MODES = ("auto", "gunicorn", "threaded", "prefork")
+SERVER_MODE = os.environ.get("SERVER_MODE", "auto")
+SERVER_HOST = os.environ.get("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.environ.get("PORT", "5000"))
+# Procesos (prefork y gunicorn); el estado de la app es por proceso, solo se admite 1
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", "1"))
+MAX_WORKERS = 1
+SERVER_THREADS = int(os.environ.get("SERVER_THREADS", "16"))
+# Conexiones atendidas a la vez por el servidor integrado (un hilo por
+# conexión); con el máximo alcanzado las nuevas esperan en el backlog
+SERVER_CONNECTIONS = int(os.environ.get("SERVER_CONNECTIONS", "256"))
+SERVER_BACKLOG = int(os.environ.get("SERVER_BACKLOG", "128"))
+# Segundos que una conexión keep-alive inactiva puede ocupar un hilo
+KEEPALIVE_TIMEOUT = 15
+# Streams SSE admitidos por la app (mismo valor que main.EVENTS_MAX_STREAMS)
+EVENTS_MAX_STREAMS = int(os.environ.get("EVENTS_MAX_STREAMS", "32"))
+# Segundos para terminar las peticiones en curso antes de matar un worker
+GRACEFUL_TIMEOUT = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+
+def check_workers(workers):
+    """Rechazar más de un worker.
+
+    Cada uno tendría sus propios trabajos, logs, eventos, instancias y
+    bloqueos: dos procesos podrían importar en el mismo directorio.
+    """
+    if workers > MAX_WORKERS:
+        raise ValueError(f"--workers {workers}: el estado de la app es por proceso, "
+                         f"usa --workers {MAX_WORKERS} y escala con --threads/--connections")
+
+def load_app():
+    """Importar la app; en prefork se hace en cada worker, después del fork"""
+    import main
+    return main.create_app()
+
+class RequestHandler(WSGIRequestHandler):
+    timeout = KEEPALIVE_TIMEOUT
+
+class QuietRequestHandler(RequestHandler):
+    def log_request(self, code="-", size="-"):
+        pass
+
+class BoundedWSGIServer(ThreadedWSGIServer):
+    """Servidor WSGI con un hilo por conexión y un máximo de conexiones.
+
+    Un hilo propio por conexión evita que las conexiones largas (streams
+    SSE, keep-alive inactivos) bloqueen a las demás en una cola; al llegar a
+    `connections` el bucle deja de aceptar y las nuevas esperan en el backlog
+    del socket.
+    """
+
+    # La espera al cerrar la hace server_close() con un límite de tiempo
+    block_on_close = False
+
+    def __init__(self, host, port, app, connections=SERVER_CONNECTIONS,
+                 backlog=SERVER_BACKLOG, handler=RequestHandler, fd=None):
+        self.request_queue_size = backlog
+        self.connections = connections
+        self.slots = threading.BoundedSemaphore(connections)
+        self.stopping = False
+        super().__init__(host, port, app, handler=handler, fd=fd)
+
+    def process_request(self, request, client_address):
+        # Esperar una plaza sin bloquear shutdown() indefinidamente
+        while not self.slots.acquire(timeout=0.5):
+            if self.stopping:
+                self.shutdown_request(request)
+                return
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.slots.release()
+
+    def shutdown(self):
+        self.stopping = True
+        super().shutdown()
+
+    def server_close(self, timeout=GRACEFUL_TIMEOUT):
+        """Cerrar el socket y esperar hasta `timeout` s a las conexiones en curso.
+
+        Los streams SSE pueden seguir abiertos EVENTS_MAX_AGE segundos; los
+        hilos son daemon y no impiden que el proceso termine después.
+        """
+        super().server_close()
+        deadline = time.monotonic() + timeout
+        acquired = 0
+        while acquired < self.connections:
+            if not self.slots.acquire(timeout=max(0, deadline - time.monotonic())):
+                break
+            acquired += 1
+        for _ in range(acquired):
+            self.slots.release()
+
+def serve(server):
+    """Atender hasta SIGTERM/SIGINT/SIGHUP; devuelve True si se pidió recargar"""
+    reload_requested = []
+
+    def stop(signum, frame):
+        if signum == signal.SIGHUP:
+            reload_requested.append(True)
+        # shutdown() espera a serve_forever, no puede llamarse desde este hilo
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, stop)
+    server.serve_forever()
+    server.server_close()
+    return bool(reload_requested)
+
+def run_threaded(host, port, connections, backlog, quiet=False):
+    """Un proceso con un hilo por conexión; SIGHUP vuelve a ejecutar el proceso"""
+    handler = QuietRequestHandler if quiet else RequestHandler
+    server = BoundedWSGIServer(host, port, load_app(), connections=connections,
+                               backlog=backlog, handler=handler)
+    print(f"[serve] threaded en http://{host}:{port} (hasta {connections} conexiones)")
+    if serve(server):
+        print("[serve] Recargando...")
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+def run_worker(sock, host, port, connections, backlog, quiet):
+    """Cuerpo de un worker prefork: importar la app y atender el socket heredado"""
+    handler = QuietRequestHandler if quiet else RequestHandler
+    server = BoundedWSGIServer(host, port, load_app(), connections=connections,
+                               backlog=backlog, handler=handler, fd=sock.fileno())
+    # En el worker SIGHUP significa terminar; la recarga la coordina el maestro
+    serve(server)
+
+def run_prefork(host, port, workers, connections, backlog, quiet=False):
+    """Proceso maestro que mantiene `workers` procesos atendiendo el mismo socket.
+
+    SIGHUP lanza workers nuevos (que importan el código actualizado) y retira
+    los anteriores cuando terminan sus peticiones; SIGTERM/SIGINT los detiene.
+    """
+    check_workers(workers)
+    sock = socket.create_server((host, port), backlog=backlog)
+    sock.set_inheritable(True)
+    children = {}  # pid -> (generación, inicio)
+    state = {"generation": 0, "stopping": False, "reload": False}
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                signal.signal(signum, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(sock, host, port, connections, backlog, quiet)
+            except BaseException as e:
+                print(f"[serve] Worker {os.getpid()} terminó con error: {e}", file=sys.stderr)
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        children[pid] = (state["generation"], time.monotonic())
+
+    def on_signal(signum, frame):
+        if signum == signal.SIGHUP:
+            state["reload"] = True
+        else:
+            state["stopping"] = True
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, on_signal)
+
+    for _ in range(workers):
+        spawn()
+    print(f"[serve] prefork en http://{host}:{port} "
+          f"({workers} procesos x {connections} conexiones)")
+
+    while not state["stopping"]:
+        if state["reload"]:
+            state["reload"] = False
+            state["generation"] += 1
+            old = [pid for pid, (generation, _) in children.items()
+                   if generation < state["generation"]]
+            for _ in range(workers):
+                spawn()
+            for pid in old:
+                os.kill(pid, signal.SIGTERM)
+            print(f"[serve] Recarga: {workers} workers nuevos, retirando {len(old)}")
+
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if not pid:
+            time.sleep(0.2)
+            continue
+
+        generation, started = children.pop(pid, (None, None))
+        if generation == state["generation"] and not state["stopping"]:
+            print(f"[serve] Worker {pid} terminó (estado {status}), reemplazando")
+            if time.monotonic() - started < 1:
+                time.sleep(1)  # Evitar un bucle de reinicios si falla al arrancar
+            spawn()
+
+    # Apagado: dar tiempo a las peticiones en curso y luego forzar
+    for pid in children:
+        os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + GRACEFUL_TIMEOUT
+    while children and time.monotonic() < deadline:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            children.pop(pid, None)
+        else:
+            time.sleep(0.1)
+    for pid in children:
+        os.kill(pid, signal.SIGKILL)
+    sock.close()
+
+def run_gunicorn(host, port, workers, threads, backlog, quiet=False):
+    """gunicorn con workers gthread; SIGHUP al maestro recarga los workers.
+
+    Cada stream SSE retiene un hilo gthread mientras está abierto: se
+    reservan EVENTS_MAX_STREAMS hilos además de `threads` para que los streams
+    no dejen sin hilos a las peticiones normales.
+    """
+    check_workers(workers)
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "threads": threads + EVENTS_MAX_STREAMS,
+        "worker_class": "gthread",
+        "backlog": backlog,
+        "keepalive": KEEPALIVE_TIMEOUT,
+        "graceful_timeout": GRACEFUL_TIMEOUT,
+        "accesslog": None if quiet else "-"
+    }
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app()
+
+    Application().run()
+
+def resolve_mode(mode):
+    if mode != "auto":
+        return mode
+    if BaseApplication:
+        return "gunicorn"
+    return "prefork" if hasattr(os, "fork") else "threaded"
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Servidor de producción del importador",
+        epilog="Ejemplo: python serve.py --mode threaded --connections 256"
+    )
+    parser.add_argument("--mode", choices=SERVER_MODES, default=SERVER_MODE,
+                        help="gunicorn si está instalado, si no prefork (por defecto auto)")
+    parser.add_argument("--host", default=SERVER_HOST, help="Dirección (por defecto 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Puerto (por defecto 5000)")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS,
+                        help="Procesos en modo prefork o gunicorn (solo 1)")
+    parser.add_argument("--threads", type=int, default=SERVER_THREADS,
+                        help="Hilos por proceso de gunicorn, además de los de los streams SSE")
+    parser.add_argument("--connections", type=int, default=SERVER_CONNECTIONS,
+                        help="Conexiones simultáneas por proceso en modo threaded o prefork")
+    parser.add_argument("--backlog", type=int, default=SERVER_BACKLOG,
+                        help="Conexiones pendientes admitidas por el socket")
+    parser.add_argument("--quiet", action="store_true",
+                        help="No imprimir cada petición HTTP")
+    args = parser.parse_args()
+
+    mode = resolve_mode(args.mode)
+    if mode == "gunicorn" and not BaseApplication:
+        parser.error("gunicorn no está instalado (pip install gunicorn)")
+    if mode == "prefork" and not hasattr(os, "fork"):
+        parser.error("El modo prefork requiere os.fork (usa --mode threaded)")
+    if mode in ("gunicorn", "prefork"):
+        try:
+            check_workers(args.workers)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if mode == "gunicorn":
+        run_gunicorn(args.host, args.port, args.workers, args.threads, args.backlog, args.quiet)
+    elif mode == "prefork":
+        run_prefork(args.host, args.port, args.workers, args.connections, args.backlog,
+                    args.quiet)
+    else:
+        run_threaded(args.host, args.port, args.connections, args.backlog, args.quiet)
+
+if __name__ == "__main__":
+    main()
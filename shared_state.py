@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Estado compartido entre procesos
+Guarda documentos JSON pequeños en un directorio para que los workers del
+servidor de producción vean el mismo juego activo y los mismos trabajos de
+importación, aunque cada uno tenga su propia memoria
+"""
+
+import json
+import os
+
+SHARED_STATE_DIR = os.environ.get("SHARED_STATE_DIR", "./.cache/state")
+
+class SharedState:
+    """Documentos JSON con escritura atómica y lectura solo si cambiaron"""
+
+    def __init__(self, root=SHARED_STATE_DIR):
+        self.root = root
+        # Último mtime visto por documento, para no releer lo que no cambió
+        self._seen = {}
+
+    def _path(self, name):
+        return os.path.join(self.root, f"{name}.json")
+
+    def write(self, name, data):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps(data))
+        os.replace(tmp_path, path)
+        try:
+            # Lo escrito por este proceso no cuenta como cambio ajeno
+            self._seen[name] = os.stat(path).st_mtime_ns
+        except OSError:
+            pass
+
+    def read(self, name):
+        """Contenido del documento o None si no existe o está dañado"""
+        try:
+            with open(self._path(name), "r") as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def read_if_changed(self, name):
+        """Contenido del documento si otro proceso lo modificó desde la última vez"""
+        try:
+            mtime = os.stat(self._path(name)).st_mtime_ns
+        except OSError:
+            return None
+        if self._seen.get(name) == mtime:
+            return None
+        self._seen[name] = mtime
+        return self.read(name)
+
+    def remove(self, name):
+        self._seen.pop(name, None)
+        try:
+            os.remove(self._path(name))
+        except OSError:
+            pass
+
+    def names(self, prefix=""):
+        try:
+            files = os.listdir(self.root)
+        except OSError:
+            return []
+        return sorted(f[:-len(".json")] for f in files
+                      if f.startswith(prefix) and f.endswith(".json"))
@@ -7,6 +7,12 @@ class GameImporter {
     constructor() {
         this.statusCheckInterval = null;
         this.isImporting = false;
+        this.lastLogSeq = 0;
+        this.maxLogEntries = 500;
+        this.structurePreview = 20;
+        this.eventSource = null;
+        this.eventsConnected = false;
+        this.lastEventId = null;
         this.init();
     }
 
@@ -14,6 +20,7 @@ class GameImporter {
         this.bindEvents();
         this.startStatusCheck();
         this.checkInitialStatus();
+        this.startEventStream();
     }
 
     bindEvents() {
@@ -24,8 +31,9 @@ class GameImporter {
         }
 
         // Actualizar estado cada 2 segundos durante la importación
+        // (solo si no hay conexión SSE activa)
         this.statusCheckInterval = setInterval(() => {
-            if (this.isImporting) {
+            if (this.isImporting && !this.eventsConnected) {
                 this.updateStatus();
             }
         }, 2000);
@@ -43,21 +51,87 @@ class GameImporter {
         // Verificar estado inicial
         this.updateStatus();
         
-        // Verificar estado cada 5 segundos
+        // Verificar estado cada 5 segundos como respaldo del stream SSE
         setInterval(() => {
-            if (!this.isImporting) {
+            if (!this.isImporting && !this.eventsConnected) {
                 this.updateStatus();
             }
         }, 5000);
     }
 
+    startEventStream() {
+        if (!window.EventSource) return;
+
+        // EventSource reenvía Last-Event-ID automáticamente al reconectar; un
+        // stream nuevo retoma desde el último id recibido con el parámetro
+        const url = this.lastEventId === null
+            ? '/api/events'
+            : `/api/events?last_event_id=${encodeURIComponent(this.lastEventId)}`;
+        const source = new EventSource(url);
+        this.eventSource = source;
+
+        this.eventSource.addEventListener('open', () => {
+            this.eventsConnected = true;
+        });
+
+        this.eventSource.addEventListener('error', () => {
+            // Mientras se reconecta se vuelve al polling
+            this.eventsConnected = false;
+            if (source.readyState === EventSource.CLOSED) {
+                // Una respuesta de error (503 sin plaza) no se reintenta sola
+                this.eventSource = null;
+                setTimeout(() => this.startEventStream(), 30000);
+            }
+        });
+
+        for (const type of ['status', 'progress', 'files', 'log']) {
+            this.eventSource.addEventListener(type, (e) => {
+                if (e.lastEventId) this.lastEventId = e.lastEventId;
+            });
+        }
+
+        this.eventSource.addEventListener('status', async (e) => {
+            const data = JSON.parse(e.data);
+            this.renderSystemStatus(data);
+            if (data.status === 'ready' && data.game_path) {
+                await this.loadGameInfo();
+            }
+        });
+
+        this.eventSource.addEventListener('progress', (e) => {
+            this.renderCloneProgress(JSON.parse(e.data));
+        });
+
+        this.eventSource.addEventListener('files', async (e) => {
+            // Cambiaron archivos del juego: la información detectada puede variar
+            const gameInfoSection = document.getElementById('game-info-section');
+            if (gameInfoSection && gameInfoSection.style.display === 'block') {
+                await this.loadGameInfo();
+            }
+        });
+
+        this.eventSource.addEventListener('log', async (e) => {
+            const record = JSON.parse(e.data);
+            if (record.seq <= this.lastLogSeq) return;
+            if (record.seq > this.lastLogSeq + 1) {
+                // Hubo un hueco: recuperar los registros faltantes
+                await this.loadLogs();
+                return;
+            }
+            this.lastLogSeq = record.seq;
+            this.renderLogs([record]);
+        });
+    }
+
     async updateStatus() {
         try {
             const response = await fetch('/api/status');
             const data = await response.json();
             
             this.renderSystemStatus(data);
-            this.renderLogs(data.logs || []);
+            if (data.last_log_seq > this.lastLogSeq) {
+                await this.loadLogs();
+            }
             
             // Si el juego está listo, mostrar información
             if (data.status === 'ready' && data.game_path) {
@@ -87,12 +161,17 @@ class GameImporter {
         let html = '';
         
         if (data.status === 'waiting') {
+            // null: la detección de la toolchain aún no terminó
+            const gitIcon = data.git_available === null ? 'spinner fa-spin text-secondary'
+                : data.git_available ? 'check text-success' : 'times text-danger';
+            const gitText = data.git_available === null ? 'Comprobando Git...'
+                : data.git_available ? 'Git Disponible' : 'Git No Disponible';
             html = `
                 <div class="row">
                     <div class="col-md-6">
                         <div class="d-flex align-items-center mb-2">
-                            <i class="fas fa-${data.git_available ? 'check text-success' : 'times text-danger'} me-2"></i>
-                            <span>Git ${data.git_available ? 'Disponible' : 'No Disponible'}</span>
+                            <i class="fas fa-${gitIcon} me-2"></i>
+                            <span>${gitText}</span>
                         </div>
                     </div>
                     <div class="col-md-6">
@@ -113,6 +192,7 @@ class GameImporter {
                     <div class="spinner-border text-primary me-3" role="status"></div>
                     <span>Clonando repositorio desde GitHub...</span>
                 </div>
+                <div id="clone-progress" class="text-center text-muted small mt-2"></div>
             `;
         } else if (data.status === 'setting_up') {
             html = `
@@ -137,6 +217,26 @@ class GameImporter {
         }
         
         statusContainer.innerHTML = html;
+        if (data.status === 'cloning' && data.progress) {
+            this.renderCloneProgress(data.progress);
+        }
+    }
+
+    renderCloneProgress(progress) {
+        const container = document.getElementById('clone-progress');
+        if (!container || !progress.stage) return;
+
+        const mib = (bytes) => (bytes / 1048576).toFixed(2);
+        let text = progress.stage;
+        if (progress.total_objects) {
+            text += `: ${progress.percent}% (${progress.objects}/${progress.total_objects})`;
+        } else if (progress.objects !== null) {
+            text += `: ${progress.objects}`;
+        }
+        if (progress.bytes) text += ` · ${mib(progress.bytes)} MiB`;
+        if (progress.throughput) text += ` · ${mib(progress.throughput)} MiB/s`;
+        if (progress.eta) text += ` · quedan ~${Math.ceil(progress.eta)} s`;
+        container.textContent = text;
     }
 
     getStatusText(status) {
@@ -145,6 +245,7 @@ class GameImporter {
             'cloning': 'Clonando',
             'setting_up': 'Configurando',
             'ready': 'Listo',
+            'cancelled': 'Cancelado',
             'error': 'Error'
         };
         return statusMap[status] || 'Desconocido';
@@ -156,28 +257,46 @@ class GameImporter {
             'cloning': 'bg-cloning',
             'setting_up': 'bg-setting_up',
             'ready': 'bg-ready',
+            'cancelled': 'bg-secondary',
             'error': 'bg-error'
         };
         return classMap[status] || 'bg-secondary';
     }
 
+    async loadLogs() {
+        // Pedir solo los registros nuevos desde el último cursor
+        const response = await fetch(`/api/logs?since=${this.lastLogSeq}`);
+        const data = await response.json();
+        this.lastLogSeq = data.last_seq;
+        this.renderLogs(data.logs || []);
+    }
+
     renderLogs(logs) {
         const logsContainer = document.getElementById('logs-container');
-        if (!logsContainer) return;
+        if (!logsContainer || logs.length === 0) return;
 
-        if (logs.length === 0) {
-            logsContainer.innerHTML = '<div class="text-muted">Sin actividad reciente...</div>';
-            return;
+        // Quitar el mensaje de "sin actividad" en la primera carga
+        if (!logsContainer.querySelector('.log-entry')) {
+            logsContainer.innerHTML = '';
         }
 
+        const levelClass = {
+            'error': 'text-danger',
+            'warning': 'text-warning'
+        };
         const html = logs.map(log => `
             <div class="log-entry">
-                <i class="fas fa-chevron-right me-2 text-primary"></i>
-                ${this.escapeHtml(log)}
+                <i class="fas fa-chevron-right me-2 ${levelClass[log.level] || 'text-primary'}"></i>
+                ${this.escapeHtml(log.message)}
             </div>
         `).join('');
 
-        logsContainer.innerHTML = html;
+        logsContainer.insertAdjacentHTML('beforeend', html);
+
+        // Mantener acotado el número de entradas en pantalla
+        while (logsContainer.children.length > this.maxLogEntries) {
+            logsContainer.firstElementChild.remove();
+        }
         
         // Scroll al final
         logsContainer.scrollTop = logsContainer.scrollHeight;
@@ -216,13 +335,21 @@ class GameImporter {
 
             const data = await response.json();
 
-            if (response.ok) {
-                this.showSuccess('Importación iniciada exitosamente');
-                // El estado se actualizará automáticamente
-            } else {
+            if (!response.ok) {
                 throw new Error(data.error || 'Error al importar el juego');
             }
 
+            this.showSuccess('Importación iniciada exitosamente');
+            // El estado y los logs se actualizan por SSE o polling
+            const job = await this.waitForJob(data.job_id);
+            if (job.state === 'succeeded') {
+                this.showSuccess('Juego importado exitosamente');
+            } else if (job.state === 'cancelled') {
+                this.showError('La importación fue cancelada');
+            } else {
+                throw new Error(job.error || 'Error al importar el juego');
+            }
+
         } catch (error) {
             console.error('Import error:', error);
             this.showError(error.message || 'Error al importar el juego');
@@ -233,9 +360,23 @@ class GameImporter {
         }
     }
 
+    async waitForJob(jobId) {
+        // Consultar el trabajo hasta que termine
+        const finalStates = ['succeeded', 'failed', 'cancelled'];
+        while (true) {
+            const response = await fetch(`/api/jobs/${jobId}`);
+            const job = await response.json();
+            if (!response.ok || finalStates.includes(job.state)) {
+                return job;
+            }
+            await new Promise(resolve => setTimeout(resolve, 2000));
+        }
+    }
+
     async loadGameInfo() {
         try {
-            const response = await fetch('/api/game_info');
+            // Solo se muestran los primeros archivos: no hace falta el listado completo
+            const response = await fetch(`/api/game_info?limit=${this.structurePreview}`);
             if (response.ok) {
                 const gameInfo = await response.json();
                 this.renderGameInfo(gameInfo);
@@ -276,13 +417,14 @@ class GameImporter {
         }
 
         if (gameInfo.structure && gameInfo.structure.length > 0) {
-            const limitedStructure = gameInfo.structure.slice(0, 20); // Mostrar solo primeros 20 archivos
+            const limitedStructure = gameInfo.structure.slice(0, this.structurePreview);
+            const fileCount = gameInfo.file_count || gameInfo.structure.length;
             html += `
                 <div class="mt-3">
                     <h6><i class="fas fa-folder-open me-2"></i>Estructura del Proyecto</h6>
                     <div class="game-structure">
                         ${limitedStructure.map(file => `<div><i class="fas fa-file me-1"></i>${file}</div>`).join('')}
-                        ${gameInfo.structure.length > 20 ? `<div class="text-muted">... y ${gameInfo.structure.length - 20} archivos más</div>` : ''}
+                        ${fileCount > limitedStructure.length ? `<div class="text-muted">... y ${fileCount - limitedStructure.length} archivos más</div>` : ''}
                     </div>
                 </div>
             `;
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Utilidades HTTP para servir los archivos del juego
+ETags por contenido, peticiones condicionales, Range y políticas de
+Cache-Control, compartidas por main.py y game_server.py
+"""
+
+import email.utils
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler
+
+# Hash de contenido en un nombre de archivo (al menos 8 dígitos hexadecimales
+# tras un punto o un guion, como app.3f2a9c1b.js o sprite-0a1b2c3d.png)
+HASHED_NAME = "*[.-]" + "[0-9a-f]" * 8 + "*"
+# Políticas de Cache-Control por patrón de ruta (la primera que coincide gana).
+# Se pueden reemplazar con CACHE_CONTROL_POLICIES='[["*.png", "public, max-age=60"]]'.
+# Solo los assets con hash en el nombre se cachean una semana: al cambiar su
+# contenido cambia la URL; el resto se revalida con su ETag
+DEFAULT_CACHE_POLICIES = [
+    ["*.html", "no-cache"],
+    ["*.min.js", "public, max-age=86400"],
+    ["*assets/" + HASHED_NAME, "public, max-age=604800"],
+    ["*", "no-cache"],
+]
+# Variantes precomprimidas en orden de preferencia (ver precompress.py)
+ENCODING_SIDECARS = [("br", ".br"), ("gzip", ".gz")]
+# Archivos cuyo ETag se recuerda como máximo
+ETAG_CACHE_SIZE = int(os.environ.get("ETAG_CACHE_SIZE", "10000"))
+# Memoria máxima de la caché de assets y tamaño a partir del cual un archivo
+# no se cachea y se envía directamente desde disco
+ASSET_CACHE_BYTES = int(os.environ.get("ASSET_CACHE_BYTES", str(64 * 1024 * 1024)))
+ASSET_CACHE_MAX_FILE = int(os.environ.get("ASSET_CACHE_MAX_FILE", str(2 * 1024 * 1024)))
+
+def load_cache_policies():
+    """Leer las políticas de CACHE_CONTROL_POLICIES o usar las de por defecto"""
+    raw = os.environ.get("CACHE_CONTROL_POLICIES")
+    if not raw:
+        return DEFAULT_CACHE_POLICIES
+    try:
+        return [[str(pattern), str(value)] for pattern, value in json.loads(raw)]
+    except (ValueError, TypeError):
+        print("[static_files] CACHE_CONTROL_POLICIES inválido, se usan las políticas por defecto")
+        return DEFAULT_CACHE_POLICIES
+
+CACHE_POLICIES = load_cache_policies()
+
+def cache_control(rel_path, policies=None):
+    """Valor de Cache-Control para una ruta relativa"""
+    rel_path = rel_path.replace(os.sep, "/").lstrip("/")
+    for pattern, value in policies or CACHE_POLICIES:
+        if fnmatch.fnmatch(rel_path, pattern):
+            return value
+    return "no-cache"
+
+class ETagCache:
+    """ETags fuertes basados en el hash del contenido.
+
+    El hash se calcula una sola vez por archivo y se reutiliza mientras no
+    cambien su tamaño ni su mtime.
+    """
+
+    def __init__(self, max_entries=ETAG_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, stat=None):
+        stat = stat or os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self.entries.get(path)
+            if cached and cached[0] == key:
+                return cached[1]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        etag = digest.hexdigest()[:32]
+
+        with self._lock:
+            if path not in self.entries and len(self.entries) >= self.max_entries:
+                # Descartar la entrada más antigua
+                self.entries.pop(next(iter(self.entries)))
+            self.entries[path] = (key, etag)
+        return etag
+
+    def invalidate(self, path):
+        with self._lock:
+            self.entries.pop(path, None)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+etags = ETagCache()
+
+class CachedAsset:
+    """Contenido de un archivo guardado en memoria"""
+
+    __slots__ = ("data", "size", "mtime", "mtime_ns", "etag")
+
+    def __init__(self, data, stat):
+        self.data = data
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.mtime_ns = stat.st_mtime_ns
+        self.etag = hashlib.sha256(data).hexdigest()[:32]
+
+class AssetCache:
+    """Caché LRU en memoria de archivos pequeños con presupuesto en bytes.
+
+    Cada acceso hace un único stat para invalidar por tamaño/mtime; los
+    archivos mayores que `max_file_size` no se guardan (bypass).
+    """
+
+    def __init__(self, max_bytes=ASSET_CACHE_BYTES, max_file_size=ASSET_CACHE_MAX_FILE):
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """Asset en caché para `path`, o None si debe servirse desde disco"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return None
+
+        with self._lock:
+            entry = self.entries.get(path)
+            if entry and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            if stat.st_size > self.max_file_size or stat.st_size > self.max_bytes:
+                self.bypasses += 1
+                return None
+            self.misses += 1
+
+        with open(path, "rb") as f:
+            entry = CachedAsset(f.read(), stat)
+        if len(entry.data) != entry.size:
+            return None  # El archivo cambió mientras se leía
+
+        with self._lock:
+            old = self.entries.pop(path, None)
+            if old:
+                self.total_bytes -= old.size
+            self.entries[path] = entry
+            self.total_bytes += entry.size
+            while self.total_bytes > self.max_bytes:
+                evicted_path, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, path):
+        with self._lock:
+            entry = self.entries.pop(path, None)
+            if entry:
+                self.total_bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.bypasses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "max_file_size": self.max_file_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+asset_cache = AssetCache()
+
+def etag_matches(header, etag):
+    """Comparar una cabecera If-None-Match con un ETag (comparación débil)"""
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+def if_range_matches(header, etag):
+    """Indica si se puede servir el Range de una petición con If-Range.
+
+    If-Range exige comparación fuerte: un ETag débil (W/"...") nunca
+    coincide, y una fecha tampoco (se envía el archivo completo).
+    """
+    if header is None:
+        return True
+    return header.strip() == f'"{etag}"'
+
+def not_modified(headers, etag, mtime):
+    """Indica si una petición condicional puede responderse con 304"""
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("If-Modified-Since")
+    if if_modified_since:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError, IndexError):
+            return False
+        if since is None:
+            return False
+        return int(mtime) <= since.timestamp()
+    return False
+
+def parse_range(header, size):
+    """Interpretar una cabecera Range de un solo rango.
+
+    Devuelve (inicio, fin) inclusivo, None si se debe enviar el archivo
+    completo, o "invalid" si el rango no se puede satisfacer.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[6:].strip()
+    if "," in spec:
+        return None  # Varios rangos: se responde con el archivo completo
+    start, _, end = spec.partition("-")
+    try:
+        if start == "":
+            length = int(end)
+            if length == 0:
+                return "invalid"
+            return (max(0, size - length), size - 1)
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return "invalid"
+    return (start, min(end, size - 1))
+
+def accepted_encodings(header):
+    """Codificaciones aceptadas (q > 0) según Accept-Encoding"""
+    accepted = set()
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+def precompressed_variant(path, accept_encoding):
+    """Variante precomprimida de `path` que acepta el cliente.
+    
+    Devuelve (ruta_variante, codificación) o (None, None). Solo se usan
+    variantes al menos tan recientes como el original.
+    """
+    accepted = accepted_encodings(accept_encoding)
+    if not accepted:
+        return None, None
+    try:
+        source_mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None, None
+    for encoding, suffix in ENCODING_SIDECARS:
+        if encoding not in accepted:
+            continue
+        try:
+            if os.stat(path + suffix).st_mtime_ns >= source_mtime:
+                return path + suffix, encoding
+        except OSError:
+            continue
+    return None, None
+
+def has_variants(path):
+    """Indica si existe alguna variante precomprimida (para Vary)"""
+    return any(os.path.exists(path + suffix) for encoding, suffix in ENCODING_SIDECARS)
+
+class CachingRequestHandler(SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler con ETag, 304, Range y Cache-Control"""
+
+    range_remaining = None
+    content_encoding = None
+    vary_encoding = False
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if not self.path.split("?", 1)[0].endswith("/") or not os.path.isfile(index):
+                # Listados y redirecciones quedan como antes
+                return super().send_head()
+            path = index
+
+        # Enviar la variante .br/.gz si existe y el cliente la acepta
+        variant, encoding = precompressed_variant(path, self.headers.get("Accept-Encoding"))
+        try:
+            f = open(variant or path, "rb")
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        try:
+            fs = os.fstat(f.fileno())
+            # Cada variante tiene su propio contenido y por lo tanto su propio ETag
+            etag = etags.get(variant or path, fs)
+            rel_path = os.path.relpath(path, self.directory)
+            self.range_remaining = None
+            self.content_encoding = encoding
+            self.vary_encoding = bool(variant) or has_variants(path)
+
+            if not_modified(self.headers, etag, fs.st_mtime):
+                f.close()
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_validators(etag, fs.st_mtime, rel_path)
+                self.end_headers()
+                return None
+
+            byte_range = None
+            if if_range_matches(self.headers.get("If-Range"), etag):
+                byte_range = parse_range(self.headers.get("Range"), fs.st_size)
+
+            if byte_range == "invalid":
+                f.close()
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{fs.st_size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+
+            if byte_range:
+                start, end = byte_range
+                f.seek(start)
+                self.range_remaining = end - start + 1
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{fs.st_size}")
+                self.send_header("Content-Length", str(self.range_remaining))
+            else:
+                self.send_response(HTTPStatus.OK)
+                self.send_header("Content-Length", str(fs.st_size))
+
+            self.send_header("Content-type", self.guess_type(path))
+            self.send_validators(etag, fs.st_mtime, rel_path)
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def send_validators(self, etag, mtime, rel_path):
+        if self.content_encoding:
+            self.send_header("Content-Encoding", self.content_encoding)
+        if self.vary_encoding:
+            self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", f'"{etag}"')
+        self.send_header("Last-Modified", self.date_time_string(mtime))
+        self.send_header("Cache-Control", cache_control(rel_path))
+        self.send_header("Accept-Ranges", "bytes")
+
+    def copyfile(self, source, outputfile):
+        if self.range_remaining is None:
+            shutil.copyfileobj(source, outputfile)
+            return
+        remaining = self.range_remaining
+        while remaining > 0:
+            chunk = source.read(min(64 * 1024, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Supervisor de procesos de juego
+Lanza el comando de inicio del juego como proceso hijo (sin cambiar el
+directorio del proceso padre), guarda su salida, comprueba que el puerto
+responda y lo reinicia con backoff si se cae
+"""
+
+import os
+import socket
+import subprocess
+import threading
+import time
+from collections import deque
+
+# Líneas de salida del juego que se conservan en memoria
+OUTPUT_CAPACITY = int(os.environ.get("GAME_OUTPUT_CAPACITY", "1000"))
+# Segundos máximos para que el puerto del juego empiece a aceptar conexiones
+STARTUP_TIMEOUT = float(os.environ.get("GAME_STARTUP_TIMEOUT", "60"))
+# Intervalo entre comprobaciones de vida y fallos seguidos antes de reiniciar
+PROBE_INTERVAL = float(os.environ.get("GAME_PROBE_INTERVAL", "2"))
+PROBE_FAILURES = int(os.environ.get("GAME_PROBE_FAILURES", "3"))
+# Backoff entre reinicios: empieza en BACKOFF_INITIAL y se duplica hasta BACKOFF_MAX
+BACKOFF_INITIAL = float(os.environ.get("GAME_BACKOFF_INITIAL", "0.5"))
+BACKOFF_MAX = float(os.environ.get("GAME_BACKOFF_MAX", "30"))
+# Tras este tiempo funcionando bien el backoff vuelve al valor inicial
+BACKOFF_RESET_AFTER = 60
+
+def port_open(port, host="127.0.0.1", timeout=0.5):
+    """Comprobar si hay un servidor aceptando conexiones en el puerto"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+class Supervisor:
+    """Proceso de juego gestionado con sondas de disponibilidad y reinicios.
+
+    Estados: stopped, preparing, starting, running, backoff, failed.
+
+    `prepare(run)` se ejecuta antes del primer arranque (p. ej. npm install);
+    los comandos que lance con `run` los interrumpe stop().
+    """
+
+    def __init__(self, command, cwd, port=None, env=None, prepare=None, name="game",
+                 startup_timeout=STARTUP_TIMEOUT, probe_interval=PROBE_INTERVAL,
+                 probe_failures=PROBE_FAILURES, max_restarts=None):
+        self.command = list(command)
+        self.cwd = str(cwd)
+        self.port = port
+        self.env = env
+        self.prepare = prepare
+        self.name = name
+        self.startup_timeout = startup_timeout
+        self.probe_interval = probe_interval
+        self.probe_failures = probe_failures
+        self.max_restarts = max_restarts
+
+        self.state = "stopped"
+        self.process = None
+        self.restarts = 0
+        self.last_exit_code = None
+        self.started_at = None
+        self.ready_at = None
+        self.startup_latency = None
+        self.startup_latencies = deque(maxlen=20)
+        self.output = deque(maxlen=OUTPUT_CAPACITY)
+        self.output_seq = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._monitor = None
+
+    def log(self, line):
+        with self._lock:
+            self.output_seq += 1
+            self.output.append({"seq": self.output_seq, "timestamp": time.time(), "line": line})
+
+    def output_since(self, seq):
+        with self._lock:
+            lines = []
+            for record in reversed(self.output):
+                if record["seq"] <= seq:
+                    break
+                lines.append(record)
+        lines.reverse()
+        return lines
+
+    @property
+    def alive(self):
+        return self._monitor is not None and self._monitor.is_alive()
+
+    def start(self):
+        """Iniciar la supervisión en segundo plano (idempotente)"""
+        if self.alive:
+            return False
+        self._stop_event.clear()
+        self._monitor = threading.Thread(target=self._run, name=f"supervisor-{self.name}",
+                                         daemon=True)
+        self._monitor.start()
+        return True
+
+    def stop(self, timeout=10):
+        """Detener el proceso y la supervisión"""
+        self._stop_event.set()
+        self._terminate(timeout)
+        if self._monitor and self._monitor is not threading.current_thread():
+            self._monitor.join(timeout)
+        self.state = "stopped"
+
+    def wait(self):
+        """Bloquear hasta que la supervisión termine"""
+        while self.alive:
+            self._monitor.join(0.5)
+
+    def status(self):
+        process = self.process
+        now = time.time()
+        return {
+            "name": self.name,
+            "state": self.state,
+            "command": self.command,
+            "cwd": self.cwd,
+            "port": self.port,
+            "pid": process.pid if process and process.poll() is None else None,
+            "restarts": self.restarts,
+            "last_exit_code": self.last_exit_code,
+            "startup_latency": self.startup_latency,
+            "startup_latencies": list(self.startup_latencies),
+            "uptime": round(now - self.ready_at, 3) if self.state == "running" and self.ready_at else None
+        }
+
+    def run(self, args, cwd=None):
+        """Ejecutar un comando de preparación como subprocess.run, interrumpible con stop()"""
+        self.log(f"[supervisor] Preparando: {' '.join(args)}")
+        process = subprocess.Popen(args, cwd=cwd or self.cwd, env=self.env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        # Como el proceso del juego: stop() lo termina con _terminate()
+        self.process = process
+        if self._stop_event.is_set():
+            self._terminate()
+        self._read_output(process)
+        return subprocess.CompletedProcess(args, process.wait())
+
+    def _spawn(self):
+        self.started_at = time.time()
+        self.ready_at = None
+        self.state = "starting"
+        self.log(f"[supervisor] Ejecutando: {' '.join(self.command)}")
+        self.process = subprocess.Popen(
+            self.command, cwd=self.cwd, env=self.env,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
+        )
+        threading.Thread(target=self._read_output, args=(self.process,), daemon=True).start()
+
+    def _read_output(self, process):
+        for line in process.stdout:
+            self.log(line.rstrip("\n"))
+
+    def _terminate(self, timeout=10):
+        process = self.process
+        if not process or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def _wait_ready(self):
+        """Esperar a que el proceso acepte conexiones; devuelve False si falla"""
+        deadline = time.monotonic() + self.startup_timeout
+        while not self._stop_event.is_set():
+            if self.process.poll() is not None:
+                return False
+            if self.port is None or port_open(self.port):
+                self.ready_at = time.time()
+                self.startup_latency = round(self.ready_at - self.started_at, 3)
+                self.startup_latencies.append(self.startup_latency)
+                self.log(f"[supervisor] Listo en {self.startup_latency} s")
+                return True
+            if time.monotonic() > deadline:
+                self.log("[supervisor] Timeout esperando que el juego abra el puerto")
+                return False
+            time.sleep(0.05)
+        return False
+
+    def _watch(self):
+        """Sondas de vida hasta que el proceso muera o deje de responder"""
+        failures = 0
+        while not self._stop_event.wait(self.probe_interval):
+            if self.process.poll() is not None:
+                return
+            if self.port is not None and not port_open(self.port):
+                failures += 1
+                if failures >= self.probe_failures:
+                    self.log("[supervisor] El juego no responde, reiniciando")
+                    return
+            else:
+                failures = 0
+
+    def _run(self):
+        if self.prepare:
+            self.state = "preparing"
+            try:
+                self.prepare(self.run)
+            except Exception as e:
+                self.log(f"[supervisor] Error preparando el juego: {e}")
+                self.state = "failed"
+                return
+
+        backoff = BACKOFF_INITIAL
+        while not self._stop_event.is_set():
+            if self.port is not None and port_open(self.port):
+                # La sonda de disponibilidad daría por listo un puerto ajeno
+                reason = f"El puerto {self.port} está ocupado por otro proceso"
+                self.ready_at = None
+            else:
+                try:
+                    self._spawn()
+                except OSError as e:
+                    self.log(f"[supervisor] No se pudo ejecutar el juego: {e}")
+                    self.state = "failed"
+                    return
+
+                if self._wait_ready():
+                    self.state = "running"
+                    self._watch()
+
+                self._terminate()
+                self.last_exit_code = self.process.poll()
+                reason = f"Proceso terminado (código {self.last_exit_code})"
+            if self._stop_event.is_set():
+                break
+
+            if self.ready_at and time.time() - self.ready_at > BACKOFF_RESET_AFTER:
+                backoff = BACKOFF_INITIAL
+            if self.max_restarts is not None and self.restarts >= self.max_restarts:
+                self.log("[supervisor] Demasiados reinicios, se detiene la supervisión")
+                self.state = "failed"
+                return
+
+            self.state = "backoff"
+            self.log(f"[supervisor] {reason}, reinicio en {backoff} s")
+            if self._stop_event.wait(backoff):
+                break
+            backoff = min(backoff * 2, BACKOFF_MAX)
+            self.restarts += 1
+        self.state = "stopped"
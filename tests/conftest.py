@@ -0,0 +1,82 @@
+"""
+Configuración común de las pruebas
+La sesión trabaja en un directorio temporal propio: GAME_DIR, las cachés y el
+estado compartido son rutas relativas, así que nunca se toca el checkout del
+repositorio. Los repositorios "remotos" son repositorios bare locales.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORK_DIR = tempfile.mkdtemp(prefix="game-importer-tests-")
+os.environ.setdefault("FILE_WATCHER", "off")
+os.chdir(WORK_DIR)
+
+def pytest_sessionfinish(session, exitstatus):
+    os.chdir(ROOT)
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+def git(args, cwd):
+    return subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@localhost",
+                           "-c", "init.defaultBranch=main"] + args,
+                          cwd=cwd, check=True, capture_output=True, text=True)
+
+def write(root, rel_path, content):
+    """Escribir un archivo bajo `root` creando los directorios intermedios; devuelve su ruta"""
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+class Upstream:
+    """Repositorio bare local con un checkout de trabajo para publicar commits"""
+
+    def __init__(self, root):
+        self.work = os.path.join(root, "work")
+        self.path = os.path.join(root, "upstream.git")
+        os.makedirs(self.work)
+        git(["init", "-q"], self.work)
+
+    def commit(self, files, message="cambios"):
+        for rel_path, content in files.items():
+            write(self.work, rel_path, content)
+        git(["add", "-A"], self.work)
+        git(["commit", "-q", "-m", message], self.work)
+        if os.path.isdir(self.path):
+            git(["push", "-q", self.path, "HEAD:main"], self.work)
+        else:
+            git(["clone", "-q", "--bare", self.work, self.path], os.path.dirname(self.path))
+            # Necesario para la estrategia "partial" con file://
+            git(["config", "uploadpack.allowFilter", "true"], self.path)
+        return git(["rev-parse", "HEAD"], self.work).stdout.strip()
+
+@pytest.fixture
+def upstream(tmp_path):
+    """Juego web con dos commits"""
+    repo = Upstream(str(tmp_path / "upstream"))
+    repo.commit({"index.html": "<html><script src=\"js/game.js\"></script></html>\n",
+                 "js/game.js": "console.log('v1');\n"}, "v1")
+    repo.commit({"js/game.js": "console.log('v2');\n" * 50}, "v2")
+    return repo
+
+@pytest.fixture(scope="session")
+def main_module():
+    import main
+    return main
+
+@pytest.fixture
+def app(main_module):
+    return main_module.create_app()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,45 @@
+"""Paquete de assets (asset_pack.py)"""
+
+import os
+
+import asset_pack
+import project_index
+from conftest import write
+from releases import ReleaseManager
+
+def test_pack_is_written_outside_the_game_tree(tmp_path):
+    game_dir = str(tmp_path / "game")
+    write(game_dir, "index.html", "<html></html>\n")
+    write(game_dir, "js/game.js", "console.log('x');\n")
+    write(game_dir, "node_modules/lib/index.js", "module.exports = 1;\n")
+
+    stats = asset_pack.build_pack(game_dir)
+
+    assert stats["path"] == game_dir + asset_pack.PACK_SUFFIX
+    assert sorted(os.listdir(game_dir)) == ["index.html", "js", "node_modules"]
+    assert sorted(project_index.get_index(game_dir).files) == ["index.html", "js/game.js"]
+    with asset_pack.AssetPack(stats["path"]) as pack:
+        assert sorted(pack.files) == ["index.html", "js/game.js"]
+        assert bytes(pack.data(pack.lookup("js/game.js"))) == b"console.log('x');\n"
+    # El paquete no cambia el árbol, así que sigue al día y no se reconstruye
+    built_at = os.stat(stats["path"]).st_mtime_ns
+    assert asset_pack.ensure_pack(game_dir) == stats["path"]
+    assert os.stat(stats["path"]).st_mtime_ns == built_at
+
+def test_pack_follows_the_active_release_and_survives_prune(tmp_path):
+    game_dir = str(tmp_path / "game")
+    releases = ReleaseManager(game_dir, keep=1)
+    staging = releases.stage()
+    write(staging, "index.html", "<html>v1</html>\n")
+    release_id = releases.publish(staging)["id"]
+
+    path = asset_pack.ensure_pack(game_dir)
+    assert path == releases.path(release_id) + asset_pack.PACK_SUFFIX
+    releases.prune()
+    assert os.path.exists(path)
+
+    staging = releases.stage()
+    write(staging, "index.html", "<html>v2</html>\n")
+    releases.publish(staging)
+    # La versión anterior se expulsa junto con su paquete
+    assert not os.path.exists(path)
@@ -0,0 +1,75 @@
+"""Estrategias de clonado de GameImporter contra un repositorio bare local"""
+
+import os
+
+import pytest
+
+import git_cache
+from conftest import git
+from git_cache import GitCache
+
+@pytest.fixture(autouse=True)
+def no_git_cache(monkeypatch):
+    """Clonar directamente del origen para probar cada estrategia por sí sola"""
+    monkeypatch.setattr(git_cache, "git_cache", GitCache(enabled=False))
+
+def clone(main_module, upstream, game_dir, strategy):
+    importer = main_module.GameImporter(game_dir=game_dir)
+    assert importer.clone_repository(upstream.path, strategy)
+    # Con releases el clon queda en un staging hasta publicarlo, como hace JobManager
+    if importer.staging:
+        assert importer.publish_release(upstream.path, strategy)
+    return importer
+
+def commits(repo):
+    return int(git(["rev-list", "--count", "HEAD"], repo).stdout)
+
+def is_shallow(repo):
+    return git(["rev-parse", "--is-shallow-repository"], repo).stdout.strip() == "true"
+
+def missing_objects(repo):
+    listing = git(["rev-list", "--objects", "--all", "--missing=print"], repo).stdout
+    return [line for line in listing.splitlines() if line.startswith("?")]
+
+def test_full_clone_has_the_whole_history(main_module, upstream, tmp_path):
+    importer = clone(main_module, upstream, str(tmp_path / "game"), "full")
+    assert commits(importer.game_path) == 2
+    assert not is_shallow(importer.game_path)
+    assert missing_objects(importer.game_path) == []
+    stats = importer.phases["clone"]
+    assert stats["strategy"] == "full" and stats["bytes"] > 0 and stats["seconds"] is not None
+
+def test_shallow_clone_has_only_the_last_commit(main_module, upstream, tmp_path):
+    importer = clone(main_module, upstream, str(tmp_path / "game"), "shallow")
+    assert commits(importer.game_path) == 1
+    assert is_shallow(importer.game_path)
+    with open(os.path.join(importer.game_path, "js", "game.js")) as f:
+        assert "v2" in f.read()
+
+def test_partial_clone_skips_old_blobs(main_module, upstream, tmp_path):
+    importer = clone(main_module, upstream, str(tmp_path / "game"), "partial")
+    assert commits(importer.game_path) == 2
+    assert not is_shallow(importer.game_path)
+    # El blob de js/game.js de v1 no se descargó
+    assert len(missing_objects(importer.game_path)) == 1
+
+def test_update_fetches_into_the_existing_checkout(main_module, upstream, tmp_path):
+    game_dir = str(tmp_path / "game")
+    clone(main_module, upstream, game_dir, "shallow")
+    head = upstream.commit({"js/game.js": "console.log('v3');\n"}, "v3")
+
+    importer = clone(main_module, upstream, game_dir, "update")
+    assert importer.phases["clone"]["strategy"] == "update"
+    assert git(["rev-parse", "HEAD"], importer.game_path).stdout.strip() == head
+    with open(os.path.join(importer.game_path, "js", "game.js")) as f:
+        assert f.read() == "console.log('v3');\n"
+
+def test_update_without_checkout_falls_back_to_shallow(main_module, upstream, tmp_path):
+    importer = clone(main_module, upstream, str(tmp_path / "game"), "update")
+    assert importer.phases["clone"]["strategy"] == "shallow"
+    assert is_shallow(importer.game_path)
+
+def test_import_rejects_unknown_strategies(main_module, client, monkeypatch, upstream):
+    monkeypatch.setattr(main_module, "ALLOW_LOCAL_REPOS", True)
+    response = client.post("/api/import", json={"repo_url": upstream.path, "strategy": "mirror"})
+    assert response.status_code == 400
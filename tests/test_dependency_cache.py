@@ -0,0 +1,101 @@
+"""Caché de dependencias (dependency_cache.py) con instalaciones simuladas"""
+
+import os
+import subprocess
+import time
+
+import pytest
+
+from dependency_cache import PYTHON_PACKAGES_DIR, DependencyCache
+
+class FakeInstaller:
+    """Sustituto de pip/npm: escribe un paquete en el directorio de destino"""
+
+    def __init__(self, returncode=0):
+        self.calls = []
+        self.returncode = returncode
+
+    def __call__(self, args, cwd=None):
+        self.calls.append(args)
+        if args[0] == "npm":
+            dest = os.path.join(cwd, "node_modules")
+        else:
+            dest = args[args.index("--target") + 1]
+        if self.returncode == 0:
+            os.makedirs(os.path.join(dest, "pkg"), exist_ok=True)
+            with open(os.path.join(dest, "pkg", "__init__.py"), "w") as f:
+                f.write("VERSION = 1\n")
+        return subprocess.CompletedProcess(args, self.returncode, "", "")
+
+@pytest.fixture
+def cache(tmp_path):
+    return DependencyCache(root=str(tmp_path / "deps"))
+
+def package_file(game_path):
+    return os.path.join(game_path, PYTHON_PACKAGES_DIR, "pkg", "__init__.py")
+
+def test_python_miss_then_hit_restores_independent_copies(cache, tmp_path):
+    install = FakeInstaller()
+    first, second = str(tmp_path / "first"), str(tmp_path / "second")
+    os.makedirs(first)
+    os.makedirs(second)
+
+    assert cache.ensure_python(first, ["pygame==2.5.2"], run=install) == "miss"
+    assert cache.ensure_python(second, ["pygame==2.5.2", ""], run=install) == "hit"
+    assert len(install.calls) == 1
+    assert cache.stats()["entries"] == 1
+
+    # Un paquete que se modifica a sí mismo no altera la caché ni a otro juego
+    assert os.stat(package_file(second)).st_ino != os.stat(package_file(first)).st_ino
+    with open(package_file(first), "w") as f:
+        f.write("VERSION = 'parcheado'\n")
+    third = str(tmp_path / "third")
+    os.makedirs(third)
+    assert cache.ensure_python(third, ["pygame==2.5.2"], run=install) == "hit"
+    for game in (second, third):
+        with open(package_file(game)) as f:
+            assert f.read() == "VERSION = 1\n"
+
+def test_different_dependencies_miss(cache, tmp_path):
+    install = FakeInstaller()
+    game = str(tmp_path / "game")
+    os.makedirs(game)
+    assert cache.ensure_python(game, ["pygame==2.5.2"], run=install) == "miss"
+    assert cache.ensure_python(game, ["pygame==2.6.0"], run=install) == "miss"
+    assert len(install.calls) == 2
+    assert cache.stats()["entries"] == 2
+
+def test_failed_install_is_not_cached(cache, tmp_path):
+    game = str(tmp_path / "game")
+    os.makedirs(game)
+    assert cache.ensure_python(game, ["missing"], run=FakeInstaller(returncode=1)) == "failed"
+    assert cache.stats()["entries"] == 0
+
+def test_node_modules_keyed_by_lockfile(cache, tmp_path):
+    install = FakeInstaller()
+    games = []
+    for name in ("a", "b"):
+        game = tmp_path / name
+        game.mkdir()
+        (game / "package-lock.json").write_text('{"lockfileVersion": 3}')
+        games.append(str(game))
+
+    assert cache.ensure_node(games[0], run=install) == "miss"
+    assert install.calls[0][:2] == ["npm", "ci"]
+    assert cache.ensure_node(games[1], run=install) == "hit"
+    assert os.path.isfile(os.path.join(games[1], "node_modules", "pkg", "__init__.py"))
+
+def test_evicts_least_recently_used_over_the_size_limit(cache, tmp_path):
+    install = FakeInstaller()
+    game = str(tmp_path / "game")
+    os.makedirs(game)
+    cache.ensure_python(game, ["a"], run=install)
+    (entry,) = cache.entries()
+    cache.max_bytes = entry["size"]
+    # Usada hace un minuto: dentro de max_age, sale solo por tamaño
+    used = time.time() - 60
+    os.utime(entry["path"], (used, used))
+
+    cache.ensure_python(game, ["b"], run=install)
+    (remaining,) = cache.entries()
+    assert remaining["key"] != entry["key"]
@@ -0,0 +1,61 @@
+"""Eventos del importador por Server-Sent Events (EventBus y /api/events)"""
+
+import threading
+
+import pytest
+
+@pytest.fixture
+def bus(main_module, monkeypatch):
+    bus = main_module.EventBus(max_age=0.3)
+    monkeypatch.setattr(main_module.importer, "events", bus)
+    return bus
+
+def test_published_events_reach_open_streams(bus):
+    stream = bus.stream(heartbeat=5)
+    assert next(stream) == "retry: 3000\n\n"
+    threading.Timer(0.05, bus.publish, ("status", {"status": "cloning"})).start()
+    assert next(stream) == 'id: 1\nevent: status\ndata: {"status": "cloning"}\n\n'
+    assert bus.subscribers == 1
+    stream.close()
+    assert bus.subscribers == 0
+
+def test_heartbeats_keep_idle_streams_alive(bus):
+    stream = bus.stream(heartbeat=0.05)
+    next(stream)
+    assert next(stream) == ": heartbeat\n\n"
+    stream.close()
+
+def test_streams_end_after_max_age(bus):
+    # Termina solo; el navegador se reconecta tras `retry` con Last-Event-ID
+    assert list(bus.stream(heartbeat=5)) == ["retry: 3000\n\n"]
+    assert bus.subscribers == 0
+
+def test_reconnection_replays_events_after_last_event_id(bus, client):
+    for n in range(3):
+        bus.publish("log", {"seq": n + 1})
+
+    response = client.get("/api/events", headers={"Last-Event-ID": "1"})
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    body = response.get_data(as_text=True)
+    assert "id: 1\n" not in body
+    assert "id: 2\n" in body and "id: 3\n" in body
+
+    # EventSource nuevo: el último id va en la URL
+    body = client.get("/api/events?last_event_id=2").get_data(as_text=True)
+    assert "id: 2\n" not in body and "id: 3\n" in body
+
+def test_unknown_last_event_id_starts_from_now(bus, client):
+    bus.publish("log", {"seq": 1})
+    for last_event_id in ("abc", "99"):
+        body = client.get("/api/events", headers={"Last-Event-ID": last_event_id}).get_data(
+            as_text=True)
+        assert "id: 1\n" not in body
+
+def test_streams_over_the_limit_get_503(bus, client, monkeypatch):
+    monkeypatch.setattr(bus, "max_streams", 1)
+    stream = bus.stream()
+    response = client.get("/api/events")
+    assert response.status_code == 503 and response.headers["Retry-After"] == "30"
+    stream.close()
+    assert client.get("/api/events").status_code == 200
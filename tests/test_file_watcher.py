@@ -0,0 +1,114 @@
+"""Vigilancia de cambios en el directorio del juego (file_watcher.py)"""
+
+import os
+import queue
+import time
+
+import pytest
+
+import project_index
+from conftest import write
+from file_watcher import FileWatcher, InotifyBackend, PollingBackend, load_libc
+
+BACKENDS = [
+    pytest.param("inotify", marks=pytest.mark.skipif(load_libc() is None,
+                                                     reason="inotify no disponible")),
+    "polling",
+]
+
+def collect(backend, rel_paths, timeout=5):
+    """Leer del backend hasta ver todas las rutas esperadas"""
+    changed = set()
+    deadline = time.monotonic() + timeout
+    while not set(rel_paths) <= changed:
+        assert time.monotonic() < deadline, f"Solo se vieron {sorted(changed)}"
+        changed |= backend.read(0.1)
+    return changed
+
+@pytest.fixture
+def game_dir(tmp_path):
+    game_dir = str(tmp_path / "game")
+    write(game_dir, "index.html", "<html></html>\n")
+    write(game_dir, "js/game.js", "1")
+    return game_dir
+
+@pytest.fixture
+def watch(game_dir):
+    watchers = []
+
+    def watch(backend, **options):
+        batches = queue.Queue()
+        options.setdefault("poll_interval", 0.1)
+        watcher = FileWatcher(game_dir, batches.put, backend=backend, **options)
+        watchers.append(watcher.start())
+        assert batches.get(timeout=5) is None  # Al empezar se revisa todo el árbol
+        return watcher, batches
+
+    yield watch
+    for watcher in watchers:
+        watcher.stop()
+    project_index._indexes.pop(os.path.abspath(game_dir), None)
+
+@pytest.mark.skipif(load_libc() is None, reason="inotify no disponible")
+def test_inotify_sees_files_inside_new_directories(game_dir):
+    backend = InotifyBackend(game_dir)
+    backend.start()
+    try:
+        # Creado antes de que exista el watch del directorio nuevo
+        write(game_dir, "assets/img/player.png", "png")
+        write(game_dir, "node_modules/lib/index.js", "ignorado")
+        changed = collect(backend, ["assets/img/player.png"])
+        assert not any(path.startswith("node_modules") for path in changed)
+    finally:
+        backend.close()
+
+def test_polling_sees_created_modified_and_deleted_files(game_dir):
+    backend = PollingBackend(game_dir, interval=0.05)
+    backend.start()
+    write(game_dir, "js/game.js", "22")
+    write(game_dir, "js/new.js", "nuevo")
+    os.unlink(os.path.join(game_dir, "index.html"))
+    assert collect(backend, ["js/game.js", "js/new.js", "index.html"]) == {
+        "js/game.js", "js/new.js", "index.html"}
+    assert backend.read(0.1) == set()
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_bursts_are_debounced_into_one_batch(game_dir, watch, backend):
+    watcher, batches = watch(backend, debounce=0.3)
+    for n in range(5):
+        write(game_dir, f"levels/{n}.json", "{}")
+    assert batches.get(timeout=5) >= {f"levels/{n}.json" for n in range(5)}
+    with pytest.raises(queue.Empty):
+        batches.get(timeout=0.6)
+    assert watcher.stats()["backend"] == backend
+
+def test_max_delay_delivers_during_continuous_changes(game_dir, watch):
+    watcher, batches = watch("polling", debounce=0.3, max_delay=0.5)
+    started = time.monotonic()
+    while batches.empty():
+        assert time.monotonic() - started < 5
+        write(game_dir, "save.json", str(time.monotonic()))
+        time.sleep(0.05)
+    assert time.monotonic() - started < 2
+    assert "save.json" in batches.get()
+
+def test_stop_unwatches_the_index(game_dir):
+    def on_change(paths):
+        project_index.apply_changes(game_dir, paths)
+
+    watcher = FileWatcher(game_dir, on_change, on_lost=lambda: project_index.unwatch(game_dir),
+                          backend="polling", poll_interval=0.1)
+    try:
+        for _ in range(2):
+            watcher.start()
+            index = project_index.get_index(game_dir)
+            deadline = time.monotonic() + 5
+            while not index.watched:
+                assert time.monotonic() < deadline
+                time.sleep(0.02)
+            # Sin watcher el índice debe volver a comprobar el disco
+            watcher.stop()
+            assert not index.watched and watcher.stats()["backend"] is None
+    finally:
+        watcher.stop()
+        project_index._indexes.pop(os.path.abspath(game_dir), None)
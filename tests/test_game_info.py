@@ -0,0 +1,88 @@
+"""Listado de archivos del juego (/api/game_info): páginas, árbol y ETag"""
+
+import os
+
+import pytest
+
+import project_index
+from conftest import write
+
+FILES = {
+    "index.html": "<html></html>\n",
+    "js/a.js": "a",
+    "js/b.js": "bb",
+    "js/lib/c.js": "ccc",
+    "requirements.txt": "pygame==2.5.2\n",
+}
+
+@pytest.fixture
+def game_dir(main_module, monkeypatch, tmp_path):
+    game_dir = str(tmp_path / "game")
+    for rel_path, content in FILES.items():
+        write(game_dir, rel_path, content)
+    importer = main_module.GameImporter(game_dir=game_dir)
+    importer.game_path = game_dir
+    monkeypatch.setattr(main_module, "importer", importer)
+    yield game_dir
+    project_index._indexes.pop(os.path.abspath(game_dir), None)
+
+def edit_in_place(game_dir, rel_path, content):
+    """Reescribir un archivo sin cambiar el mtime de su directorio"""
+    directory = os.path.dirname(os.path.join(game_dir, rel_path))
+    dir_stat = os.stat(directory)
+    write(game_dir, rel_path, content)
+    os.utime(directory, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+
+def test_pages_follow_the_cursor(client, game_dir):
+    seen = []
+    url = "/api/game_info?limit=2"
+    while True:
+        document = client.get(url).get_json()
+        assert document["matched"] == len(FILES)
+        seen += document["structure"]
+        if document["next_cursor"] is None:
+            break
+        url = f"/api/game_info?limit=2&cursor={document['next_cursor']}"
+    assert seen == sorted(FILES)
+
+def test_prefix_filters_a_contiguous_range(client, game_dir):
+    document = client.get("/api/game_info?prefix=js/&limit=10").get_json()
+    assert document["structure"] == ["js/a.js", "js/b.js", "js/lib/c.js"]
+    assert document["matched"] == 3 and document["next_cursor"] is None
+
+    tree = client.get("/api/game_info?prefix=js/&format=tree").get_json()["tree"]
+    assert tree == {"js": {"a.js": 1, "b.js": 2, "lib": {"c.js": 3}}}
+
+def test_invalid_parameters_are_rejected(client, game_dir):
+    assert client.get("/api/game_info?cursor=%%%").status_code == 400
+    assert client.get("/api/game_info?limit=0").status_code == 400
+    assert client.get("/api/game_info?format=xml").status_code == 400
+
+def test_full_document_is_streamed(client, game_dir):
+    response = client.get("/api/game_info?format=tree")
+    assert response.is_streamed
+    document = response.get_json()
+    assert document["file_count"] == len(FILES)
+    assert document["tree"]["js"]["lib"] == {"c.js": 3}
+
+    response = client.get("/api/game_info")
+    assert response.is_streamed
+    assert sorted(response.get_json()["structure"]) == sorted(FILES)
+
+def test_in_place_edits_change_sizes_and_etag_without_watcher(client, game_dir):
+    url = "/api/game_info?prefix=js/&format=tree"
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    edit_in_place(game_dir, "js/b.js", "b" * 10)
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["tree"]["js"]["b.js"] == 10
+
+    summary = client.get("/api/game_info?view=summary")
+    edit_in_place(game_dir, "requirements.txt", "pygame==2.6.0\n")
+    response = client.get("/api/game_info?view=summary",
+                          headers={"If-None-Match": summary.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.get_json()["dependencies"] == ["pygame==2.6.0"]
@@ -0,0 +1,57 @@
+"""Servidor web de GameServer (game_server.py) con conexiones keep-alive"""
+
+import select
+import socket
+import threading
+
+import pytest
+
+from conftest import write
+from game_server import GameServer
+
+def start(tmp_path, **options):
+    game_dir = str(tmp_path / "game")
+    write(game_dir, "index.html", "<html></html>\n")
+    server = GameServer(game_dir, port=0, open_browser=False, log_requests=False,
+                        pack=False, **options)
+    server.create_web_server()
+    threading.Thread(target=server.server.serve_forever, daemon=True).start()
+    return server
+
+@pytest.fixture
+def connect():
+    sockets = []
+
+    def connect(port):
+        sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+        sockets.append(sock)
+        return sock
+
+    yield connect
+    for sock in sockets:
+        sock.close()
+
+def request(sock):
+    sock.sendall(b"GET /index.html HTTP/1.1\r\nHost: localhost\r\n\r\n")
+
+def test_idle_keepalive_connections_do_not_block_requests(tmp_path, connect):
+    server = start(tmp_path)
+    # Más conexiones inactivas que los hilos del antiguo pool fijo
+    for _ in range(40):
+        connect(server.port)
+    sock = connect(server.port)
+    request(sock)
+    assert sock.recv(64).startswith(b"HTTP/1.1 200")
+    server.stop()
+
+def test_connections_over_the_limit_wait_in_the_backlog(tmp_path, connect):
+    server = start(tmp_path, connections=2)
+    idle = [connect(server.port) for _ in range(2)]
+    waiting = connect(server.port)
+    request(waiting)
+    readable, _, _ = select.select([waiting], [], [], 0.5)
+    assert not readable
+
+    idle[0].close()
+    assert waiting.recv(64).startswith(b"HTTP/1.1 200")
+    server.stop()
@@ -0,0 +1,116 @@
+"""Caché de objetos de git compartida (git_cache.py)"""
+
+import subprocess
+import threading
+
+import pytest
+
+import git_cache
+from conftest import git
+from git_cache import GitCache
+
+def run(args):
+    return subprocess.run(args, capture_output=True, text=True)
+
+def is_shallow(repo):
+    return git(["rev-parse", "--is-shallow-repository"], repo).stdout.strip() == "true"
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Caché propia de la prueba, también para el importador"""
+    cache = GitCache(root=str(tmp_path / "git-cache"), ttl=3600)
+    monkeypatch.setattr(git_cache, "git_cache", cache)
+    return cache
+
+def import_repo(main_module, repo_url, game_dir, strategy):
+    importer = main_module.GameImporter(game_dir=game_dir)
+    assert importer.clone_repository(repo_url, strategy)
+    return importer
+
+def test_mirror_miss_then_hit(main_module, cache, upstream, tmp_path):
+    first = import_repo(main_module, upstream.path, str(tmp_path / "a"), "full")
+    stats = first.phases["clone"]
+    assert stats["git_cache"] == "miss"
+    # Lo descargado al espejo cuenta en los bytes de la fase
+    assert stats["git_cache_bytes"] > 0
+    assert stats["bytes"] >= stats["git_cache_bytes"]
+    (entry,) = cache.entries()
+    assert not entry["shallow"]
+
+    second = import_repo(main_module, upstream.path, str(tmp_path / "b"), "full")
+    assert second.phases["clone"]["git_cache"] == "hit"
+    assert second.phases["clone"]["git_cache_bytes"] == 0
+    # El checkout apunta al origen, no al espejo
+    remote = git(["remote", "get-url", "origin"], second.game_path).stdout.strip()
+    assert remote == second.clone_url(upstream.path)
+
+def test_refresh_fetches_new_commits(main_module, cache, upstream, tmp_path):
+    import_repo(main_module, upstream.path, str(tmp_path / "a"), "full")
+    head = upstream.commit({"js/game.js": "console.log('v3');\n"}, "v3")
+    cache.ttl = 0
+
+    importer = import_repo(main_module, upstream.path, str(tmp_path / "b"), "full")
+    assert importer.phases["clone"]["git_cache"] == "refresh"
+    assert git(["rev-parse", "HEAD"], importer.game_path).stdout.strip() == head
+
+def test_shallow_imports_use_a_shallow_mirror(main_module, cache, upstream, tmp_path):
+    importer = import_repo(main_module, upstream.path, str(tmp_path / "a"), "shallow")
+    assert importer.phases["clone"]["git_cache"] == "miss"
+    (entry,) = cache.entries()
+    assert entry["shallow"] and is_shallow(entry["path"])
+    assert is_shallow(importer.game_path)
+
+    # Una importación completa completa el espejo aunque esté dentro del TTL
+    importer = import_repo(main_module, upstream.path, str(tmp_path / "b"), "full")
+    assert importer.phases["clone"]["git_cache"] == "refresh"
+    (entry,) = cache.entries()
+    assert not entry["shallow"] and not is_shallow(entry["path"])
+    count = git(["rev-list", "--count", "HEAD"], importer.game_path).stdout.strip()
+    assert count == "2"
+
+def test_partial_imports_bypass_the_cache(main_module, cache, upstream, tmp_path):
+    importer = import_repo(main_module, upstream.path, str(tmp_path / "a"), "partial")
+    assert importer.phases["clone"]["git_cache"] is None
+    assert cache.entries() == []
+
+def test_fresh_mirror_is_shared_while_cloning(cache, upstream):
+    url = upstream.path
+    with cache.source(url, run, log=lambda message: None) as mirror:
+        assert mirror
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with cache.source(url, run, log=lambda message: None):
+            entered.set()
+            release.wait(10)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    try:
+        assert entered.wait(10)
+        # Otra importación entra mientras la primera sigue clonando...
+        stats = {}
+        with cache.source(url, run, log=lambda message: None, stats=stats) as mirror:
+            assert mirror and stats["git_cache"] == "hit"
+        # ...pero nadie puede expulsar el espejo en uso
+        assert cache._remove(cache.entries()[0]) is False
+    finally:
+        release.set()
+        holder.join()
+    assert cache._remove(cache.entries()[0]) is True
+
+def test_cache_is_disabled_without_cross_process_locks(main_module, cache, upstream,
+                                                       tmp_path, monkeypatch):
+    with cache.source(upstream.path, run, log=lambda message: None) as mirror:
+        assert mirror
+    monkeypatch.setattr(git_cache, "fcntl", None)
+
+    # Sin flock otro proceso podría reescribir el espejo mientras se clona
+    unlocked = GitCache(root=cache.root)
+    monkeypatch.setattr(git_cache, "git_cache", unlocked)
+    assert not unlocked.stats()["enabled"]
+    importer = import_repo(main_module, upstream.path, str(tmp_path / "a"), "full")
+    assert importer.phases["clone"]["git_cache"] is None
+    # Tampoco se expulsan espejos que otro proceso podría estar usando
+    assert unlocked._remove(unlocked.entries()[0]) is False
@@ -0,0 +1,105 @@
+"""Progreso de git clone/fetch (git_progress.py) y aborto de clones bloqueados"""
+
+import sys
+import time
+
+import pytest
+
+from git_progress import GitProgress
+
+# stderr real de `git clone --progress`: las actualizaciones van separadas por \r
+CLONE_STDERR = (
+    b"Cloning into 'game'...\n"
+    b"remote: Enumerating objects: 1000, done.\n"
+    b"remote: Counting objects:  50% (500/1000)\rremote: Counting objects: 100% (1000/1000), done.\n"
+    b"remote: Compressing objects: 100% (800/800), done.\n"
+    b"Receiving objects:  10% (100/1000), 1.00 MiB | 512.00 KiB/s\r"
+    b"Receiving objects:  45% (450/1000), 4.50 MiB | 2.00 MiB/s\r"
+    b"Receiving objects: 100% (1000/1000), 10.00 MiB | 2.50 MiB/s, done.\n"
+    b"Resolving deltas: 100% (300/300), done.\n"
+    b"warning: redirecting to https://example.com/game.git/\n"
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_parses_stages_counts_bytes_and_throughput():
+    clock = FakeClock()
+    progress = GitProgress(clock=clock)
+    progress.feed(CLONE_STDERR[:CLONE_STDERR.index(b"Receiving")])
+    assert progress.stage == "Compressing objects" and progress.done
+
+    clock.now = 1.0
+    progress.feed(b"Receiving objects:  10% (100/1000), 1.00 MiB | 512.00 KiB/s\r")
+    clock.now = 3.0
+    progress.feed(b"Receiving objects:  45% (450/1000), 4.50 MiB | 2.00 MiB/s\r")
+    snapshot = progress.snapshot()
+    assert snapshot["stage"] == "Receiving objects"
+    assert (snapshot["percent"], snapshot["objects"], snapshot["total_objects"]) == (45, 450, 1000)
+    assert snapshot["bytes"] == int(4.5 * 1024 ** 2)
+    assert snapshot["throughput"] == 2 * 1024 ** 2
+    # 350 objetos en 2 s: quedan 550 a 175 objetos/s
+    assert snapshot["eta"] == pytest.approx(550 / 175, abs=0.1)
+    assert not snapshot["done"]
+
+def test_chunks_split_anywhere_give_the_same_result():
+    whole = GitProgress()
+    whole.feed(CLONE_STDERR)
+    whole.close()
+
+    pieces = GitProgress()
+    for i in range(0, len(CLONE_STDERR), 7):
+        pieces.feed(CLONE_STDERR[i:i + 7])
+    pieces.close()
+
+    for progress in (whole, pieces):
+        assert progress.stage == "Resolving deltas" and progress.done
+        assert progress.count == progress.total == 300
+        assert progress.bytes == 10 * 1024 ** 2
+        assert progress.eta == 0.0
+    # Las líneas que no son de progreso se conservan como mensajes
+    assert list(pieces.messages) == list(whole.messages) == [
+        "Cloning into 'game'...", "warning: redirecting to https://example.com/game.git/"]
+
+def test_idle_time_only_resets_when_progress_changes():
+    clock = FakeClock()
+    progress = GitProgress(clock=clock)
+    assert progress.feed(b"Receiving objects:  10% (100/1000), 1.00 MiB\r")
+    clock.now = 5.0
+    # La misma línea repetida no es progreso
+    assert not progress.feed(b"Receiving objects:  10% (100/1000), 1.00 MiB\r")
+    assert progress.idle_for() == 5.0
+    assert progress.feed(b"Receiving objects:  11% (110/1000), 1.10 MiB\r")
+    assert progress.idle_for() == 0.0
+
+def fake_git(script):
+    """Proceso que imita a git escribiendo progreso en stderr"""
+    return [sys.executable, "-c", "import sys, time\n" + script]
+
+def test_stalled_clone_is_aborted(main_module, tmp_path):
+    importer = main_module.GameImporter(game_dir=str(tmp_path / "game"))
+    process = fake_git(
+        "sys.stderr.write('Receiving objects:  10% (100/1000), 1.00 MiB\\r')\n"
+        "sys.stderr.flush()\n"
+        "time.sleep(30)\n")
+    started = time.monotonic()
+    with pytest.raises(main_module.CloneStalled, match="Receiving objects"):
+        importer.run_git(process, timeout=20, stall_timeout=0.5)
+    assert time.monotonic() - started < 10
+    assert importer.progress.count == 100
+
+def test_slow_but_steady_clone_is_not_aborted(main_module, tmp_path):
+    importer = main_module.GameImporter(game_dir=str(tmp_path / "game"))
+    process = fake_git(
+        "for n in range(1, 11):\n"
+        "    sys.stderr.write(f'Receiving objects: {n * 10:3d}% ({n * 10}/100)\\r')\n"
+        "    sys.stderr.flush()\n"
+        "    time.sleep(0.15)\n"
+        "sys.stderr.write('Receiving objects: 100% (100/100), done.\\n')\n")
+    result = importer.run_git(process, timeout=20, stall_timeout=0.5)
+    assert result.returncode == 0
+    assert importer.progress.done and importer.progress.count == 100
@@ -0,0 +1,25 @@
+"""Instancias de juego (instances.py) servidas por la aplicación principal"""
+
+from conftest import write
+
+def test_instance_named_like_a_game_directory_does_not_hide_it(main_module, client,
+                                                               monkeypatch, tmp_path):
+    main_module.initialize()
+    game_dir = str(tmp_path / "game")
+    write(game_dir, "public/app.js", "activo")
+    importer = main_module.GameImporter(game_dir=game_dir)
+    importer.game_path = game_dir
+    monkeypatch.setattr(main_module, "importer", importer)
+
+    instances = main_module.get_instances()
+    instance = instances.create("public")
+    try:
+        write(instance.game_dir, "app.js", "instancia")
+        instance.importer.game_path = instance.game_dir
+        assert instance.to_dict()["files_url"] == "/game/@public/"
+
+        assert client.get("/game/public/app.js").get_data() == b"activo"
+        assert client.get("/game/@public/app.js").get_data() == b"instancia"
+        assert client.get("/game/@missing/app.js").status_code == 404
+    finally:
+        instances.remove("public")
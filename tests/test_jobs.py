@@ -0,0 +1,49 @@
+"""Trabajos de importación (JobManager) y su log compartido"""
+
+import os
+
+def test_job_logs_are_shared_with_active_importer(main_module, client, upstream, tmp_path):
+    main_module.initialize()
+    last_seq = client.get("/api/status").get_json()["last_log_seq"]
+
+    job = main_module.jobs.submit(upstream.path, game_dir=str(tmp_path / "game"),
+                                  strategy="shallow")
+    job.future.result(timeout=120)
+
+    assert job.state == "succeeded", job.error
+    assert job.importer.logs is main_module.importer.logs
+    assert job.importer.events is main_module.importer.events
+
+    messages = [record["message"] for record in
+                client.get(f"/api/logs?since={last_seq}").get_json()["logs"]]
+    assert any("clonado exitosamente" in message for message in messages)
+    assert client.get("/api/status").get_json()["last_log_seq"] > last_seq
+
+def test_empty_shared_buffers_are_reused(main_module):
+    logs = main_module.LogBuffer()
+    events = main_module.EventBus()
+    assert len(logs) == 0
+    job_importer = main_module.GameImporter(game_dir=os.path.join("games", "x"),
+                                            events=events, logs=logs)
+    assert job_importer.logs is logs
+    assert job_importer.events is events
+
+def test_active_game_change_during_a_job_is_adopted_afterwards(main_module, client,
+                                                               monkeypatch, tmp_path):
+    main_module.initialize()
+    importer = main_module.GameImporter(game_dir=str(tmp_path / "game"))
+    monkeypatch.setattr(main_module, "importer", importer)
+    other_game = tmp_path / "other-game"
+    other_game.mkdir()
+
+    # Otro proceso activa un juego mientras aquí se ejecuta un trabajo
+    other_process = main_module.SharedState(root=main_module.shared_state.root)
+    other_process.write("active_game", {"game_path": str(other_game), "status": "ready"})
+    with monkeypatch.context() as running:
+        running.setattr(main_module.jobs, "current", lambda: object())
+        client.get("/api/status")
+        assert importer.game_path != str(other_game)
+
+    client.get("/api/status")
+    assert importer.game_path == str(other_game)
+    assert importer.status == "ready"
@@ -0,0 +1,58 @@
+"""Métricas de Prometheus (metrics.py y /metrics)"""
+
+import git_cache
+import metrics
+from git_cache import GitCache
+
+def sample(text, series):
+    """Valor de una serie (nombre y etiquetas tal cual aparecen) o 0"""
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0
+
+def test_histogram_exposition():
+    registry = metrics.Registry()
+    histogram = registry.histogram("phase_seconds", "Duración", ("phase",), buckets=(1, 5))
+    histogram.observe(0.5, phase="clone")
+    histogram.observe(3, phase="clone")
+    histogram.observe(7, phase="clone")
+    text = registry.render()
+
+    assert "# TYPE phase_seconds histogram" in text
+    assert sample(text, 'phase_seconds_bucket{phase="clone",le="1"}') == 1
+    assert sample(text, 'phase_seconds_bucket{phase="clone",le="5"}') == 2
+    assert sample(text, 'phase_seconds_bucket{phase="clone",le="+Inf"}') == 3
+    assert sample(text, 'phase_seconds_sum{phase="clone"}') == 10.5
+    assert sample(text, 'phase_seconds_count{phase="clone"}') == 3
+
+def test_labels_are_escaped_and_broken_callbacks_are_isolated():
+    registry = metrics.Registry()
+    registry.counter("requests_total", "Peticiones", ("route",)).inc(route='/a"b\\c')
+    registry.gauge("broken", "Callback roto", callback=lambda: 1 / 0)
+    text = registry.render()
+    assert sample(text, 'requests_total{route="/a\\"b\\\\c"}') == 1
+    assert "# ERROR broken" in text
+
+def test_requests_are_counted_per_route(client):
+    series = 'http_requests_total{route="/api/status",method="GET",status="200"}'
+    before = sample(client.get("/metrics").get_data(as_text=True), series)
+    client.get("/api/status")
+    response = client.get("/metrics")
+
+    assert response.content_type == metrics.CONTENT_TYPE
+    text = response.get_data(as_text=True)
+    assert sample(text, series) == before + 1
+    assert sample(text, 'http_request_duration_seconds_count{route="/api/status",method="GET"}') > 0
+
+def test_import_phases_are_timed(main_module, client, monkeypatch, upstream, tmp_path):
+    monkeypatch.setattr(git_cache, "git_cache", GitCache(enabled=False))
+    series = 'import_phase_duration_seconds_count{phase="clone"}'
+    before = sample(client.get("/metrics").get_data(as_text=True), series)
+
+    importer = main_module.GameImporter(game_dir=str(tmp_path / "game"))
+    assert importer.clone_repository(upstream.path, "shallow")
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert sample(text, series) == before + 1
+    assert sample(text, 'import_phase_duration_seconds_sum{phase="clone"}') > 0
@@ -0,0 +1,90 @@
+"""Índice de archivos del proyecto (project_index.py)"""
+
+import os
+
+import precompress
+import project_index
+from conftest import write
+
+def test_precompressed_sidecars_are_not_indexed(main_module, client, tmp_path):
+    game_dir = str(tmp_path / "game")
+    write(game_dir, "index.html", "<html><script src=\"public/game.js\"></script></html>\n")
+    write(game_dir, "public/game.js", "console.log('main');\n" * 200)
+    # Un .gz sin original al lado sí es un archivo del proyecto
+    write(game_dir, "data/levels.gz", "x")
+    project_index.get_index(game_dir)
+
+    precompress.precompress_tree(game_dir)
+    assert os.path.exists(os.path.join(game_dir, "public", "game.js.gz"))
+
+    files = project_index.get_index(game_dir).files
+    assert sorted(files) == ["data/levels.gz", "index.html", "public/game.js"]
+
+    previous = main_module.importer.game_path
+    main_module.importer.game_path = game_dir
+    try:
+        info = main_module.importer.detect_game_type()
+        assert info["type"] == "web"
+        assert sorted(info["structure"]) == sorted(files)
+        document = client.get("/api/game_info").get_json()
+        assert document["file_count"] == 3
+        assert "public/game.js.gz" not in document["structure"]
+    finally:
+        main_module.importer.game_path = previous
+
+def test_sidecars_are_skipped_by_apply_changes(tmp_path):
+    game_dir = str(tmp_path / "game")
+    write(game_dir, "index.html", "<html></html>\n")
+    project_index.apply_changes(game_dir, None)
+    try:
+        write(game_dir, "index.html.gz", "comprimido")
+        write(game_dir, "index.html.br", "comprimido")
+        project_index.apply_changes(game_dir, ["index.html.gz", "index.html.br"])
+        assert sorted(project_index.get_index(game_dir).files) == ["index.html"]
+    finally:
+        project_index.unwatch(game_dir)
+
+def restart(main_module, monkeypatch, game_dir):
+    """Simular un proceso nuevo: índice en memoria e importador desde cero"""
+    project_index._indexes.pop(os.path.abspath(game_dir), None)
+    importer = main_module.GameImporter(game_dir=game_dir)
+    importer.game_path = game_dir
+    monkeypatch.setattr(main_module, "importer", importer)
+
+def test_game_info_etag_survives_restarts(main_module, client, monkeypatch, tmp_path):
+    game_dir = str(tmp_path / "game")
+    write(game_dir, "index.html", "<html></html>\n")
+    restart(main_module, monkeypatch, game_dir)
+    first = client.get("/api/game_info?view=summary")
+    etag = first.headers["ETag"]
+
+    restart(main_module, monkeypatch, game_dir)
+    response = client.get("/api/game_info?view=summary", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Tras reiniciar, la generación del índice vuelve a empezar: la ETag no
+    # puede depender de ella
+    write(game_dir, "js/game.js", "console.log('nuevo');\n")
+    restart(main_module, monkeypatch, game_dir)
+    response = client.get("/api/game_info?view=summary", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["file_count"] == 2
+    assert response.headers["ETag"] != etag
+
+def test_listing_tolerates_files_removed_after_detection(main_module, client,
+                                                        monkeypatch, tmp_path):
+    game_dir = str(tmp_path / "game")
+    write(game_dir, "index.html", "<html></html>\n")
+    write(game_dir, "js/game.js", "console.log('v1');\n")
+    restart(main_module, monkeypatch, game_dir)
+    main_module.importer.detect_game_type()
+
+    # Como si el FileWatcher quitara el archivo entre la detección y el listado
+    index = project_index.get_index(game_dir)
+    entries = index.entries()
+    del index.files["js/game.js"]
+    assert "js/game.js" in entries
+
+    response = client.get("/api/game_info?format=tree")
+    assert response.status_code == 200
+    assert response.get_json()["tree"]["js"] == {"game.js": 0}
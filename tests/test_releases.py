@@ -0,0 +1,108 @@
+"""Versiones de un juego (releases.py) y su rollback"""
+
+import os
+
+import pytest
+
+from asset_pack import PACK_SUFFIX
+from conftest import write
+from releases import ReleaseManager
+
+def publish(releases, files):
+    staging = releases.stage()
+    for rel_path, content in files.items():
+        write(staging, rel_path, content)
+    return releases.publish(staging, repo_url=None)["id"]
+
+def read(game_dir, rel_path):
+    with open(os.path.join(game_dir, rel_path)) as f:
+        return f.read()
+
+def test_rollback_switches_the_symlink_to_the_previous_release(tmp_path):
+    game_dir = str(tmp_path / "game")
+    releases = ReleaseManager(game_dir)
+    v1 = publish(releases, {"index.html": "v1", "js/lib.js": "lib"})
+    v2 = publish(releases, {"index.html": "v2", "js/lib.js": "lib"})
+    assert releases.current() == v2 and read(game_dir, "index.html") == "v2"
+
+    # Lo que no cambia entre versiones se comparte con hardlinks de solo lectura
+    shared = os.stat(os.path.join(releases.path(v2), "js", "lib.js"))
+    assert os.stat(os.path.join(releases.path(v1), "js", "lib.js")).st_ino == shared.st_ino
+    assert shared.st_mode & 0o222 == 0
+    assert os.stat(os.path.join(releases.path(v2), "index.html")).st_mode & 0o200
+
+    assert releases.rollback() == v1
+    assert os.path.islink(game_dir)
+    assert read(game_dir, "index.html") == "v1"
+    assert [meta["current"] for meta in releases.list()] == [False, True]
+    with pytest.raises(LookupError):
+        releases.rollback()
+
+    releases.activate(v2)
+    assert read(game_dir, "index.html") == "v2"
+
+def test_activate_rejects_unknown_ids(tmp_path):
+    releases = ReleaseManager(str(tmp_path / "game"))
+    publish(releases, {"index.html": "v1"})
+    for release_id in ("missing", "../game", ".hidden"):
+        with pytest.raises(KeyError):
+            releases.activate(release_id)
+
+def test_prune_keeps_the_newest_releases(tmp_path):
+    releases = ReleaseManager(str(tmp_path / "game"), keep=2)
+    ids = [publish(releases, {"index.html": f"v{n}"}) for n in range(4)]
+    assert [meta["id"] for meta in releases.list()] == ids[:1:-1]
+    assert not os.path.exists(releases.path(ids[0]))
+
+def test_read_only_shared_files_keep_deduplicating(tmp_path):
+    releases = ReleaseManager(str(tmp_path / "game"), keep=3)
+    ids = [publish(releases, {"index.html": f"v{n}", "lib.js": "lib"}) for n in range(3)]
+    inodes = {os.stat(os.path.join(releases.path(release_id), "lib.js")).st_ino
+              for release_id in ids}
+    assert len(inodes) == 1
+
+def test_prune_parses_ids_with_dots(tmp_path):
+    releases = ReleaseManager(str(tmp_path / "game"), keep=1)
+    old = publish(releases, {"index.html": "old"})
+    staging = releases.path("2.0.1")
+    write(staging, "index.html", "new")
+    releases.publish(staging, repo_url=None)
+    # Paquete de assets de la versión activa: <id>.assets.pack
+    pack = releases.path("2.0.1") + PACK_SUFFIX
+    with open(pack, "wb") as f:
+        f.write(b"pack")
+    releases.prune()
+
+    assert releases.current() == "2.0.1"
+    assert os.path.isdir(releases.path("2.0.1")) and os.path.exists(pack)
+    assert sorted(os.listdir(releases.releases_dir)) == ["2.0.1", "2.0.1.assets.pack",
+                                                         "2.0.1.json"]
+    assert not os.path.exists(releases.path(old))
+
+def test_legacy_directory_becomes_a_release(tmp_path):
+    game_dir = tmp_path / "game"
+    game_dir.mkdir()
+    (game_dir / "index.html").write_text("legacy")
+    releases = ReleaseManager(str(game_dir))
+    publish(releases, {"index.html": "new"})
+
+    legacy = releases.rollback()
+    assert legacy.startswith("legacy-")
+    assert read(str(game_dir), "index.html") == "legacy"
+
+def test_rollback_endpoint_serves_the_previous_release(main_module, client,
+                                                       monkeypatch, tmp_path):
+    main_module.initialize()
+    importer = main_module.GameImporter(game_dir=str(tmp_path / "game"))
+    monkeypatch.setattr(main_module, "importer", importer)
+    if not importer.releases:
+        pytest.skip("RELEASES=0")
+    v1 = publish(importer.releases, {"index.html": "v1"})
+    publish(importer.releases, {"index.html": "v2"})
+    importer.game_path = importer.game_dir
+
+    assert client.get("/game/index.html").get_data() == b"v2"
+    response = client.post("/api/releases/rollback")
+    assert response.get_json() == {"success": True, "current": v1}
+    assert client.get("/game/index.html").get_data() == b"v1"
+    assert client.post("/api/releases/rollback").status_code == 409
@@ -0,0 +1,67 @@
+"""Servidor de producción (serve.py) con streams SSE abiertos"""
+
+import http.client
+import select
+import socket
+import threading
+
+import pytest
+
+import serve
+
+@pytest.fixture
+def server(main_module, app, monkeypatch):
+    events = main_module.EventBus(max_streams=2, max_age=1)
+    monkeypatch.setattr(main_module.importer, "events", events)
+    server = serve.BoundedWSGIServer("127.0.0.1", 0, app, connections=3,
+                                     handler=serve.QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close(timeout=5)
+
+def get(server, path):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    connection.request("GET", path)
+    return connection, connection.getresponse()
+
+def test_open_streams_do_not_starve_other_requests(server):
+    streams = [get(server, "/api/events") for _ in range(2)]
+    for _, response in streams:
+        assert response.status == 200
+        assert response.readline() == b"retry: 3000\n"
+
+    # Los streams ocupan su plaza, no las de las peticiones normales
+    connection, response = get(server, "/api/events")
+    assert response.status == 503 and response.getheader("Retry-After") == "30"
+    response.read()
+    connection.close()
+    connection, response = get(server, "/api/status")
+    assert response.status == 200
+    connection.close()
+
+    # Pasado max_age el stream termina y libera su plaza
+    for connection, response in streams:
+        response.read()
+        connection.close()
+    connection, response = get(server, "/api/events")
+    assert response.status == 200
+    connection.close()
+
+def test_connections_over_the_limit_wait_for_a_slot(server):
+    idle = [socket.create_connection(("127.0.0.1", server.server_port)) for _ in range(3)]
+    waiting = socket.create_connection(("127.0.0.1", server.server_port))
+    waiting.sendall(b"GET /api/status HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    readable, _, _ = select.select([waiting], [], [], 0.5)
+    assert not readable
+
+    # Al cerrarse una conexión inactiva se atiende la que esperaba en el backlog
+    idle.pop().close()
+    waiting.settimeout(5)
+    assert waiting.recv(64).startswith(b"HTTP/1.1 200")
+    for connection in idle + [waiting]:
+        connection.close()
+
+def test_more_than_one_worker_is_rejected():
+    with pytest.raises(ValueError):
+        serve.run_prefork("127.0.0.1", 0, workers=2, connections=4, backlog=8)
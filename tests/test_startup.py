@@ -0,0 +1,26 @@
+"""Arranque de main.py: fábrica de la app e imports diferidos"""
+
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+# Módulos que importar main no debe cargar (se importan al usarlos)
+DEFERRED_MODULES = ("dependency_cache", "git_cache", "releases", "asset_pack", "instances",
+                    "profiling", "metrics", "project_index", "static_files")
+
+def test_import_main_defers_heavy_modules():
+    code = ("import sys; import main; "
+            f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            check=True, env=dict(os.environ, PYTHONPATH=ROOT))
+    assert result.stdout.strip() == ""
+
+def test_create_app_builds_a_new_app_each_time(main_module):
+    first = main_module.create_app()
+    second = main_module.create_app()
+    assert first is not second
+    for app in (first, second):
+        assert app.test_client().get("/api/status").status_code == 200
+        assert app.test_client().get("/metrics").status_code == 200
@@ -0,0 +1,132 @@
+"""Archivos del juego (static_files.py): caché de assets, Cache-Control y
+peticiones condicionales y de rangos en GameServer y la ruta /game/ de Flask
+"""
+
+import http.client
+import os
+import threading
+
+import pytest
+
+import project_index
+import static_files
+from conftest import write
+from game_server import GameServer
+from static_files import AssetCache
+
+CONTENT = "0123456789" * 10
+
+@pytest.fixture
+def game_dir(tmp_path):
+    game_dir = str(tmp_path / "game")
+    write(game_dir, "index.html", "<html></html>\n")
+    write(game_dir, "data.txt", CONTENT)
+    yield game_dir
+    project_index._indexes.pop(os.path.abspath(game_dir), None)
+
+@pytest.fixture
+def game_server(game_dir):
+    server = GameServer(game_dir, port=0, open_browser=False, log_requests=False, pack=False)
+    server.create_web_server()
+    threading.Thread(target=server.server.serve_forever, daemon=True).start()
+
+    def get(headers=None):
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        try:
+            connection.request("GET", "/data.txt", headers=headers or {})
+            response = connection.getresponse()
+            return response.status, dict(response.getheaders()), response.read().decode()
+        finally:
+            connection.close()
+
+    yield get
+    server.stop()
+
+@pytest.fixture
+def flask_game(main_module, monkeypatch, client, game_dir):
+    importer = main_module.GameImporter(game_dir=game_dir)
+    importer.game_path = game_dir
+    monkeypatch.setattr(main_module, "importer", importer)
+
+    def get(headers=None):
+        response = client.get("/game/data.txt", headers=headers or {})
+        return response.status_code, dict(response.headers), response.get_data(as_text=True)
+
+    return get
+
+@pytest.fixture(params=["game_server", "flask_game"])
+def get(request):
+    return request.getfixturevalue(request.param)
+
+def test_etag_and_not_modified(get):
+    status, headers, body = get()
+    assert status == 200 and body == CONTENT
+    etag = headers["ETag"]
+    assert etag.startswith('"')
+
+    status, _, body = get({"If-None-Match": etag})
+    assert status == 304 and body == ""
+    # If-None-Match usa comparación débil
+    assert get({"If-None-Match": f"W/{etag}"})[0] == 304
+    assert get({"If-None-Match": '"otro"'})[0] == 200
+
+def test_range_returns_partial_content(get):
+    status, headers, body = get({"Range": "bytes=10-19"})
+    assert status == 206 and body == CONTENT[10:20]
+    assert headers["Content-Range"] == f"bytes 10-19/{len(CONTENT)}"
+
+    assert get({"Range": "bytes=1000-"})[0] == 416
+
+def test_if_range_requires_a_strong_match(get):
+    etag = get()[1]["ETag"]
+    status, _, body = get({"Range": "bytes=0-4", "If-Range": etag})
+    assert status == 206 and body == CONTENT[:5]
+
+    # Un ETag débil, otro ETag o una fecha: se envía el archivo completo
+    for if_range in (f"W/{etag}", '"otro"', "Wed, 21 Oct 2015 07:28:00 GMT"):
+        status, _, body = get({"Range": "bytes=0-4", "If-Range": if_range})
+        assert status == 200 and body == CONTENT
+
+def test_asset_cache_evicts_least_recently_used_within_budget(tmp_path):
+    paths = {name: write(str(tmp_path), name, name * 40) for name in "abc"}
+    cache = AssetCache(max_bytes=100, max_file_size=100)
+    cache.get(paths["a"])
+    cache.get(paths["b"])
+    assert cache.get(paths["a"]).data == b"a" * 40  # a pasa a ser la más reciente
+
+    cache.get(paths["c"])
+    assert list(cache.entries) == [paths["a"], paths["c"]]
+    assert cache.total_bytes == 80
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+
+def test_asset_cache_bypasses_large_files(tmp_path):
+    path = write(str(tmp_path), "big.bin", "x" * 50)
+    cache = AssetCache(max_bytes=100, max_file_size=10)
+    assert cache.get(path) is None
+    assert not cache.entries and cache.stats()["bypasses"] == 1
+
+def test_asset_cache_reloads_modified_files(tmp_path):
+    path = write(str(tmp_path), "a.txt", "uno")
+    cache = AssetCache()
+    first = cache.get(path)
+    assert cache.get(path) is first
+
+    write(str(tmp_path), "a.txt", "dos")
+    mtime_ns = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    second = cache.get(path)
+    assert second.data == b"dos" and second.etag != first.etag
+
+    os.unlink(path)
+    assert cache.get(path) is None and not cache.entries
+
+def test_long_max_age_only_for_hashed_asset_names():
+    long_lived = "public, max-age=604800"
+    policies = static_files.DEFAULT_CACHE_POLICIES
+    assert static_files.cache_control("assets/app.3f2a9c1b.js", policies) == long_lived
+    assert static_files.cache_control("game/assets/sprite-0a1b2c3d4e.png", policies) == long_lived
+    # Sin hash el nombre no cambia con el contenido: se revalida
+    assert static_files.cache_control("assets/player.png", policies) == "no-cache"
+    assert static_files.cache_control("assets/v1.2.png", policies) == "no-cache"
+    assert static_files.cache_control("index.html", policies) == "no-cache"
@@ -0,0 +1,14 @@
+"""Estado de la aplicación (/api/status)"""
+
+def test_git_availability_is_unknown_until_the_probe_finishes(main_module, client,
+                                                              monkeypatch):
+    main_module.initialize()
+    importer_class = main_module.GameImporter
+    monkeypatch.setattr(importer_class, "toolchain", {})
+    monkeypatch.setattr(importer_class, "toolchain_checked_at", None)
+    # Como si la detección en segundo plano siguiera en curso
+    monkeypatch.setattr(importer_class, "_toolchain_refreshing", True)
+    assert client.get("/api/status").get_json()["git_available"] is None
+
+    main_module.importer.refresh_toolchain()
+    assert client.get("/api/status").get_json()["git_available"] is True
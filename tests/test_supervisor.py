@@ -0,0 +1,120 @@
+"""Supervisor de procesos de juego (supervisor.py) y /start_game_server"""
+
+import os
+import socket
+import sys
+import time
+
+import pytest
+
+import supervisor
+from supervisor import Supervisor
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("La condición no se cumplió a tiempo")
+        time.sleep(0.02)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+def lines(process):
+    return [record["line"] for record in process.output_since(0)]
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(supervisor, "BACKOFF_INITIAL", 0.05)
+
+def test_crashing_process_restarts_with_backoff(tmp_path):
+    process = Supervisor(python("import sys; print('arranco'); sys.exit(3)"),
+                         cwd=tmp_path, probe_interval=0.05, max_restarts=2)
+    process.start()
+    process.wait()
+
+    assert process.state == "failed"
+    assert process.restarts == 2 and process.last_exit_code == 3
+    output = lines(process)
+    assert output.count("arranco") == 3
+    # El backoff se duplica en cada reinicio
+    assert any(line.endswith("reinicio en 0.05 s") for line in output)
+    assert any(line.endswith("reinicio en 0.1 s") for line in output)
+
+def test_ready_once_the_port_accepts_connections(tmp_path):
+    port = free_port()
+    code = ("import socket, time; time.sleep(0.3); "
+            f"s = socket.create_server(('127.0.0.1', {port})); time.sleep(30)")
+    process = Supervisor(python(code), cwd=tmp_path, port=port)
+    process.start()
+    try:
+        wait_for(lambda: process.state == "running")
+        assert process.startup_latency >= 0.3
+        assert process.status()["pid"]
+    finally:
+        process.stop()
+    assert process.state == "stopped" and not process.alive
+
+def test_port_held_by_another_process_is_not_ready(tmp_path):
+    with socket.create_server(("127.0.0.1", 0)) as busy:
+        port = busy.getsockname()[1]
+        process = Supervisor(python("import time; time.sleep(30)"), cwd=tmp_path,
+                             port=port, max_restarts=1)
+        process.start()
+        process.wait()
+    assert process.state == "failed" and process.ready_at is None
+    assert any("ocupado por otro proceso" in line for line in lines(process))
+    assert not any(line.startswith("[supervisor] Ejecutando") for line in lines(process))
+
+def test_stop_interrupts_the_prepare_step(tmp_path):
+    def prepare(run):
+        run(python("import time; time.sleep(30)"))
+
+    process = Supervisor(python("print('no debe arrancar')"), cwd=tmp_path, prepare=prepare)
+    process.start()
+    wait_for(lambda: process.state == "preparing" and process.process is not None)
+    started = time.monotonic()
+    process.stop(timeout=5)
+    assert time.monotonic() - started < 5
+    assert not process.alive
+    assert "no debe arrancar" not in lines(process)
+
+def test_start_game_server_follows_release_switches(main_module, client, monkeypatch,
+                                                    tmp_path):
+    releases = tmp_path / "releases"
+    for name in ("v1", "v2"):
+        (releases / name).mkdir(parents=True)
+    game_dir = tmp_path / "game"
+    game_dir.symlink_to(releases / "v1")
+    created = []
+
+    def create_game_supervisor(game_path, port):
+        process = Supervisor(python("import time; time.sleep(30)"),
+                             cwd=os.path.realpath(game_path))
+        created.append(process)
+        return process
+
+    monkeypatch.setattr(main_module, "create_game_supervisor", create_game_supervisor)
+    monkeypatch.setattr(main_module, "GAME_PORT", free_port())
+    monkeypatch.setattr(main_module, "game_supervisor", None)
+    monkeypatch.setattr(main_module.importer, "game_path", str(game_dir))
+    try:
+        assert client.get("/start_game_server").status_code == 200
+        assert client.get("/start_game_server").status_code == 200
+        assert len(created) == 1
+
+        # Publicar otra versión cambia el destino del enlace: se reinicia el juego
+        game_dir.unlink()
+        game_dir.symlink_to(releases / "v2")
+        assert client.get("/start_game_server").status_code == 200
+        assert len(created) == 2
+        assert created[1].cwd == os.path.realpath(releases / "v2")
+        assert not created[0].alive
+    finally:
+        for process in created:
+            process.stop()